@@ -0,0 +1,173 @@
+import base64
+import re
+from io import BytesIO
+
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework.negotiation import BaseContentNegotiation
+
+from .blob_storage import BlobStorage, get_blob_storage
+
+
+CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# El contenido de un digest nunca cambia, se puede cachear indefinidamente
+CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Para recursos que exigen autenticación: solo el navegador, no cachés compartidas
+PRIVATE_CACHE_CONTROL = 'private, max-age=31536000, immutable'
+# Original servido en lugar de una miniatura que aún no existe: la misma URL
+# servirá la miniatura cuando esté lista, así que se revalida en cada uso
+FALLBACK_CACHE_CONTROL = 'public, no-cache'
+PRIVATE_FALLBACK_CACHE_CONTROL = 'private, no-cache'
+
+
+class BlobContentNegotiation(BaseContentNegotiation):
+    """
+    Para vistas de DRF que transmiten blobs: ?format= elige el formato de la
+    miniatura, no el renderer, así que no se usa para negociar (DRF respondería
+    404 a ?format=webp). Los errores de DRF (401, 403) salen con el primer renderer.
+    """
+
+    def select_parser(self, request, parsers):
+        return parsers[0] if parsers else None
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+def _etag_matches(header, etag):
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    return etag in [tag.strip() for tag in header.split(',')]
+
+
+def _parse_range(header, size):
+    """
+    Interpreta un header Range de un solo rango.
+    Returns:
+    (start, end) inclusivos, None si no hay rango válido, o False si no es satisfacible
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+
+    start, end = match.groups()
+    if not start and not end:
+        return None
+
+    if not start:
+        # bytes=-N → últimos N bytes
+        length = int(end)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+
+    start = int(start)
+    end = int(end) if end else size - 1
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+
+def _iter_range(fh, start, length):
+    try:
+        fh.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = fh.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        fh.close()
+
+
+def blob_response(request, digest, content_type, last_modified=None, data=None, cache_control=CACHE_CONTROL):
+    """
+    Respuesta HTTP para un blob con ETag fuerte, 304 y soporte de Range.
+    Si se pasa `data` se sirven esos bytes (filas heredadas en base64);
+    en otro caso se transmite el archivo del almacén de blobs por bloques.
+    Si el archivo del blob no está en el almacén responde 404.
+    """
+    etag = f'"{digest}"'
+    last_modified_ts = int(last_modified.timestamp()) if last_modified else None
+
+    headers = {
+        'ETag': etag,
+        'Cache-Control': cache_control,
+        'Accept-Ranges': 'bytes',
+    }
+    if last_modified_ts is not None:
+        headers['Last-Modified'] = http_date(last_modified_ts)
+
+    # If-None-Match tiene prioridad sobre If-Modified-Since
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    not_modified = (
+        _etag_matches(if_none_match, etag)
+        if if_none_match
+        else last_modified_ts is not None and if_modified_since is not None and last_modified_ts <= if_modified_since
+    )
+    if not_modified:
+        response = HttpResponse(status=304)
+        for key, value in headers.items():
+            response[key] = value
+        return response
+
+    if data is not None:
+        size = len(data)
+        open_blob = lambda: BytesIO(data)
+    else:
+        storage = get_blob_storage()
+        try:
+            size = storage.size(digest)
+        except FileNotFoundError:
+            return JsonResponse({"error": "La imagen no existe", "status": 404}, status=404)
+        open_blob = lambda: storage.open(digest)
+
+    byte_range = None
+    range_header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if range_header and (not if_range or if_range.strip() == etag):
+        byte_range = _parse_range(range_header, size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            _iter_range(open_blob(), start, length),
+            status=206,
+            content_type=content_type,
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    else:
+        length = size
+        response = FileResponse(open_blob(), content_type=content_type)
+        response.block_size = CHUNK_SIZE
+
+    response['Content-Length'] = str(length)
+    for key, value in headers.items():
+        response[key] = value
+    return response
+
+
+def legacy_blob_response(request, data_uri, last_modified=None, cache_control=CACHE_CONTROL):
+    """Sirve una imagen heredada guardada como data-URI en la base de datos"""
+    content_type = 'application/octet-stream'
+    payload = data_uri
+    if data_uri.startswith('data:'):
+        header, _, payload = data_uri.partition(',')
+        content_type = header[5:].split(';')[0] or content_type
+
+    data = base64.b64decode(payload)
+    digest = BlobStorage.compute_digest(data)
+    return blob_response(request, digest, content_type, last_modified, data=data, cache_control=cache_control)
@@ -0,0 +1,140 @@
+import hashlib
+import os
+import tempfile
+from abc import ABC, abstractmethod
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class BlobStorage(ABC):
+    """
+    Almacén de blobs direccionado por contenido.
+    Cada blob se identifica por el SHA-256 de sus bytes, de modo que subir
+    dos veces la misma imagen solo ocupa espacio una vez. Un backend que no
+    implementa todos los métodos abstractos falla al instanciarse.
+    """
+
+    @staticmethod
+    def compute_digest(data: bytes) -> str:
+        """Retorna el SHA-256 (hex) de los bytes"""
+        return hashlib.sha256(data).hexdigest()
+
+    @abstractmethod
+    def save(self, data: bytes) -> str:
+        """Guarda los bytes y retorna su digest"""
+
+    @abstractmethod
+    def open(self, digest: str):
+        """Abre el blob en modo binario"""
+
+    def read(self, digest: str) -> bytes:
+        """Lee el blob completo"""
+        with self.open(digest) as fh:
+            return fh.read()
+
+    @abstractmethod
+    def exists(self, digest: str) -> bool:
+        """True si el blob está guardado"""
+
+    @abstractmethod
+    def size(self, digest: str) -> int:
+        """Tamaño del blob en bytes"""
+
+    @abstractmethod
+    def modified_time(self, digest: str) -> float:
+        """Última escritura (timestamp); save() la renueva aunque el contenido ya exista"""
+
+    @abstractmethod
+    def delete(self, digest: str) -> None:
+        """Borra el blob; no falla si ya no existe"""
+
+    @abstractmethod
+    def digests(self):
+        """Itera los digests de todos los blobs guardados"""
+
+
+class LocalBlobStorage(BlobStorage):
+    """
+    Backend en sistema de archivos local.
+    Los blobs se guardan en <root>/ab/cd/<digest> para no acumular
+    cientos de miles de archivos en un mismo directorio.
+    """
+
+    def __init__(self, root=None):
+        self.root = str(root or settings.BLOB_STORAGE_ROOT)
+
+    def path(self, digest: str) -> str:
+        if len(digest) != 64 or not all(c in '0123456789abcdef' for c in digest):
+            raise ValueError("Digest inválido")
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    def save(self, data: bytes) -> str:
+        digest = self.compute_digest(data)
+        final_path = self.path(digest)
+
+        # El contenido ya existe: no hay nada que escribir. Se renueva su fecha para
+        # que la recolección de blobs huérfanos no lo borre mientras se guarda su fila
+        if os.path.exists(final_path):
+            try:
+                os.utime(final_path)
+                return digest
+            except FileNotFoundError:
+                pass
+
+        directory = os.path.dirname(final_path)
+        os.makedirs(directory, exist_ok=True)
+
+        # Escritura atómica: archivo temporal en el mismo directorio + rename
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                fh.write(data)
+                fh.flush()
+                os.fsync(fh.fileno())
+            os.replace(tmp_path, final_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return digest
+
+    def open(self, digest: str):
+        return open(self.path(digest), 'rb')
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self.path(digest))
+
+    def size(self, digest: str) -> int:
+        return os.path.getsize(self.path(digest))
+
+    def modified_time(self, digest: str) -> float:
+        return os.path.getmtime(self.path(digest))
+
+    def delete(self, digest: str) -> None:
+        try:
+            os.remove(self.path(digest))
+        except FileNotFoundError:
+            pass
+
+    def digests(self):
+        if not os.path.isdir(self.root):
+            return
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                # Los temporales de una escritura en curso empiezan por '.tmp-'
+                if len(name) == 64 and not name.startswith('.'):
+                    yield name
+
+
+_storage = None
+
+
+def get_blob_storage() -> BlobStorage:
+    """Retorna la instancia del backend configurado en BLOB_STORAGE_BACKEND"""
+    global _storage
+    if _storage is None or getattr(_storage, 'root', None) != str(settings.BLOB_STORAGE_ROOT):
+        backend = import_string(settings.BLOB_STORAGE_BACKEND)
+        _storage = backend()
+    return _storage
@@ -0,0 +1,48 @@
+class FieldsetError(ValueError):
+    """?fields= o ?expand= con nombres que el recurso no tiene"""
+
+
+def _split(value):
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+def parse_fieldset(query_params, available, default, expandable=(), resource=None):
+    """
+    Lee ?fields=a,b y ?expand=x,y (o fields[resource]= y expand[resource]= para
+    recursos anidados, al estilo de JSON:API).
+
+    available: todos los campos del recurso en su orden canónico de salida
+    default: campos que se envían sin ?fields=
+    expandable: campos que ?expand= puede agregar o convertir en objeto anidado
+    Returns:
+    (campos en orden canónico, conjunto de campos expandidos)
+    Raises: FieldsetError si se piden nombres desconocidos
+    """
+    fields_param = f'fields[{resource}]' if resource else 'fields'
+    expand_param = f'expand[{resource}]' if resource else 'expand'
+
+    requested = _split(query_params.get(fields_param))
+    expand = _split(query_params.get(expand_param))
+
+    unknown = [name for name in requested if name not in available]
+    if unknown:
+        raise FieldsetError(f"Campos desconocidos en '{fields_param}': {', '.join(unknown)}.")
+    not_expandable = [name for name in expand if name not in expandable]
+    if not_expandable:
+        raise FieldsetError(f"No se pueden expandir en '{expand_param}': {', '.join(not_expandable)}.")
+
+    selected = set(requested or default) | set(expand)
+    return tuple(name for name in available if name in selected), set(expand)
+
+
+class DynamicFieldsMixin:
+    """
+    Para ModelSerializer: acepta fields=(...) al instanciar y solo conserva esos
+    campos, en el orden declarado en Meta.fields.
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
@@ -0,0 +1,205 @@
+import base64
+from importlib import import_module
+from io import BytesIO
+from types import SimpleNamespace
+from typing import NamedTuple
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+
+
+class Budget(NamedTuple):
+    """Máximo de consultas SQL y de bytes de respuesta para una URL"""
+    queries: int
+    bytes: int
+
+
+def seed_marketplace(users=12, publications_per_user=8, images_per_publication=3, favorites_per_user=6):
+    """
+    Siembra un volumen realista: usuarios con avatar, publicaciones con imágenes en
+    el almacén de blobs, índice de trigramas, facetas, favoritos, intercambios y
+    reseñas. Con estos volúmenes un N+1 se nota en el número de consultas.
+    Returns: SimpleNamespace con los objetos sembrados
+    """
+    from PIL import Image
+
+    from exchanges.models import Exchange
+    from publications.models import (
+        Category, Condition, FavoritePublication, PublicationImage, Publications, State,
+    )
+    from publications.services.facet_service import FacetService
+    from publications.services.image_service import ImageService
+    from publications.services.trigram_service import TrigramService
+    from reputation.models import Reputation, detailReputation
+    from users.models import ImagesUsers, UserApp
+    from users.services.user_cache import AuthUserCache
+
+    buffer = BytesIO()
+    Image.new("RGB", (64, 48), (30, 120, 60)).save(buffer, format="PNG")
+    png = buffer.getvalue()
+    data_uri = "data:image/png;base64," + base64.b64encode(png).decode("utf-8")
+    image_meta = ImageService.store(png, "image/png")
+
+    categorias = [Category.objects.create(nombre=nombre) for nombre in ("Hogar", "Deportes", "Libros")]
+    estados = [State.objects.create(nombre=nombre) for nombre in ("Activo", "Reservado")]
+    condiciones = [Condition.objects.create(nombre=nombre) for nombre in ("Nuevo", "Usado")]
+
+    usuarios = []
+    for i in range(users):
+        user = UserApp(
+            name=f"Usuario {i}",
+            email=f"usuario{i}@example.com",
+            phone=f"300{i:07d}",
+            address=f"Calle {i}",
+        )
+        user.set_password("Password123!")
+        user.save()
+        usuarios.append(user)
+    ImagesUsers.objects.bulk_create([ImagesUsers(user=user, **image_meta) for user in usuarios])
+
+    titulos = ("Bicicleta de montaña", "Mesa de roble", "Lámpara vintage", "Novela clásica", "Balón de fútbol")
+    publicaciones = Publications.objects.bulk_create([
+        Publications(
+            user=user,
+            categoria=categorias[(i + j) % len(categorias)],
+            estado=estados[j % len(estados)],
+            condition=condiciones[i % len(condiciones)],
+            titulo=f"{titulos[j % len(titulos)]} {i}-{j}",
+            titulo_normalizado=TrigramService.normalize(f"{titulos[j % len(titulos)]} {i}-{j}"),
+            descripcion="Descripción de prueba " * 10,
+            ubicacion="Bogotá",
+        )
+        for i, user in enumerate(usuarios)
+        for j in range(publications_per_user)
+    ])
+    PublicationImage.objects.bulk_create([
+        PublicationImage(publicacion=publicacion, orden=orden, **image_meta)
+        for publicacion in publicaciones
+        for orden in range(images_per_publication)
+    ])
+    for publicacion in publicaciones:
+        TrigramService.index_publication(publicacion)
+    FacetService.reconcile()
+
+    FavoritePublication.objects.bulk_create([
+        FavoritePublication(user=user, publicacion=publicaciones[(i * publications_per_user + k * 5 + 1) % len(publicaciones)])
+        for i, user in enumerate(usuarios)
+        for k in range(favorites_per_user)
+    ], ignore_conflicts=True)
+
+    # Cada usuario ofrece a sus dos vecinos; la mitad de los intercambios ya aceptados
+    exchanges = []
+    for i, user in enumerate(usuarios):
+        propias = publicaciones[i * publications_per_user:(i + 1) * publications_per_user]
+        for k, vecino in enumerate((1, 2)):
+            ajena = publicaciones[((i + vecino) % users) * publications_per_user + k]
+            for m in range(2):
+                exchanges.append(Exchange(
+                    requested_item=ajena,
+                    offered_item=propias[k * 2 + m],
+                    status=Exchange.Status.ACCEPTED if m == 0 else Exchange.Status.PENDING,
+                ))
+    exchanges = Exchange.objects.bulk_create(exchanges)
+
+    aceptados = [exchange for exchange in exchanges if exchange.status == Exchange.Status.ACCEPTED]
+    detailReputation.objects.bulk_create([
+        detailReputation(
+            exchange=exchange,
+            rated_user=exchange.requested_item.user,
+            reviewer=exchange.offered_item.user,
+            rating=4,
+            comment="Todo bien",
+        )
+        for exchange in aceptados
+    ])
+    for user in usuarios:
+        Reputation.objects.create(user=user, score=4)
+
+    # Estado estable de un despliegue: el sello de la caché de usuarios ya existe
+    AuthUserCache.invalidate()
+
+    return SimpleNamespace(
+        users=usuarios,
+        categorias=categorias,
+        estados=estados,
+        condiciones=condiciones,
+        publicaciones=publicaciones,
+        exchanges=exchanges,
+        data_uri=data_uri,
+    )
+
+
+def _url_names(urlconf):
+    return [pattern.name for pattern in import_module(urlconf).urlpatterns if isinstance(pattern, URLPattern)]
+
+
+class QueryBudgetMixin:
+    """
+    Para APITestCase: BUDGETS asigna a cada nombre de URL de `urlconf` un Budget,
+    y assertWithinBudget hace la petición real (con JWT) y falla mostrando el SQL
+    capturado si se pasa de consultas o de bytes.
+    """
+
+    urlconf = None
+    BUDGETS = {}
+
+    def test_every_url_has_a_budget(self):
+        missing = [name for name in _url_names(self.urlconf) if name not in self.BUDGETS]
+        self.assertEqual(missing, [], f"URLs de {self.urlconf} sin presupuesto de consultas")
+
+    def auth_headers(self, user):
+        from users.services.jwt_service import JWTService
+
+        if user is None:
+            return {}
+        return {'HTTP_AUTHORIZATION': f"Bearer {JWTService.generate_tokens(user)['access']}"}
+
+    def sync_process_caches(self):
+        """
+        Las cachés por proceso consultan la base de datos cada pocos segundos; se
+        sincronizan antes de capturar para medir siempre el estado estable y no
+        depender del orden ni de la duración de los tests.
+        """
+        from users.services.token_denylist import TokenDenylist
+        from users.services.user_cache import AuthUserCache
+
+        AuthUserCache.sync()
+        TokenDenylist.sync(force=True)
+
+    def assertWithinBudget(self, name, method='get', args=(), data=None, user=None, expected_status=None):
+        """
+        Returns: (response, contenido en bytes). Las respuestas en streaming se
+        consumen dentro de la captura porque sus consultas ocurren al iterarlas.
+        """
+        budget = self.BUDGETS[name]
+        url = reverse(name, args=args)
+        headers = self.auth_headers(user)
+        request = getattr(self.client, method)
+        self.sync_process_caches()
+
+        with CaptureQueriesContext(connection) as ctx:
+            if method == 'get':
+                response = request(url, data, **headers)
+            else:
+                response = request(url, data, format='json', **headers)
+            if response.streaming:
+                content = b''.join(response.streaming_content)
+            else:
+                content = response.content
+
+        if expected_status is not None:
+            self.assertEqual(response.status_code, expected_status, content[:500])
+        else:
+            self.assertLess(response.status_code, 400, content[:500])
+
+        if len(ctx.captured_queries) > budget.queries:
+            sql = "\n".join(f"{i}. {query['sql']}" for i, query in enumerate(ctx.captured_queries, start=1))
+            self.fail(
+                f"{method.upper()} {url}: {len(ctx.captured_queries)} consultas, "
+                f"presupuesto {budget.queries}\n{sql}"
+            )
+        if len(content) > budget.bytes:
+            self.fail(f"{method.upper()} {url}: {len(content)} bytes, presupuesto {budget.bytes}")
+
+        return response, content
@@ -0,0 +1,82 @@
+import math
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson es opcional
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer de DRF codificado con orjson cuando está instalado.
+    Produce exactamente los mismos bytes que JSONRenderer: las fechas y los tipos
+    que orjson no conoce pasan por el encoder de DRF, y \\u2028/\\u2029 se escapan
+    igual. Con indentación, ensure_ascii o cualquier dato que orjson no acepte se
+    usa el JSONRenderer normal.
+
+    orjson no formatea todos los floats como json: escribe 1e16 donde json escribe
+    1e+16 y convierte NaN/Infinity en null, donde JSONRenderer lanza ValueError (o
+    escribe NaN si no es strict). Los datos con esos floats también pasan por
+    JSONRenderer.
+    """
+
+    # Fechas y dataclasses van al encoder de DRF, que es quien define su formato
+    OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if _has_unsafe_float(data):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        encoder = self.encoder_class()
+
+        def default(obj):
+            value = encoder.default(obj)
+            # El encoder de DRF convierte Decimal en float
+            if _has_unsafe_float(value):
+                raise TypeError
+            return value
+
+        try:
+            ret = orjson.dumps(data, default=default, option=self.OPTIONS)
+        except (TypeError, orjson.JSONEncodeError):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Mismo escape que JSONRenderer para que la salida sea JavaScript válido
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+def _float_differs(value):
+    # repr() usa notación exponencial fuera de [1e-4, 1e16) y ahí orjson escribe
+    # otro texto (1e16 frente a 1e+16); dentro del rango ambos dan el mismo
+    if not math.isfinite(value):
+        return True
+    magnitude = abs(value)
+    return magnitude != 0 and not 1e-4 <= magnitude < 1e16
+
+
+def _has_unsafe_float(data):
+    """True si data contiene algún float que orjson no escribiría igual que json"""
+    pending = [data]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, float):
+            if _float_differs(value):
+                return True
+        elif isinstance(value, dict):
+            pending.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            pending.extend(value)
+    return False
@@ -0,0 +1,156 @@
+import hashlib
+import logging
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+from .single_flight import cached_call
+
+
+logger = logging.getLogger(__name__)
+
+# Endpoints registrados con @cached_response (para las métricas)
+ENDPOINTS = set()
+
+
+def get_response_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def _generation_key(name):
+    return f"gen:{name}"
+
+
+def get_generations(names):
+    """
+    Valor actual de cada contador de generación. Un contador que no existe (o que
+    el backend desalojó) se crea con la hora actual en nanosegundos, así nunca
+    vuelve a un valor usado antes y no puede revivir respuestas viejas.
+    """
+    cache = get_response_cache()
+    keys = [_generation_key(name) for name in names]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, time.time_ns(), timeout=None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def bump_generation(*names):
+    """Invalida todas las respuestas que dependen de estas generaciones"""
+    cache = get_response_cache()
+    for name in names:
+        key = _generation_key(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Aún no existe: cualquier valor nuevo invalida lo anterior
+            if not cache.add(key, time.time_ns(), timeout=None):
+                cache.incr(key)
+
+
+def _record(endpoint, outcome):
+    cache = get_response_cache()
+    key = f"metrics:{endpoint}:{outcome}"
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+    logger.debug("response cache %s %s", outcome, endpoint)
+
+
+def cache_stats():
+    """
+    Returns:
+    {endpoint: {"hit": n, "miss": n, "hit_ratio": 0.0-1.0}}
+    """
+    cache = get_response_cache()
+    stats = {}
+    for endpoint in sorted(ENDPOINTS):
+        hit = cache.get(f"metrics:{endpoint}:hit", 0)
+        miss = cache.get(f"metrics:{endpoint}:miss", 0)
+        total = hit + miss
+        stats[endpoint] = {"hit": hit, "miss": miss, "hit_ratio": hit / total if total else 0.0}
+    return stats
+
+
+def reset_stats():
+    get_response_cache().delete_many(
+        [f"metrics:{endpoint}:{outcome}" for endpoint in ENDPOINTS for outcome in ('hit', 'miss')]
+    )
+
+
+def _response_key(endpoint, kwargs, query_params, params, generations):
+    # Solo cuentan los parámetros que usa la vista, ordenados y sin valores vacíos,
+    # así ?b=1&a=2, ?a=2&b=1 y ?a=2&b=1&_=123 comparten la misma entrada
+    query = sorted(
+        (name, sorted(v for v in query_params.getlist(name) if v))
+        for name in params
+        if any(query_params.getlist(name))
+    )
+    raw = repr((endpoint, sorted(kwargs.items()), query, generations))
+    return f"response:{endpoint}:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+
+class _NotCacheable(Exception):
+    """La vista respondió algo que no se puede cachear"""
+
+
+def cached_response(endpoint, depends_on, params=()):
+    """
+    Cachea las respuestas 200 de una vista GET de DRF. Va debajo de @api_view y
+    @permission_classes, así la autenticación y los permisos se evalúan siempre.
+
+    depends_on: nombres de generaciones de las que depende la respuesta, o una
+    función (request, **kwargs) que los retorna. bump_generation() sobre
+    cualquiera de ellos invalida la respuesta.
+    params: parámetros de query que forman parte de la llave.
+    """
+    ENDPOINTS.add(endpoint)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not settings.RESPONSE_CACHE_ENABLED or request.method != 'GET':
+                return view(request, *args, **kwargs)
+
+            names = depends_on(request, **kwargs) if callable(depends_on) else depends_on
+            key = _response_key(endpoint, kwargs, request.query_params, params, get_generations(names))
+
+            # Cuando la entrada expira una sola petición recalcula: las que llegan
+            # a la vez esperan su resultado o reciben la respuesta anterior
+            computed = {}
+
+            def compute():
+                response = view(request, *args, **kwargs)
+                computed['response'] = response
+                # Errores y respuestas en streaming (sin .data) no se cachean
+                if response.status_code != 200 or not hasattr(response, 'data'):
+                    raise _NotCacheable()
+                return response.data
+
+            try:
+                data = cached_call(get_response_cache(), key, compute, settings.RESPONSE_CACHE_TIMEOUT)
+            except _NotCacheable:
+                # Error o streaming: si la calculó otra petición, esta calcula la suya
+                response = computed.get('response') or view(request, *args, **kwargs)
+                response['X-Cache'] = 'MISS'
+                return response
+
+            if 'response' in computed:
+                _record(endpoint, 'miss')
+                response = computed['response']
+                response['X-Cache'] = 'MISS'
+                return response
+
+            _record(endpoint, 'hit')
+            response = Response(data, status=200)
+            response['X-Cache'] = 'HIT'
+            return response
+        return wrapper
+    return decorator
@@ -15,6 +15,7 @@ from datetime import timedelta
 from pathlib import Path
 import os
 import sys
+import tempfile
 
 
 load_dotenv()
@@ -158,6 +159,11 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated', 
     ], 
+    # Mismos bytes que JSONRenderer, codificados con orjson cuando está instalado
+    'DEFAULT_RENDERER_CLASSES': [
+        'ecoSwap.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 # Configuración de tamaño máximo para cargas de archivos
@@ -165,6 +171,89 @@ REST_FRAMEWORK = {
 DATA_UPLOAD_MAX_MEMORY_SIZE = 15 * 1024 * 1024  # 15 MB
 FILE_UPLOAD_MAX_MEMORY_SIZE = 15 * 1024 * 1024  # 15 MB
 
+# Paginación por cursor del catálogo de publicaciones
+PUBLICATIONS_PAGE_SIZE = 20
+PUBLICATIONS_MAX_PAGE_SIZE = 100
+# Filas por lote en las respuestas en streaming (?stream=1)
+PUBLICATIONS_STREAM_CHUNK_SIZE = 500
+EXCHANGES_STREAM_CHUNK_SIZE = 500
+
+# Caché de respuestas de los endpoints públicos de lectura (ecoSwap.response_cache).
+# RESPONSE_CACHE_BACKEND: 'locmem' (por defecto, un caché por proceso), 'file' o 'db'.
+# Con varios workers conviene 'file' o 'db' para que los contadores de generación
+# sean compartidos; 'db' requiere `python manage.py createcachetable`.
+RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'locmem')
+RESPONSE_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'ecoswap-responses',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('RESPONSE_CACHE_LOCATION', BASE_DIR / 'media' / 'response_cache'),
+    },
+    'db': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'response_cache',
+    },
+}
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        **RESPONSE_CACHE_BACKENDS[RESPONSE_CACHE_BACKEND],
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+}
+RESPONSE_CACHE_ALIAS = 'responses'
+RESPONSE_CACHE_ENABLED = True
+# Segundos que vive una respuesta; acota lo desactualizado entre workers con 'locmem'
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 60))
+
+# Cada cuántos segundos un proceso revisa el sello de versión de las tablas de referencia
+REFERENCE_CACHE_CHECK_SECONDS = 5
+
+# Usuarios autenticados cacheados por jti en cada proceso (0 desactiva la caché)
+AUTH_USER_CACHE_SIZE = int(os.environ.get('AUTH_USER_CACHE_SIZE', 1024))
+AUTH_USER_CACHE_TTL = int(os.environ.get('AUTH_USER_CACHE_TTL', 60))
+# Cada cuántos segundos un proceso revisa si otro invalidó la caché de usuarios
+AUTH_USER_CACHE_CHECK_SECONDS = 5
+
+# Modo sin estado: request.user se arma con los claims del token (user_id,
+# token_version) y la fila de UserApp solo se consulta si la vista la necesita
+JWT_STATELESS_AUTH = os.environ.get('JWT_STATELESS_AUTH', 'False') == 'True'
+# token_version vigente por usuario en el caché CACHES[AUTH_CACHE_ALIAS]; con un
+# caché por proceso un logout tarda a lo sumo este tiempo en verse en los demás
+AUTH_CACHE_ALIAS = 'default'
+AUTH_TOKEN_VERSION_TTL = int(os.environ.get('AUTH_TOKEN_VERSION_TTL', 30))
+
+# jti revocados (logout): filtro de Bloom por proceso delante de users_revokedtoken.
+# Cada CHECK_SECONDS se traen las revocaciones nuevas; cada REBUILD_SECONDS el
+# filtro se rehace y olvida los tokens expirados
+TOKEN_DENYLIST_CHECK_SECONDS = 5
+TOKEN_DENYLIST_REBUILD_SECONDS = 3600
+TOKEN_DENYLIST_CAPACITY = int(os.environ.get('TOKEN_DENYLIST_CAPACITY', 100000))
+TOKEN_DENYLIST_ERROR_RATE = 0.001
+
+# Segundos antes de reconstruir el índice de autocompletado en memoria
+AUTOCOMPLETE_REBUILD_SECONDS = 300
+
+# Almacén de blobs para imágenes (direccionado por SHA-256)
+BLOB_STORAGE_BACKEND = 'ecoSwap.blob_storage.LocalBlobStorage'
+BLOB_STORAGE_ROOT = os.environ.get('BLOB_STORAGE_ROOT', BASE_DIR / 'media' / 'blobs')
+
+# Procesos para generar miniaturas (0 = generar en línea dentro de la petición)
+IMAGE_DERIVATIVE_WORKERS = int(os.environ.get('IMAGE_DERIVATIVE_WORKERS', 2))
+
+# En tests los blobs van a un directorio temporal y las miniaturas se generan en línea
+if 'test' in sys.argv:
+    BLOB_STORAGE_ROOT = Path(tempfile.gettempdir()) / 'ecoswap_test_blobs'
+    IMAGE_DERIVATIVE_WORKERS = 0
+    REFERENCE_CACHE_CHECK_SECONDS = 0
+    # Los tests revierten la base de datos pero no el caché: se activa solo donde se prueba
+    RESPONSE_CACHE_ENABLED = False
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
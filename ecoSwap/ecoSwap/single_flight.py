@@ -0,0 +1,109 @@
+import math
+import random
+import threading
+import time
+
+
+_MISSING = object()
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalescencia de llamadas dentro del proceso: mientras una llamada para una
+    llave está en curso, las demás llamadas con la misma llave esperan su
+    resultado (o reciben un valor viejo) en lugar de repetir el mismo trabajo.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def in_flight(self, key):
+        return key in self._calls
+
+    def do(self, key, fn, stale=_MISSING):
+        """
+        Ejecuta fn() una sola vez por llave a la vez.
+        Si otra llamada ya está calculando la llave: se retorna stale si se pasó,
+        si no se espera su resultado (o se relanza su excepción).
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if stale is not _MISSING:
+                return stale
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+
+# Instancia compartida por los servicios del proceso
+flight = SingleFlight()
+
+
+def cached_call(cache, key, compute, timeout, grace=None, beta=1.0, single_flight=None):
+    """
+    Retorna compute() cacheado bajo key durante timeout segundos, protegido
+    contra estampidas cuando la entrada expira:
+
+    - Fallo sin valor: una sola llamada por proceso calcula; las demás esperan.
+    - Expirada (hasta grace segundos después, por defecto timeout): una llamada
+      recalcula y las demás reciben el valor viejo. Un candado en el caché evita
+      que varios procesos recalculen a la vez.
+    - Refresco anticipado probabilístico (XFetch): antes de expirar, cada lectura
+      recalcula con una probabilidad que crece al acercarse la expiración y con
+      lo que tardó el último cálculo (beta > 1 adelanta el refresco).
+    """
+    single_flight = single_flight or flight
+    grace = timeout if grace is None else grace
+
+    def recompute():
+        start = time.time()
+        value = compute()
+        delta = time.time() - start
+        cache.set(key, (value, delta, time.time() + timeout), timeout + grace)
+        return value
+
+    entry = cache.get(key)
+    if entry is None:
+        return single_flight.do(key, recompute)
+
+    value, delta, expires_at = entry
+    # -log(u) con u en (0, 1] es exponencial: casi siempre pequeño, a veces grande
+    if time.time() - delta * beta * math.log(1.0 - random.random()) < expires_at:
+        return value
+
+    def refresh():
+        lock_key = f"{key}:refresh"
+        if not cache.add(lock_key, 1, int(delta * 4) + 5):
+            # Otro proceso ya está recalculando
+            return value
+        try:
+            return recompute()
+        finally:
+            cache.delete(lock_key)
+
+    return single_flight.do(key, refresh, stale=value)
@@ -0,0 +1,41 @@
+from django.http import StreamingHttpResponse
+
+from .renderers import FastJSONRenderer
+
+
+def json_array_chunks(batches, key=None, extra=None):
+    """
+    Genera, fragmento por fragmento, los mismos bytes que JSONRenderer daría para
+    {key: [elementos...], **extra}, o para [elementos...] si key es None.
+    batches: iterable de listas de elementos ya serializados; solo un lote vive
+    en memoria a la vez.
+    """
+    renderer = FastJSONRenderer()
+
+    if key is None:
+        yield b'['
+    else:
+        yield b'{' + renderer.render(key) + b':['
+
+    first = True
+    for batch in batches:
+        if not batch:
+            continue
+        chunk = b','.join(renderer.render(item) for item in batch)
+        yield chunk if first else b',' + chunk
+        first = False
+
+    if key is None:
+        yield b']'
+    else:
+        # '{"status":200}' -> ',"status":200'
+        yield b']' + (b',' + renderer.render(extra)[1:-1] if extra else b'') + b'}'
+
+
+def streaming_json_response(batches, key=None, extra=None, status=200):
+    """StreamingHttpResponse con un arreglo JSON emitido por lotes (ver json_array_chunks)"""
+    return StreamingHttpResponse(
+        json_array_chunks(batches, key, extra),
+        status=status,
+        content_type='application/json',
+    )
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('publications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Exchange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('Pendiente', 'Pending'), ('En Proceso', 'In Process'), ('Aceptada', 'Accepted'), ('Rechazada', 'Rejected'), ('Cancelada', 'Cancelled')], default='Pendiente', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('offered_item', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='exchange_offers', to='publications.publications')),
+                ('requested_item', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='exchange_requests', to='publications.publications')),
+            ],
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exchanges', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='exchange',
+            index=models.Index(fields=['offered_item', 'status', 'id'], name='exchange_offered_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exchange',
+            index=models.Index(fields=['requested_item', 'status', 'id'], name='exchange_requested_status_idx'),
+        ),
+    ]
@@ -25,4 +25,11 @@ class Exchange(models.Model):
         default=Status.PENDING
     )
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
\ No newline at end of file
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # list_exchanges: WHERE <item>_id IN (publicaciones del usuario) AND status = ? ORDER BY id
+        indexes = [
+            models.Index(fields=['offered_item', 'status', 'id'], name='exchange_offered_status_idx'),
+            models.Index(fields=['requested_item', 'status', 'id'], name='exchange_requested_status_idx'),
+        ]
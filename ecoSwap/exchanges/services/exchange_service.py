@@ -2,6 +2,7 @@ from comunications.services.email_service import EmailService
 from ..serializers import ExchangeSerializer
 from publications.models import Publications
 from django.utils import timezone
+from django.conf import settings
 from ..models import Exchange
 
 class ExchangeService:
@@ -10,7 +11,7 @@ class ExchangeService:
     def create_exchange(cls, request_item, offered_item, status_exchange):
 
         try:
-            publication_request = Publications.objects.get(id=request_item)
+            publication_request = Publications.objects.select_related('user').get(id=request_item)
             publication_offered = Publications.objects.get(id=offered_item)
         except Publications.DoesNotExist:
             return False, "Una de las publicaciones no existe."
@@ -23,7 +24,6 @@ class ExchangeService:
             updated_at=None
         )
 
-        publication_request = Publications.objects.get(id=request_item)
         publication_name = publication_request.titulo
         publication_image = publication_request.descripcion
 
@@ -35,13 +35,18 @@ class ExchangeService:
 
         return True, "Oferta de intercambio enviada."
     
+    @classmethod
+    def with_participants(cls):
+        """Intercambios con ambas publicaciones y sus dueños en un solo JOIN"""
+        return Exchange.objects.select_related('requested_item__user', 'offered_item__user')
+
     @classmethod
     def respond_exchange(cls, exchange_id, response_status):
 
         try:
-            exchange = Exchange.objects.get(id=exchange_id)
-            publication_request = Publications.objects.get(id=exchange.requested_item.id)
-            publication_offered = Publications.objects.get(id=exchange.offered_item.id)
+            exchange = cls.with_participants().get(id=exchange_id)
+            publication_request = exchange.requested_item
+            publication_offered = exchange.offered_item
 
             user_request = publication_request.user
             title_request = publication_request.titulo
@@ -78,9 +83,9 @@ class ExchangeService:
     def cancel_exchange(cls, exchange_id, email_user, reason):
 
         try:
-            exchange = Exchange.objects.get(id=exchange_id)
-            publication_request = Publications.objects.get(id=exchange.requested_item.id)
-            publication_offered = Publications.objects.get(id=exchange.offered_item.id)
+            exchange = cls.with_participants().get(id=exchange_id)
+            publication_request = exchange.requested_item
+            publication_offered = exchange.offered_item
             user_request = publication_request.user
             user_offered = publication_offered.user
         except Exchange.DoesNotExist:
@@ -127,7 +132,41 @@ class ExchangeService:
     
     @classmethod
     def list_exchanges(cls, email_user, status_filter, exchanges_type):
+        exchanges = cls.filter_exchanges(email_user, status_filter, exchanges_type)
+        if exchanges is None:
+            return []
+
+        serializer = ExchangeSerializer(exchanges, many=True)
+        return serializer.data
+
+    @classmethod
+    def list_batches(cls, email_user, status_filter, exchanges_type, chunk_size=None):
+        """
+        Recorre los intercambios en lotes serializados por id (para respuestas en
+        streaming). Cada lote es una consulta con WHERE id > último, así la memoria
+        no crece con el número de intercambios.
+        Yields: listas de intercambios serializados
+        """
+        exchanges = cls.filter_exchanges(email_user, status_filter, exchanges_type)
+        if exchanges is None:
+            return
+
+        chunk_size = chunk_size or settings.EXCHANGES_STREAM_CHUNK_SIZE
+        last_id = 0
+        while True:
+            batch = list(exchanges.filter(id__gt=last_id)[:chunk_size])
+            if batch:
+                yield ExchangeSerializer(batch, many=True).data
+            if len(batch) < chunk_size:
+                return
+            last_id = batch[-1].id
 
+    @classmethod
+    def filter_exchanges(cls, email_user, status_filter, exchanges_type):
+        """
+        Returns: queryset de intercambios del usuario según estado y tipo, ordenado
+        por id (el mismo orden que recorre list_batches), o None si falla
+        """
         try:
             if status_filter == "accepted":
                 if exchanges_type == "offered":
@@ -173,10 +212,9 @@ class ExchangeService:
                         requested_item__user__email=email_user
                     )
         except Exception as e:
-            return []
-        
-        serializer = ExchangeSerializer(exchanges, many=True)
-        return serializer.data
+            return None
+
+        return exchanges.order_by('id')
 
 
 
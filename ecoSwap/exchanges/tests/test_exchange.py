@@ -703,4 +703,79 @@ class ExchangeIntegrationTest(TestCase):
         
         # Verificar estado final
         exchange = Exchange.objects.get(id=exchange_id)
-        self.assertEqual(exchange.status, Exchange.Status.CANCELLED)
\ No newline at end of file
+        self.assertEqual(exchange.status, Exchange.Status.CANCELLED)
+
+
+class ExchangeStreamingTest(TestCase):
+    """?stream=1 emite el mismo JSON que la respuesta normal, por lotes"""
+
+    def setUp(self):
+        from publications.models import Category, State
+
+        self.user1 = UserApp.objects.create(name="Usuario1", email="stream1@test.com", phone="1111111111", address="Dir 1")
+        self.user2 = UserApp.objects.create(name="Usuario2", email="stream2@test.com", phone="2222222222", address="Dir 2")
+        categoria = Category.objects.create(nombre="Libros")
+        estado = State.objects.create(nombre="Activo")
+        self.pub1 = Publications.objects.create(
+            user=self.user1, categoria=categoria, estado=estado, titulo="Libro", descripcion="Desc", ubicacion="Bogotá"
+        )
+        self.pub2 = Publications.objects.create(
+            user=self.user2, categoria=categoria, estado=estado, titulo="Laptop", descripcion="Desc", ubicacion="Cali"
+        )
+        for _ in range(5):
+            Exchange.objects.create(requested_item=self.pub1, offered_item=self.pub2)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.user1)
+
+    def test_stream_matches_regular_response(self):
+        from django.test import override_settings
+
+        regular = self.client.get(reverse('list_exchanges'), {"type": "requested"})
+        with override_settings(EXCHANGES_STREAM_CHUNK_SIZE=2):
+            streamed = self.client.get(reverse('list_exchanges'), {"type": "requested", "stream": "1"})
+            content = b''.join(streamed.streaming_content)
+
+        self.assertEqual(streamed.status_code, status.HTTP_200_OK)
+        self.assertTrue(streamed.streaming)
+        self.assertEqual(content, regular.content)
+        self.assertEqual(len(json.loads(content)), 5)
+
+    def test_stream_and_regular_share_order(self):
+        from django.test import override_settings
+        from publications.models import Category, State
+
+        # Intercambios de dos publicaciones intercalados: sin ORDER BY el JOIN los
+        # devolvería agrupados por publicación
+        otra = Publications.objects.create(
+            user=self.user1, categoria=Category.objects.first(), estado=State.objects.first(),
+            titulo="Otro libro", descripcion="Desc", ubicacion="Bogotá"
+        )
+        for _ in range(3):
+            Exchange.objects.create(requested_item=otra, offered_item=self.pub2)
+            Exchange.objects.create(requested_item=self.pub1, offered_item=self.pub2)
+
+        ids = [e['id'] for e in ExchangeService.list_exchanges(self.user1.email, None, "requested")]
+        with override_settings(EXCHANGES_STREAM_CHUNK_SIZE=3):
+            streamed = [e['id'] for batch in ExchangeService.list_batches(self.user1.email, None, "requested") for e in batch]
+
+        self.assertEqual(len(ids), 11)
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(streamed, ids)
+
+    def test_stream_empty_list(self):
+        response = self.client.get(reverse('list_exchanges'), {"type": "offered", "stream": "1"})
+        self.assertEqual(b''.join(response.streaming_content), b'[]')
+
+
+
+class ExchangeQueryPlanTest(TestCase):
+    """list_exchanges filtra por (item, status) con los índices compuestos"""
+
+    def test_filters_use_item_status_indexes(self):
+        for exchanges_type, index in (("offered", "exchange_offered_status_idx"), ("requested", "exchange_requested_status_idx")):
+            exchanges = ExchangeService.filter_exchanges("user1@test.com", "accepted", exchanges_type)
+            plan = exchanges.explain()
+
+            self.assertIn(index, plan)
+            self.assertIn("status=?", plan)
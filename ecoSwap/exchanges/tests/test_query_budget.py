@@ -0,0 +1,53 @@
+from unittest.mock import patch
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ecoSwap.query_budget import Budget, QueryBudgetMixin, seed_marketplace
+from exchanges.models import Exchange
+
+
+class ExchangesQueryBudgetTest(QueryBudgetMixin, APITestCase):
+    """Consultas SQL y bytes máximos por URL de exchanges/urls.py con volumen realista"""
+
+    urlconf = 'exchanges.urls'
+    BUDGETS = {
+        'create_exchange': Budget(5, 512),
+        'respond_exchange': Budget(4, 512),
+        'cancel_exchange': Budget(4, 512),
+        'list_exchanges': Budget(3, 4096),
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seed = seed_marketplace()
+        cls.user = cls.seed.users[0]
+
+    def setUp(self):
+        # Los intercambios notifican por correo: fuera del presupuesto de SQL
+        patcher = patch('comunications.services.email_service.EmailService.send_email', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_create_exchange(self):
+        self.assertWithinBudget('create_exchange', 'post', data={
+            "request_item": self.seed.publicaciones[-1].id,
+            "offered_item": self.seed.publicaciones[0].id,
+            "status": Exchange.Status.PENDING,
+        }, user=self.user, expected_status=status.HTTP_201_CREATED)
+
+    def test_respond_and_cancel_exchange(self):
+        exchange = Exchange.objects.filter(
+            offered_item__user=self.user, status=Exchange.Status.PENDING
+        ).first()
+        self.assertWithinBudget('respond_exchange', 'post', data={
+            "exchange_id": exchange.id, "status": Exchange.Status.ACCEPTED,
+        }, user=self.user)
+        self.assertWithinBudget('cancel_exchange', 'post', data={
+            "exchange_id": exchange.id, "reason": "Cambio de planes",
+        }, user=self.user)
+
+    def test_list_exchanges(self):
+        for params in ({"type": "offered"}, {"type": "requested", "status": "accepted"}, {"type": "offered", "stream": "1"}):
+            with self.subTest(params=params):
+                self.assertWithinBudget('list_exchanges', data=params, user=self.user)
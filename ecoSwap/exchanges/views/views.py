@@ -3,6 +3,7 @@ from rest_framework.permissions import IsAuthenticated
 from ..services.exchange_service import ExchangeService
 from rest_framework.response import Response
 from rest_framework import status
+from ecoSwap.streaming import streaming_json_response
 
 
 # Create your views here.
@@ -72,6 +73,10 @@ def list_exchanges(request):
     exchange_type = request.query_params.get("type", None)
     user = request.user
 
+    # ?stream=1 emite la lista por lotes con memoria constante (mismo JSON)
+    if request.query_params.get("stream") in ("1", "true"):
+        return streaming_json_response(ExchangeService.list_batches(user.email, st, exchange_type))
+
     exchanges = ExchangeService.list_exchanges(user.email, st, exchange_type)
 
     return Response(exchanges, status=status.HTTP_200_OK)
\ No newline at end of file
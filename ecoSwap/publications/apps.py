@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class PublicationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'publications'
+
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+        from .services.reference_cache import ReferenceCache
+
+        # Cualquier cambio en las tablas de referencia invalida su caché en todos los procesos
+        for model in ReferenceCache.MODELS:
+            post_save.connect(ReferenceCache.invalidate, sender=model, weak=False)
+            post_delete.connect(ReferenceCache.invalidate, sender=model, weak=False)
@@ -0,0 +1,68 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from ecoSwap.renderers import FastJSONRenderer
+from publications.models import Category, Publications, State
+from publications.serializers import PublicationsSerializer
+from publications.services.publications_service import PublicationsService
+from publications.services.row_serializer import PublicationRowSerializer
+from users.models import UserApp
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el costo por fila de los serializers de DRF contra la ruta rápida sobre .values(). "
+        "Crea publicaciones de prueba dentro de una transacción que se revierte al terminar"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000])
+        parser.add_argument('--repeat', type=int, default=3, help="Se reporta la mejor de N corridas")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = UserApp.objects.create(
+                email="benchmark@ecoswap.local", name="Benchmark", phone="0000000000", address="-"
+            )
+            categoria = Category.objects.create(nombre="Benchmark")
+            estado = State.objects.create(nombre="Benchmark")
+
+            created = 0
+            for rows in sorted(options['rows']):
+                Publications.objects.bulk_create([
+                    Publications(
+                        user=user, categoria=categoria, estado=estado,
+                        titulo=f"Publicación {i}", descripcion="Descripción de prueba", ubicacion="Bogotá",
+                    )
+                    for i in range(created, rows)
+                ], batch_size=1000)
+                created = rows
+
+                queryset = PublicationsService.read_queryset().filter(user=user).order_by('-fecha_publicacion', '-id')
+                self.report(rows, 'detalle', options['repeat'],
+                            lambda: JSONRenderer().render(
+                                PublicationsSerializer(queryset, many=True, context={'image_size': 160}).data),
+                            lambda: FastJSONRenderer().render(PublicationRowSerializer.details(
+                                PublicationRowSerializer.detail_values(queryset), image_size=160)))
+
+            transaction.set_rollback(True)
+
+    def report(self, rows, shape, repeat, drf, fast):
+        drf_seconds = self.best_of(drf, repeat)
+        fast_seconds = self.best_of(fast, repeat)
+        self.stdout.write(
+            f"{shape:8} {rows:>6} filas: DRF {drf_seconds / rows * 1e6:8.1f} µs/fila, "
+            f"rápida {fast_seconds / rows * 1e6:8.1f} µs/fila ({drf_seconds / fast_seconds:.1f}x)"
+        )
+
+    def best_of(self, fn, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
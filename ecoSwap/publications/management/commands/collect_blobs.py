@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from publications.services.blob_collection_service import BlobCollectionService
+
+
+class Command(BaseCommand):
+    help = (
+        "Borra los blobs de imágenes (originales y miniaturas) que ya no referencia ninguna "
+        "publicación, avatar ni derivada (programar periódicamente, p. ej. con cron)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age', type=int, default=BlobCollectionService.MIN_AGE_SECONDS,
+            help="Segundos que debe tener un blob sin referencias antes de borrarlo",
+        )
+        parser.add_argument('--dry-run', action='store_true', help="Solo informa lo que se borraría")
+
+    def handle(self, *args, **options):
+        derivadas, blobs, freed = BlobCollectionService.collect(options['min_age'], dry_run=options['dry_run'])
+        prefix = "Se borrarían" if options['dry_run'] else "Borrados"
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}: {derivadas} derivadas huérfanas, {blobs} blobs ({freed} bytes)"
+        ))
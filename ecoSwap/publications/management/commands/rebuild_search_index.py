@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from publications.services.search_service import SearchService
+from publications.services.trigram_service import TrigramService
+
+
+class Command(BaseCommand):
+    help = "Reconstruye los índices de búsqueda (texto completo y trigramas) de las publicaciones"
+
+    def handle(self, *args, **options):
+        SearchService.rebuild_index()
+        total = TrigramService.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Índice de trigramas reconstruido: {total} publicaciones"))
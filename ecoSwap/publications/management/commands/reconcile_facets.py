@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from publications.services.facet_service import FacetService
+
+
+class Command(BaseCommand):
+    help = "Recalcula los contadores de facetas de publicaciones (programar periódicamente, p. ej. con cron)"
+
+    def handle(self, *args, **options):
+        fixed = FacetService.reconcile()
+        self.stdout.write(self.style.SUCCESS(f"Contadores de facetas corregidos: {fixed}"))
@@ -0,0 +1,30 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ecoSwap.response_cache import cache_stats, reset_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Muestra aciertos y fallos del caché de respuestas por endpoint. "
+        "Con el backend 'locmem' cada proceso tiene sus propios contadores: usar 'file' o 'db' para verlos aquí"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help="Reinicia los contadores después de mostrarlos")
+
+    def handle(self, *args, **options):
+        # Importar las URLs registra los endpoints decorados con @cached_response
+        import_module(settings.ROOT_URLCONF)
+
+        for endpoint, stats in cache_stats().items():
+            self.stdout.write(
+                f"{endpoint}: {stats['hit']} aciertos, {stats['miss']} fallos "
+                f"({stats['hit_ratio']:.0%} de aciertos)"
+            )
+
+        if options['reset']:
+            reset_stats()
+            self.stdout.write(self.style.SUCCESS("Contadores reiniciados"))
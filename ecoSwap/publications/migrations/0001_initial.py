@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Condition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='State',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Publications',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('titulo', models.CharField(max_length=200)),
+                ('descripcion', models.TextField()),
+                ('ubicacion', models.CharField(max_length=200)),
+                ('fecha_publicacion', models.DateTimeField(auto_now_add=True)),
+                ('categoria', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='publications.category')),
+                ('condition', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='publications.condition')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='users.userapp')),
+                ('estado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='publications.state')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PublicationImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('imagen', models.TextField()),
+                ('fecha', models.DateTimeField(auto_now_add=True)),
+                ('publicacion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='imagenes', to='publications.publications')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='FavoritePublication',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='users.userapp')),
+                ('publicacion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='publications.publications')),
+            ],
+        ),
+    ]
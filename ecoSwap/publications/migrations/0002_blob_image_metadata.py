@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publicationimage',
+            name='content_type',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='publicationimage',
+            name='digest',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='publicationimage',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='publicationimage',
+            name='size',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='publicationimage',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='publicationimage',
+            name='imagen',
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publications', '0002_blob_image_metadata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageDerivative',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_digest', models.CharField(max_length=64)),
+                ('size', models.PositiveIntegerField()),
+                ('format', models.CharField(max_length=10)),
+                ('digest', models.CharField(max_length=64)),
+                ('content_type', models.CharField(max_length=100)),
+                ('byte_size', models.PositiveIntegerField()),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('fecha', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'unique_together': {('source_digest', 'size', 'format')},
+            },
+        ),
+    ]
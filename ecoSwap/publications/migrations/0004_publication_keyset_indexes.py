@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publications', '0003_image_derivatives'),
+        ('users', '0002_blob_image_metadata'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='publications',
+            index=models.Index(fields=['-fecha_publicacion', '-id'], name='pub_fecha_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='publications',
+            index=models.Index(fields=['categoria', '-fecha_publicacion', '-id'], name='pub_cat_fecha_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='publications',
+            index=models.Index(fields=['estado', '-fecha_publicacion', '-id'], name='pub_estado_fecha_id_idx'),
+        ),
+    ]
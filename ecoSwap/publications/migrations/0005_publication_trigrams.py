@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publications', '0004_publication_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publications',
+            name='titulo_normalizado',
+            field=models.CharField(blank=True, default='', max_length=200),
+        ),
+        migrations.CreateModel(
+            name='PublicationTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3)),
+                ('publicacion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trigramas', to='publications.publications')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['trigram', 'publicacion'], name='pub_trigram_idx')],
+                'unique_together': {('publicacion', 'trigram')},
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publications', '0005_publication_trigrams'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublicationFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('categoria_id', models.BigIntegerField()),
+                ('estado_id', models.BigIntegerField()),
+                ('condition_id', models.BigIntegerField(default=0)),
+                ('total', models.IntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('categoria_id', 'estado_id', 'condition_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publications', '0006_facet_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('stamp', models.CharField(max_length=32)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
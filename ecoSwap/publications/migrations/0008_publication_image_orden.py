@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publications', '0007_cache_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publicationimage',
+            name='orden',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='publicationimage',
+            index=models.Index(fields=['publicacion', 'orden', 'id'], name='pub_image_orden_idx'),
+        ),
+    ]
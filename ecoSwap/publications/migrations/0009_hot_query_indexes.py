@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:08
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remove_duplicate_favorites(apps, schema_editor):
+    """Conserva el favorito más antiguo de cada (user, publicacion) antes de exigir unicidad"""
+    FavoritePublication = apps.get_model('publications', 'FavoritePublication')
+    keep = (
+        FavoritePublication.objects.values('user_id', 'publicacion_id')
+        .annotate(first_id=Min('id'))
+        .values_list('first_id', flat=True)
+    )
+    FavoritePublication.objects.exclude(id__in=list(keep)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publications', '0008_publication_image_orden'),
+        ('users', '0002_blob_image_metadata'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='publications',
+            index=models.Index(fields=['user', '-fecha_publicacion', '-id'], name='pub_user_fecha_id_idx'),
+        ),
+        migrations.RunPython(remove_duplicate_favorites, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='favoritepublication',
+            constraint=models.UniqueConstraint(fields=('user', 'publicacion'), name='fav_user_publicacion_uniq'),
+        ),
+    ]
@@ -0,0 +1,85 @@
+from django.db import migrations
+
+
+FTS_TABLE = 'publications_search'
+MYSQL_FULLTEXT_INDEX = 'pub_fulltext_idx'
+
+# SQLite (tests y desarrollo local): tabla virtual FTS5 sincronizada con triggers.
+# IF NOT EXISTS: las bases donde la creó el antiguo receptor de post_migrate la conservan
+SQLITE_CREATE = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        titulo, descripcion,
+        content='publications_publications', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS publications_search_ai AFTER INSERT ON publications_publications BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, titulo, descripcion) VALUES (new.id, new.titulo, new.descripcion);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS publications_search_ad AFTER DELETE ON publications_publications BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, titulo, descripcion) VALUES ('delete', old.id, old.titulo, old.descripcion);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS publications_search_au AFTER UPDATE OF titulo, descripcion ON publications_publications BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, titulo, descripcion) VALUES ('delete', old.id, old.titulo, old.descripcion);
+        INSERT INTO {FTS_TABLE}(rowid, titulo, descripcion) VALUES (new.id, new.titulo, new.descripcion);
+    END
+    """,
+    # Indexa las publicaciones que ya existían (una sola vez, aquí)
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS publications_search_ai",
+    "DROP TRIGGER IF EXISTS publications_search_ad",
+    "DROP TRIGGER IF EXISTS publications_search_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def _mysql_index_exists(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() AND table_name = 'publications_publications' "
+            "AND index_name = %s",
+            [MYSQL_FULLTEXT_INDEX]
+        )
+        return bool(cursor.fetchone()[0])
+
+
+def create_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for statement in SQLITE_CREATE:
+            schema_editor.execute(statement)
+    elif vendor == 'mysql' and not _mysql_index_exists(schema_editor):
+        schema_editor.execute(
+            f"ALTER TABLE publications_publications "
+            f"ADD FULLTEXT INDEX {MYSQL_FULLTEXT_INDEX} (titulo, descripcion)"
+        )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for statement in SQLITE_DROP:
+            schema_editor.execute(statement)
+    elif vendor == 'mysql' and _mysql_index_exists(schema_editor):
+        schema_editor.execute(f"ALTER TABLE publications_publications DROP INDEX {MYSQL_FULLTEXT_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publications', '0009_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
@@ -19,17 +19,94 @@ class Publications(models.Model):
     descripcion = models.TextField()
     ubicacion = models.CharField(max_length=200)
     fecha_publicacion = models.DateTimeField(auto_now_add=True)
+    titulo_normalizado = models.CharField(max_length=200, blank=True, default='')  # Minúsculas y sin tildes, para búsqueda difusa
+
+    class Meta:
+        # Respaldan la paginación por cursor sobre (fecha_publicacion, id)
+        indexes = [
+            models.Index(fields=['-fecha_publicacion', '-id'], name='pub_fecha_id_idx'),
+            models.Index(fields=['categoria', '-fecha_publicacion', '-id'], name='pub_cat_fecha_id_idx'),
+            models.Index(fields=['estado', '-fecha_publicacion', '-id'], name='pub_estado_fecha_id_idx'),
+            # "Mis publicaciones": WHERE user_id = ? ORDER BY fecha_publicacion DESC, id DESC
+            models.Index(fields=['user', '-fecha_publicacion', '-id'], name='pub_user_fecha_id_idx'),
+        ]
+
+class PublicationTrigram(models.Model):
+    """Lista invertida de trigramas del título normalizado (búsqueda tolerante a errores)"""
+    publicacion = models.ForeignKey(
+        Publications,
+        related_name="trigramas",
+        on_delete=models.CASCADE
+    )
+    trigram = models.CharField(max_length=3)
+
+    class Meta:
+        unique_together = ('publicacion', 'trigram')
+        indexes = [
+            models.Index(fields=['trigram', 'publicacion'], name='pub_trigram_idx'),
+        ]
 
 class FavoritePublication(models.Model):
     user = models.ForeignKey(UserApp, on_delete=models.CASCADE)
     publicacion = models.ForeignKey(Publications, on_delete=models.CASCADE)
     fecha = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # Un favorito por pareja; el índice único también resuelve la búsqueda por (user, publicacion)
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'publicacion'], name='fav_user_publicacion_uniq'),
+        ]
+
 class PublicationImage(models.Model):
     publicacion = models.ForeignKey(
         Publications,
         related_name="imagenes",
         on_delete=models.CASCADE
     )
-    imagen = models.TextField()  # Almacena la imagen en base64
+    imagen = models.TextField(blank=True, null=True)  # Base64 heredado, las imágenes nuevas van al almacén de blobs
+    digest = models.CharField(max_length=64, blank=True, null=True, db_index=True)  # SHA-256 del contenido
+    content_type = models.CharField(max_length=100, blank=True, null=True)
+    size = models.PositiveIntegerField(blank=True, null=True)
+    width = models.PositiveIntegerField(blank=True, null=True)
+    height = models.PositiveIntegerField(blank=True, null=True)
+    orden = models.PositiveIntegerField(default=0)  # Posición en la galería; empates por id
     fecha = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['publicacion', 'orden', 'id'], name='pub_image_orden_idx'),
+        ]
+
+class ImageDerivative(models.Model):
+    """Versión redimensionada de un blob original (publicaciones y avatares)"""
+    source_digest = models.CharField(max_length=64)  # SHA-256 del original
+    size = models.PositiveIntegerField()  # Lado mayor en píxeles
+    format = models.CharField(max_length=10)  # webp / jpeg
+    digest = models.CharField(max_length=64)  # SHA-256 de la derivada
+    content_type = models.CharField(max_length=100)
+    byte_size = models.PositiveIntegerField()
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    fecha = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('source_digest', 'size', 'format')
+
+class PublicationFacetCount(models.Model):
+    """
+    Conteo de publicaciones por combinación (categoría, estado, condición).
+    Se mantiene de forma incremental y se reconcilia periódicamente.
+    """
+    categoria_id = models.BigIntegerField()
+    estado_id = models.BigIntegerField()
+    condition_id = models.BigIntegerField(default=0)  # 0 = sin condición
+    total = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('categoria_id', 'estado_id', 'condition_id')
+
+class CacheVersion(models.Model):
+    """Sello de versión compartido entre procesos para invalidar cachés locales"""
+    name = models.CharField(max_length=50, unique=True)
+    stamp = models.CharField(max_length=32)
+    updated_at = models.DateTimeField(auto_now=True)
@@ -1,5 +1,11 @@
+from django.urls import reverse
 from rest_framework import serializers
+from ecoSwap.fieldsets import DynamicFieldsMixin
 from .models import Publications, FavoritePublication, Category, State, PublicationImage, Condition
+from .services.image_service import ImageService
+from .services.derivative_service import DerivativeService
+
+DEFAULT_THUMBNAIL_SIZE = 480
 
 
 class ConditionSerializer(serializers.ModelSerializer):
@@ -24,12 +30,34 @@ class StateSerializer(serializers.ModelSerializer):
         fields = ['id', 'nombre']
 
 class PublicationImageSerializer(serializers.ModelSerializer):
+    imagen = serializers.SerializerMethodField()
+    url = serializers.SerializerMethodField()
+    thumbnail = serializers.SerializerMethodField()
+    derivatives = serializers.SerializerMethodField()
+
     class Meta:
         model = PublicationImage
-        fields = ['id', 'imagen', 'fecha']
+        fields = ['id', 'imagen', 'url', 'thumbnail', 'derivatives', 'content_type', 'size', 'width', 'height', 'fecha']
         read_only_fields = ['fecha']
 
-class PublicationsSerializer(serializers.ModelSerializer):
+    def get_url(self, obj):
+        return reverse('get_publication_image', args=[obj.id])
+
+    def get_thumbnail(self, obj):
+        # El tamaño depende del contexto: tarjetas de listado usan 160, el detalle 480 o 1080
+        size = self.context.get('image_size', DEFAULT_THUMBNAIL_SIZE)
+        return f"{self.get_url(obj)}?size={size}&format=webp"
+
+    def get_derivatives(self, obj):
+        return DerivativeService.urls(self.get_url(obj))
+
+    def get_imagen(self, obj):
+        # Filas heredadas guardan el base64 directamente en la columna
+        if not obj.digest:
+            return obj.imagen
+        return ImageService.read_data_uri(obj.digest, obj.content_type)
+
+class PublicationsSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     imagenes = PublicationImageSerializer(many=True, read_only=True)
 
     class Meta:
@@ -46,4 +74,4 @@ class PublicationsSerializer(serializers.ModelSerializer):
             'fecha_publicacion',
             'imagenes',
         ]
-        read_only_fields = ['id', 'fecha_publicacion']
\ No newline at end of file
+        read_only_fields = ['id', 'fecha_publicacion']
@@ -0,0 +1,148 @@
+import threading
+import time
+from bisect import bisect_left, insort
+from heapq import merge
+from itertools import islice, takewhile
+
+from django.conf import settings
+
+from ecoSwap.single_flight import flight
+
+from ..models import Category, Publications
+from .trigram_service import TrigramService
+
+
+class AutocompleteService:
+    """
+    Sugerencias de títulos y categorías mientras el usuario escribe.
+    El índice vive en memoria del proceso como arreglos ordenados de llaves
+    normalizadas, uno para las categorías y uno por categoría para los títulos;
+    cada consulta es una búsqueda binaria en cada arreglo más un recorrido corto,
+    sin tocar la base de datos. Cada título se indexa también desde cada una de
+    sus palabras, así "electr" sugiere "Bicicleta eléctrica".
+    """
+
+    CATEGORY = 'category'
+    PUBLICATION = 'publication'
+
+    # Entradas máximas que se recorren por consulta antes de ordenar (aparte para
+    # categorías y para títulos, así los títulos no dejan fuera a las categorías)
+    MAX_SCAN = 200
+
+    _lock = threading.RLock()
+    _buckets = None  # (tipo, categoria_id) -> [(llave, tipo, id, posición de la palabra, texto)] ordenado
+    _keys_by_item = {}  # (tipo, id) -> (bucket, [entrada, ...])
+    _built_at = 0.0
+
+    @classmethod
+    def _make_entries(cls, kind, item_id, text):
+        words = TrigramService.normalize(text).split()
+        return [
+            (' '.join(words[i:]), kind, item_id, i, text)
+            for i in range(len(words))
+        ]
+
+    @classmethod
+    def _bucket(cls, kind, categoria_id):
+        # Las categorías van todas en un mismo arreglo
+        return (kind, None if kind == cls.CATEGORY else categoria_id)
+
+    @classmethod
+    def rebuild(cls):
+        """Construye el índice completo desde la base de datos"""
+        buckets = {}
+        keys_by_item = {}
+        # (id, texto, categoria_id); para una categoría es su propio id
+        for kind, rows in (
+            (cls.CATEGORY, Category.objects.values_list('id', 'nombre', 'id')),
+            (cls.PUBLICATION, Publications.objects.values_list('id', 'titulo', 'categoria_id')),
+        ):
+            for item_id, text, categoria_id in rows.iterator():
+                bucket = cls._bucket(kind, categoria_id)
+                item_entries = cls._make_entries(kind, item_id, text)
+                keys_by_item[(kind, item_id)] = (bucket, item_entries)
+                buckets.setdefault(bucket, []).extend(item_entries)
+
+        for entries in buckets.values():
+            entries.sort()
+        with cls._lock:
+            cls._buckets = buckets
+            cls._keys_by_item = keys_by_item
+            cls._built_at = time.monotonic()
+
+    @classmethod
+    def _ensure_built(cls):
+        # Reconstrucción periódica para recoger cambios hechos por otros procesos.
+        # Una sola petición reconstruye; mientras tanto las demás usan el índice
+        # anterior, o esperan si todavía no existe.
+        max_age = settings.AUTOCOMPLETE_REBUILD_SECONDS
+        if cls._buckets is None:
+            flight.do('autocomplete-index', cls.rebuild)
+        elif time.monotonic() - cls._built_at > max_age:
+            flight.do('autocomplete-index', cls.rebuild, stale=None)
+
+    @classmethod
+    def update_item(cls, kind, item_id, text, categoria_id=None):
+        """Agrega o reemplaza un elemento del índice (llamado al crear/editar)"""
+        with cls._lock:
+            if cls._buckets is None:
+                # Aún no se ha construido: se construirá completo en la primera consulta
+                return
+
+            bucket, old_entries = cls._keys_by_item.pop((kind, item_id), (None, []))
+            entries = cls._buckets.get(bucket, [])
+            for entry in old_entries:
+                position = bisect_left(entries, entry)
+                if position < len(entries) and entries[position] == entry:
+                    del entries[position]
+
+            bucket = cls._bucket(kind, categoria_id)
+            entries = cls._buckets.setdefault(bucket, [])
+            item_entries = cls._make_entries(kind, item_id, text)
+            for entry in item_entries:
+                insort(entries, entry)
+            cls._keys_by_item[(kind, item_id)] = (bucket, item_entries)
+
+    @classmethod
+    def _scan(cls, entries, prefix):
+        """Entradas de un arreglo ordenado cuya llave empieza por prefix, en orden"""
+        start = bisect_left(entries, (prefix,))
+        return takewhile(lambda entry: entry[0].startswith(prefix), islice(entries, start, None))
+
+    @classmethod
+    def suggest(cls, query, limit=10, categoria_id=None):
+        """
+        Con categoria_id solo se sugieren títulos de esa categoría.
+        Returns:
+        [{"type": "category"|"publication", "id": ..., "text": ...}, ...]
+        Categorías primero, luego coincidencias al inicio del título y luego títulos más cortos.
+        """
+        prefix = TrigramService.normalize(query)
+        if not prefix:
+            return []
+
+        cls._ensure_built()
+        with cls._lock:
+            if categoria_id is not None:
+                titles = cls._scan(cls._buckets.get((cls.PUBLICATION, int(categoria_id)), []), prefix)
+                matches = list(islice(titles, cls.MAX_SCAN))
+            else:
+                categories = cls._scan(cls._buckets.get((cls.CATEGORY, None), []), prefix)
+                titles = merge(*(
+                    cls._scan(entries, prefix)
+                    for (kind, _), entries in cls._buckets.items() if kind == cls.PUBLICATION
+                ))
+                matches = list(islice(categories, cls.MAX_SCAN)) + list(islice(titles, cls.MAX_SCAN))
+
+        matches.sort(key=lambda e: (e[1] != cls.CATEGORY, e[3], len(e[4]), e[4]))
+
+        seen = set()
+        suggestions = []
+        for _, kind, item_id, _, text in matches:
+            if (kind, item_id) in seen:
+                continue
+            seen.add((kind, item_id))
+            suggestions.append({"type": kind, "id": item_id, "text": text})
+            if len(suggestions) >= limit:
+                break
+        return suggestions
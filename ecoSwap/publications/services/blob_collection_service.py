@@ -0,0 +1,77 @@
+import time
+
+from ecoSwap.blob_storage import get_blob_storage
+from users.models import ImagesUsers
+from ..models import ImageDerivative, PublicationImage
+
+
+class BlobCollectionService:
+    """
+    Recolección de blobs huérfanos. El almacén es direccionado por contenido y
+    varias filas pueden compartir un digest, así que borrar una imagen o un avatar
+    solo borra su fila; los blobs (y sus derivadas) que ya no referencia ninguna
+    fila de PublicationImage, ImagesUsers o ImageDerivative se borran aquí.
+    """
+
+    # Una subida guarda el blob antes de confirmar su fila: los blobs más recientes
+    # que esto se conservan aunque todavía no tengan referencias
+    MIN_AGE_SECONDS = 3600
+
+    @classmethod
+    def referenced_originals(cls):
+        """Querysets con los digests de originales que alguna fila usa"""
+        return (
+            PublicationImage.objects.filter(digest__isnull=False).values('digest'),
+            ImagesUsers.objects.filter(digest__isnull=False).values('digest'),
+        )
+
+    @classmethod
+    def orphan_derivatives(cls):
+        """Derivadas cuyo original ya no usa ninguna imagen ni avatar"""
+        publicaciones, avatares = cls.referenced_originals()
+        return ImageDerivative.objects.exclude(source_digest__in=publicaciones).exclude(source_digest__in=avatares)
+
+    @classmethod
+    def live_digests(cls):
+        publicaciones, avatares = cls.referenced_originals()
+        live = set(publicaciones.values_list('digest', flat=True))
+        live.update(avatares.values_list('digest', flat=True))
+        live.update(ImageDerivative.objects.values_list('digest', flat=True))
+        return live
+
+    @classmethod
+    def collect(cls, min_age_seconds=None, dry_run=False):
+        """
+        Borra las filas de derivadas huérfanas y luego los blobs sin referencias
+        con más de min_age_seconds.
+        Returns: (derivadas borradas, blobs borrados, bytes liberados)
+        """
+        min_age_seconds = cls.MIN_AGE_SECONDS if min_age_seconds is None else min_age_seconds
+        orphan_rows = cls.orphan_derivatives()
+        if dry_run:
+            derivadas = orphan_rows.count()
+            # Sin borrar las filas, sus blobs se cuentan como si ya no tuvieran referencia
+            orphan_blobs = set(orphan_rows.values_list('digest', flat=True))
+            live = cls.live_digests() - orphan_blobs
+        else:
+            derivadas, _ = orphan_rows.delete()
+            live = cls.live_digests()
+
+        storage = get_blob_storage()
+        cutoff = time.time() - min_age_seconds
+        blobs = freed = 0
+        for digest in list(storage.digests()):
+            if digest in live:
+                continue
+            try:
+                if storage.modified_time(digest) > cutoff:
+                    continue
+                size = storage.size(digest)
+            except FileNotFoundError:
+                continue
+            if not dry_run:
+                storage.delete(digest)
+            blobs += 1
+            freed += size
+
+        return derivadas, blobs, freed
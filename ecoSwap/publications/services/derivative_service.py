@@ -0,0 +1,141 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.db import connection
+from PIL import Image, ImageOps
+
+from ecoSwap.blob_storage import get_blob_storage
+from ..models import ImageDerivative
+
+
+# Escalera fija de tamaños (lado mayor en píxeles) y formatos de salida
+DERIVATIVE_SIZES = (160, 480, 1080)
+DERIVATIVE_FORMATS = {
+    'webp': ('WEBP', 'image/webp'),
+    'jpeg': ('JPEG', 'image/jpeg'),
+}
+DERIVATIVE_QUALITY = 82
+
+
+def render_derivatives(data: bytes):
+    """
+    Decodifica, redimensiona y codifica todas las derivadas de una imagen.
+    Corre dentro del pool de procesos: solo usa Pillow, nunca Django.
+    Returns:
+    [(size, format, bytes, width, height), ...]
+    """
+    with Image.open(BytesIO(data)) as original:
+        original = ImageOps.exif_transpose(original)
+        original.load()
+
+    results = []
+    for size in DERIVATIVE_SIZES:
+        # thumbnail() nunca amplía: imágenes pequeñas conservan su tamaño
+        resized = original.copy()
+        resized.thumbnail((size, size), Image.LANCZOS)
+
+        for fmt, (pil_format, _) in DERIVATIVE_FORMATS.items():
+            image = resized
+            if pil_format == 'JPEG' and image.mode != 'RGB':
+                # JPEG no soporta transparencia: se aplana sobre fondo blanco
+                background = Image.new('RGB', image.size, (255, 255, 255))
+                rgba = image.convert('RGBA')
+                background.paste(rgba, mask=rgba.getchannel('A'))
+                image = background
+            elif pil_format == 'WEBP' and image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA')
+
+            buffer = BytesIO()
+            image.save(buffer, format=pil_format, quality=DERIVATIVE_QUALITY)
+            results.append((size, fmt, buffer.getvalue(), image.width, image.height))
+
+    return results
+
+
+class DerivativeService:
+    """Genera y resuelve miniaturas de las imágenes guardadas en el almacén de blobs"""
+
+    _executor = None
+    _executor_lock = threading.Lock()
+
+    @classmethod
+    def get_executor(cls):
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ProcessPoolExecutor(max_workers=settings.IMAGE_DERIVATIVE_WORKERS)
+            return cls._executor
+
+    @classmethod
+    def schedule(cls, digest: str):
+        """
+        Programa la generación de derivadas de un blob.
+        Con IMAGE_DERIVATIVE_WORKERS = 0 se generan en línea (tests y desarrollo);
+        en otro caso el trabajo de CPU corre en el pool y la petición no espera.
+        """
+        if ImageDerivative.objects.filter(source_digest=digest).exists():
+            return
+
+        data = get_blob_storage().read(digest)
+
+        if not settings.IMAGE_DERIVATIVE_WORKERS:
+            cls.save_derivatives(digest, render_derivatives(data))
+            return
+
+        submitter = threading.get_ident()
+        future = cls.get_executor().submit(render_derivatives, data)
+
+        def on_done(done_future):
+            try:
+                cls.save_derivatives(digest, done_future.result())
+            except Exception as e:
+                print(f"Error generando derivadas de {digest}: {str(e)}")
+            finally:
+                # El callback corre en un hilo del executor con su propia conexión
+                if threading.get_ident() != submitter:
+                    connection.close()
+
+        future.add_done_callback(on_done)
+
+    @classmethod
+    def save_derivatives(cls, source_digest: str, results):
+        storage = get_blob_storage()
+        for size, fmt, data, width, height in results:
+            digest = storage.save(data)
+            # get_or_create tolera que otro proceso genere la misma derivada a la vez
+            ImageDerivative.objects.get_or_create(
+                source_digest=source_digest,
+                size=size,
+                format=fmt,
+                defaults={
+                    'digest': digest,
+                    'content_type': DERIVATIVE_FORMATS[fmt][1],
+                    'byte_size': len(data),
+                    'width': width,
+                    'height': height,
+                }
+            )
+
+    @classmethod
+    def resolve(cls, source_digest: str, size, fmt):
+        """Retorna la derivada pedida o None si no existe (todavía)"""
+        try:
+            size = int(size)
+        except (TypeError, ValueError):
+            return None
+
+        if size not in DERIVATIVE_SIZES or fmt not in DERIVATIVE_FORMATS:
+            return None
+
+        return ImageDerivative.objects.filter(
+            source_digest=source_digest, size=size, format=fmt
+        ).first()
+
+    @classmethod
+    def urls(cls, base_url: str) -> dict:
+        """URLs de la escalera completa para una imagen: {"160": {"webp": url, "jpeg": url}, ...}"""
+        return {
+            str(size): {fmt: f"{base_url}?size={size}&format={fmt}" for fmt in DERIVATIVE_FORMATS}
+            for size in DERIVATIVE_SIZES
+        }
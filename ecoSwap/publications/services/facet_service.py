@@ -0,0 +1,114 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from ..models import Category, Condition, PublicationFacetCount, Publications, State
+from .reference_cache import ReferenceCache
+
+
+class FacetService:
+    """
+    Conteos por faceta (categoría, estado, condición) servidos desde filas de
+    contadores en lugar de COUNT(*) GROUP BY sobre Publications. Cada fila cuenta
+    una combinación de las tres dimensiones, así los conteos de una faceta
+    pueden cruzarse con los filtros de las otras sumando pocas filas.
+    """
+
+    DIMENSIONS = {
+        'categoria': ('categoria_id', Category),
+        'estado': ('estado_id', State),
+        'condition': ('condition_id', Condition),
+    }
+
+    @classmethod
+    def key(cls, publicacion):
+        return (publicacion.categoria_id, publicacion.estado_id, publicacion.condition_id or 0)
+
+    @classmethod
+    def adjust(cls, key, delta):
+        """Suma delta al contador de la combinación, creándolo si no existe"""
+        categoria_id, estado_id, condition_id = key
+        filtro = {'categoria_id': categoria_id, 'estado_id': estado_id, 'condition_id': condition_id}
+
+        updated = PublicationFacetCount.objects.filter(**filtro).update(total=F('total') + delta)
+        if updated:
+            return
+
+        try:
+            with transaction.atomic():
+                PublicationFacetCount.objects.create(total=max(delta, 0), **filtro)
+        except IntegrityError:
+            # Otro proceso creó la fila al mismo tiempo
+            PublicationFacetCount.objects.filter(**filtro).update(total=F('total') + delta)
+
+    @classmethod
+    def publication_created(cls, publicacion):
+        cls.adjust(cls.key(publicacion), 1)
+
+    @classmethod
+    def publication_moved(cls, old_key, publicacion):
+        new_key = cls.key(publicacion)
+        if old_key != new_key:
+            cls.adjust(old_key, -1)
+            cls.adjust(new_key, 1)
+
+    @classmethod
+    def facets(cls, categoria_id=None, estado_id=None, condicion_id=None):
+        """
+        Conteos por faceta. Cada faceta se cruza con los filtros de las otras
+        dimensiones (no con el suyo), como en una navegación facetada.
+        Returns:
+        {"categoria": [{"id", "nombre", "count"}], "estado": [...], "condition": [...]}
+        """
+        selected = {
+            'categoria_id': categoria_id,
+            'estado_id': estado_id,
+            'condition_id': condicion_id,
+        }
+        result = {}
+        for name, (column, model) in cls.DIMENSIONS.items():
+            filtro = {k: v for k, v in selected.items() if v and k != column}
+            rows = (
+                PublicationFacetCount.objects.filter(**filtro)
+                .values(column)
+                .annotate(count=Sum('total'))
+                .filter(count__gt=0)
+                .order_by('-count', column)
+            )
+            counts = {row[column]: row['count'] for row in rows}
+            names = ReferenceCache.names(model, counts.keys())
+            result[name] = [
+                {"id": item_id or None, "nombre": names.get(item_id), "count": count}
+                for item_id, count in counts.items()
+            ]
+        return result
+
+    @classmethod
+    def reconcile(cls):
+        """
+        Recalcula todos los contadores desde Publications para corregir desvíos.
+        Returns: número de combinaciones corregidas
+        """
+        actual = {
+            (row['categoria_id'], row['estado_id'], row['condition_id'] or 0): row['total']
+            for row in Publications.objects.values('categoria_id', 'estado_id', 'condition_id')
+            .annotate(total=Count('id')).order_by()
+        }
+
+        fixed = 0
+        with transaction.atomic():
+            stored = {
+                (row.categoria_id, row.estado_id, row.condition_id): row
+                for row in PublicationFacetCount.objects.select_for_update()
+            }
+            for key, row in stored.items():
+                total = actual.pop(key, 0)
+                if row.total != total:
+                    row.total = total
+                    row.save(update_fields=['total'])
+                    fixed += 1
+            PublicationFacetCount.objects.bulk_create([
+                PublicationFacetCount(categoria_id=c, estado_id=e, condition_id=k, total=total)
+                for (c, e, k), total in actual.items()
+            ])
+            fixed += len(actual)
+        return fixed
@@ -0,0 +1,148 @@
+import base64
+from io import BytesIO
+
+from PIL import Image
+
+from ecoSwap.blob_storage import get_blob_storage
+from .derivative_service import DerivativeService
+
+
+class ImageService:
+    """Ingesta de imágenes hacia el almacén de blobs"""
+
+    # Límite de tamaño por imagen (10MB)
+    MAX_IMAGE_SIZE = 10 * 1024 * 1024
+
+    # Firmas base64 de los formatos más comunes
+    BASE64_SIGNATURES = {
+        'iVBOR': 'image/png',
+        '/9j/': 'image/jpeg',
+        'R0lGOD': 'image/gif',
+        'UklGR': 'image/webp',
+    }
+
+    @classmethod
+    def decode(cls, img):
+        """
+        Convierte una imagen recibida (archivo de FormData o cadena base64)
+        en (bytes, content_type).
+        Lanza ValueError si el formato no es válido.
+        Returns:
+        (data, content_type, error_message)
+        """
+        # Si es un archivo (desde FormData)
+        if hasattr(img, 'read'):
+            data = img.read()
+            if len(data) > cls.MAX_IMAGE_SIZE:
+                return None, None, "La imagen es demasiado grande. Tamaño máximo: 10MB"
+            content_type = getattr(img, 'content_type', None) or 'image/jpeg'
+            return data, content_type, None
+
+        # Si es una cadena base64 (con o sin prefijo data:)
+        if isinstance(img, str):
+            # Validar tamaño aproximado de la cadena (base64 aumenta ~33% el tamaño)
+            if len(img) > cls.MAX_IMAGE_SIZE * 1.5:
+                return None, None, "La imagen es demasiado grande. Tamaño máximo: 10MB"
+
+            if img.startswith('data:'):
+                header, _, payload = img.partition(',')
+                if ';base64' not in header:
+                    raise ValueError("Formato de imagen inválido")
+                content_type = header[5:].split(';')[0] or 'image/jpeg'
+            else:
+                payload = img
+                content_type = 'image/png'
+                for signature, mime in cls.BASE64_SIGNATURES.items():
+                    if img.startswith(signature):
+                        content_type = mime
+                        break
+
+            try:
+                data = base64.b64decode(payload, validate=True)
+            except ValueError:
+                raise ValueError("Formato de imagen inválido")
+
+            if len(data) > cls.MAX_IMAGE_SIZE:
+                return None, None, "La imagen es demasiado grande. Tamaño máximo: 10MB"
+            return data, content_type, None
+
+        raise ValueError("Formato de imagen inválido")
+
+    @classmethod
+    def dimensions(cls, data: bytes):
+        """Retorna (ancho, alto) o (None, None) si Pillow no reconoce el formato"""
+        try:
+            with Image.open(BytesIO(data)) as image:
+                return image.size
+        except Exception:
+            return None, None
+
+    @classmethod
+    def store(cls, data: bytes, content_type: str) -> dict:
+        """
+        Guarda los bytes en el almacén de blobs, programa sus miniaturas
+        y retorna los metadatos que se persisten en la fila de la imagen.
+        """
+        digest = get_blob_storage().save(data)
+        width, height = cls.dimensions(data)
+
+        # Solo las imágenes que Pillow reconoce tienen miniaturas
+        if width is not None:
+            try:
+                DerivativeService.schedule(digest)
+            except Exception as e:
+                print(f"Error programando derivadas: {str(e)}")
+
+        return {
+            'digest': digest,
+            'content_type': content_type,
+            'size': len(data),
+            'width': width,
+            'height': height,
+        }
+
+    @classmethod
+    def ingest(cls, img):
+        """
+        Decodifica y guarda una imagen.
+        Lanza ValueError si el formato no es válido.
+        Returns:
+        (metadata, error_message)
+        """
+        data, content_type, error = cls.decode(img)
+        if error:
+            return None, error
+        return cls.store(data, content_type), None
+
+    @classmethod
+    def decode_all(cls, imagenes):
+        """
+        Valida y decodifica todas las imágenes antes de escribir nada.
+        Las cadenas sin base64 y los formatos inválidos se omiten; una imagen
+        demasiado grande rechaza todo el lote.
+        Returns:
+        ([(data, content_type), ...], error_message)
+        """
+        if not isinstance(imagenes, list):
+            imagenes = [imagenes]
+
+        decoded = []
+        for img in imagenes:
+            # Las cadenas sin base64 no son imágenes válidas
+            if isinstance(img, str) and 'base64' not in img:
+                continue
+            try:
+                data, content_type, error = cls.decode(img)
+            except ValueError as e:
+                print(f"Error procesando imagen: {str(e)}")
+                continue
+            if error:
+                return None, error
+            decoded.append((data, content_type))
+        return decoded, None
+
+    @classmethod
+    def read_data_uri(cls, digest: str, content_type: str) -> str:
+        """Reconstruye el data-URI base64 de un blob (compatibilidad con clientes antiguos)"""
+        data = get_blob_storage().read(digest)
+        return f"data:{content_type};base64,{base64.b64encode(data).decode('utf-8')}"
@@ -0,0 +1,112 @@
+import base64
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+
+
+class CursorPaginationService:
+    """
+    Paginación por llave (keyset) sobre (fecha_publicacion, id), de la más reciente
+    a la más antigua. Cada página filtra con WHERE sobre el índice compuesto en lugar
+    de usar OFFSET, así la página N cuesta lo mismo que la primera.
+    """
+
+    ORDERING = ('-fecha_publicacion', '-id')
+
+    @classmethod
+    def encode_payload(cls, payload: dict) -> str:
+        """Serializa una posición como cursor opaco (base64 url-safe)"""
+        raw = json.dumps(payload, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+    @classmethod
+    def decode_payload(cls, cursor: str):
+        """Returns: dict con la posición o None si el cursor no es válido"""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        except ValueError:
+            return None
+        return payload if isinstance(payload, dict) else None
+
+    @classmethod
+    def encode_cursor(cls, publicacion) -> str:
+        """publicacion: instancia o diccionario de .values()"""
+        if isinstance(publicacion, dict):
+            fecha, pub_id = publicacion['fecha_publicacion'], publicacion['id']
+        else:
+            fecha, pub_id = publicacion.fecha_publicacion, publicacion.id
+        return cls.encode_payload({'f': fecha.isoformat(), 'i': pub_id})
+
+    @classmethod
+    def decode_cursor(cls, cursor: str):
+        """Returns: (fecha, id) o None si el cursor no es válido"""
+        payload = cls.decode_payload(cursor)
+        try:
+            return datetime.fromisoformat(payload['f']), int(payload['i'])
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    @classmethod
+    def page_size(cls, limit) -> int:
+        """Tamaño de página pedido, acotado a PUBLICATIONS_MAX_PAGE_SIZE"""
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            return settings.PUBLICATIONS_PAGE_SIZE
+        return max(1, min(limit, settings.PUBLICATIONS_MAX_PAGE_SIZE))
+
+    @classmethod
+    def paginate(cls, queryset, cursor=None, limit=None):
+        """
+        Returns:
+        (success, (items, next_cursor) o mensaje de error)
+        """
+        size = cls.page_size(limit)
+        queryset = queryset.order_by(*cls.ORDERING)
+
+        if cursor:
+            position = cls.decode_cursor(cursor)
+            if position is None:
+                return False, "Cursor inválido."
+            queryset = cls._after(queryset, *position)
+
+        # Se pide un elemento de más para saber si hay página siguiente
+        items = list(queryset[:size + 1])
+        next_cursor = None
+        if len(items) > size:
+            items = items[:size]
+            next_cursor = cls.encode_cursor(items[-1])
+
+        return True, (items, next_cursor)
+
+    @classmethod
+    def _after(cls, queryset, fecha, pub_id):
+        return queryset.filter(
+            Q(fecha_publicacion__lt=fecha) | Q(fecha_publicacion=fecha, id__lt=pub_id)
+        )
+
+    @classmethod
+    def iterate(cls, queryset, chunk_size):
+        """
+        Recorre todo el queryset en lotes de chunk_size con el mismo orden y la
+        misma condición por llave que las páginas. Cada lote es una consulta
+        independiente, así la memoria no depende del total de filas (a diferencia
+        de .iterator(), que en MySQL trae el resultado completo al cliente).
+        Yields: listas de elementos
+        """
+        queryset = queryset.order_by(*cls.ORDERING)
+        page = queryset
+        while True:
+            items = list(page[:chunk_size])
+            if items:
+                yield items
+            if len(items) < chunk_size:
+                return
+            last = items[-1]
+            if isinstance(last, dict):
+                page = cls._after(queryset, last['fecha_publicacion'], last['id'])
+            else:
+                page = cls._after(queryset, last.fecha_publicacion, last.id)
@@ -1,10 +1,21 @@
-import base64
-from django.core.files.base import ContentFile
-import uuid
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch
 from django.utils import timezone
 from publications.models import Publications, UserApp, Category, State, PublicationImage, Condition
 from django.utils import timezone
 from ..models import Publications, FavoritePublication
+from ..serializers import DEFAULT_THUMBNAIL_SIZE
+from .image_service import ImageService
+from .pagination_service import CursorPaginationService
+from .search_service import SearchService
+from .trigram_service import TrigramService
+from .autocomplete_service import AutocompleteService
+from .facet_service import FacetService
+from .reference_cache import ReferenceCache
+from .row_serializer import PublicationRowSerializer
+from ecoSwap.fieldsets import parse_fieldset
+from ecoSwap.response_cache import bump_generation
 
 
 class PublicationsService:
@@ -18,86 +29,58 @@ class PublicationsService:
         except UserApp.DoesNotExist:
             return False, "El usuario no existe.", None
 
-        # Validar categoría
-        try:
-            categoria = Category.objects.get(id=categoria_id)
-        except Category.DoesNotExist:
+        # Validar categoría (tablas de referencia servidas desde la caché en memoria)
+        categoria = ReferenceCache.get(Category, categoria_id)
+        if not categoria:
             return False, "La categoría no existe.", None
 
         # Validar estado
-        try:
-            estado = State.objects.get(id=estado_id)
-        except State.DoesNotExist:
+        estado = ReferenceCache.get(State, estado_id)
+        if not estado:
             return False, "El estado no existe.", None
         
         # Validar condicion (puede ser None)
         condition = None
         if condicion_id:
-            try:
-                condition = Condition.objects.get(id=condicion_id)
-            except Condition.DoesNotExist:
+            condition = ReferenceCache.get(Condition, condicion_id)
+            if not condition:
                 return False, "La condición no existe.", None
 
-        # Crear publicación
-        publicacion = Publications.objects.create(
-            user=user,
-            categoria=categoria,
-            estado=estado,
-            condition=condition,
-            titulo=titulo,
-            descripcion=descripcion,
-            ubicacion=ubicacion,
-            fecha_publicacion=timezone.now()
+        # Validar y decodificar todas las imágenes antes de escribir nada
+        decoded, error = ImageService.decode_all(imagenes) if imagenes else ([], None)
+        if error:
+            return False, error, None
+
+        # Los blobs se direccionan por contenido: guardarlos antes de la transacción
+        # no deja estados a medias (un blob huérfano es inofensivo y se reutiliza)
+        metadata = [ImageService.store(data, content_type) for data, content_type in decoded]
+
+        with transaction.atomic():
+            publicacion = Publications.objects.create(
+                user=user,
+                categoria=categoria,
+                estado=estado,
+                condition=condition,
+                titulo=titulo,
+                titulo_normalizado=TrigramService.normalize(titulo),
+                descripcion=descripcion,
+                ubicacion=ubicacion,
+                fecha_publicacion=timezone.now()
+            )
+            # Todas las imágenes en un solo INSERT
+            PublicationImage.objects.bulk_create([
+                PublicationImage(publicacion=publicacion, orden=orden, **meta)
+                for orden, meta in enumerate(metadata)
+            ])
+
+            # Índice de trigramas para la búsqueda tolerante a errores y contadores de facetas
+            TrigramService.index_publication(publicacion)
+            FacetService.publication_created(publicacion)
+
+        AutocompleteService.update_item(
+            AutocompleteService.PUBLICATION, publicacion.id, titulo, publicacion.categoria_id
         )
-
-        # Guardar imágenes si existen
-        if imagenes:
-            # Validar que sea una lista
-            if not isinstance(imagenes, list):
-                imagenes = [imagenes]
-            
-            # Límite de tamaño por imagen (10MB en base64)
-            MAX_IMAGE_SIZE = 10 * 1024 * 1024  # 10MB
-            
-            for img in imagenes:
-                try:
-                    # Si es un archivo (desde FormData), convertir a base64
-                    if hasattr(img, 'read'):
-                        img_data = img.read()
-                        
-                        # Validar tamaño
-                        if len(img_data) > MAX_IMAGE_SIZE:
-                            publicacion.delete()  # Eliminar publicación si hay error
-                            return False, f"La imagen es demasiado grande. Tamaño máximo: 10MB", None
-                        
-                        img_base64 = base64.b64encode(img_data).decode('utf-8')
-                        # Determinar el tipo MIME
-                        content_type = img.content_type if hasattr(img, 'content_type') else 'image/jpeg'
-                        img_base64_string = f"data:{content_type};base64,{img_base64}"
-                        
-                        PublicationImage.objects.create(
-                            publicacion=publicacion,
-                            imagen=img_base64_string
-                        )
-                    # Si ya es una cadena base64
-                    elif isinstance(img, str):
-                        # Validar que contenga base64
-                        if 'base64' not in img:
-                            continue  # Saltar imágenes inválidas
-                        
-                        # Validar tamaño aproximado de la cadena
-                        if len(img) > MAX_IMAGE_SIZE * 1.5:  # Base64 aumenta ~33% el tamaño
-                            publicacion.delete()  # Eliminar publicación si hay error
-                            return False, f"La imagen es demasiado grande. Tamaño máximo: 10MB", None
-                        
-                        PublicationImage.objects.create(
-                            publicacion=publicacion,
-                            imagen=img
-                        )
-                except Exception as img_error:
-                    # Log del error
-                    print(f"Error procesando imagen: {str(img_error)}")
-                    continue
+        cls.invalidate_responses(publicacion.id, publicacion.categoria_id)
 
         return True, "Publicación creada correctamente.", publicacion.id
 
@@ -112,33 +95,51 @@ class PublicationsService:
         descripcion=None, 
         ubicacion=None,
         condicion_id=None, 
-        nuevas_imagenes=None
+        nuevas_imagenes=None,
+        agregar_imagenes=None,
+        eliminar_imagenes=None,
+        orden_imagenes=None
     ):
+        """
+        nuevas_imagenes reemplaza la galería completa. Para ediciones parciales:
+        agregar_imagenes: imágenes nuevas (base64/archivos) que van al final
+        eliminar_imagenes: ids de imágenes de la publicación a borrar
+        orden_imagenes: ids en el orden deseado; las no listadas conservan su
+        orden relativo después de ellas
+        Solo se escriben las filas que cambian.
+        """
+        delta = any(value is not None for value in (agregar_imagenes, eliminar_imagenes, orden_imagenes))
+        if delta and nuevas_imagenes is not None:
+            return False, "No se puede reemplazar la galería y editarla parcialmente a la vez."
+
         try:
             publicacion = Publications.objects.get(id=pub_id)
         except Publications.DoesNotExist:
             return False, "La publicación no existe."
 
+        facet_key = FacetService.key(publicacion)
+
         if categoria_id:
-            try:
-                publicacion.categoria = Category.objects.get(id=categoria_id)
-            except Category.DoesNotExist:
+            categoria = ReferenceCache.get(Category, categoria_id)
+            if not categoria:
                 return False, "La categoría no existe."
+            publicacion.categoria = categoria
 
         if estado_id:
-            try:
-                publicacion.estado = State.objects.get(id=estado_id)
-            except State.DoesNotExist:
+            estado = ReferenceCache.get(State, estado_id)
+            if not estado:
                 return False, "El estado no existe."
+            publicacion.estado = estado
         
         if condicion_id:
-            try:
-                publicacion.condition = Condition.objects.get(id=condicion_id)
-            except Condition.DoesNotExist:
+            condition = ReferenceCache.get(Condition, condicion_id)
+            if not condition:
                 return False, "La condición no existe."
+            publicacion.condition = condition
 
         if titulo:
             publicacion.titulo = titulo
+            publicacion.titulo_normalizado = TrigramService.normalize(titulo)
 
         if descripcion:
             publicacion.descripcion = descripcion
@@ -146,83 +147,286 @@ class PublicationsService:
         if ubicacion:
             publicacion.ubicacion = ubicacion
 
-        publicacion.save()
-
-        # Reemplazar imágenes existentes
-        if nuevas_imagenes is not None:
-            try:
-                # Eliminar imágenes actuales
+        # Validar las imágenes nuevas antes de tocar la publicación
+        metadata = None
+        imagenes = nuevas_imagenes if nuevas_imagenes is not None else agregar_imagenes
+        if imagenes is not None:
+            decoded, error = ImageService.decode_all(imagenes)
+            if error:
+                return False, error
+            metadata = [ImageService.store(data, content_type) for data, content_type in decoded]
+
+        cambios = None
+        if delta:
+            success, cambios = cls._image_delta(publicacion.id, eliminar_imagenes, orden_imagenes)
+            if not success:
+                return False, cambios
+
+        with transaction.atomic():
+            publicacion.save()
+            FacetService.publication_moved(facet_key, publicacion)
+
+            if titulo:
+                TrigramService.index_publication(publicacion)
+
+            if nuevas_imagenes is not None:
+                # Reemplazar imágenes existentes: un DELETE y un INSERT
                 PublicationImage.objects.filter(publicacion=publicacion).delete()
+                siguiente = 0
+            elif cambios is not None:
+                eliminar, reordenar, siguiente = cambios
+                if eliminar:
+                    PublicationImage.objects.filter(publicacion=publicacion, id__in=eliminar).delete()
+                if reordenar:
+                    PublicationImage.objects.bulk_update(reordenar, ['orden'])
+
+            if metadata:
+                PublicationImage.objects.bulk_create([
+                    PublicationImage(publicacion=publicacion, orden=siguiente + i, **meta)
+                    for i, meta in enumerate(metadata)
+                ])
+
+        # El índice de autocompletado agrupa los títulos por categoría
+        if titulo or publicacion.categoria_id != facet_key[0]:
+            AutocompleteService.update_item(
+                AutocompleteService.PUBLICATION, publicacion.id, publicacion.titulo, publicacion.categoria_id
+            )
 
-                # Validar que sea una lista
-                if not isinstance(nuevas_imagenes, list):
-                    nuevas_imagenes = [nuevas_imagenes]
-
-                # Límite de tamaño por imagen (10MB en base64)
-                MAX_IMAGE_SIZE = 10 * 1024 * 1024  # 10MB
-
-                for img in nuevas_imagenes:
-                    try:
-                        # Si es un archivo (desde FormData), convertir a base64
-                        if hasattr(img, 'read'):
-                            img_data = img.read()
-                            
-                            # Validar tamaño
-                            if len(img_data) > MAX_IMAGE_SIZE:
-                                return False, f"La imagen es demasiado grande. Tamaño máximo: 10MB"
-                            
-                            img_base64 = base64.b64encode(img_data).decode('utf-8')
-                            content_type = img.content_type if hasattr(img, 'content_type') else 'image/jpeg'
-                            img_base64_string = f"data:{content_type};base64,{img_base64}"
-                            
-                            PublicationImage.objects.create(
-                                publicacion=publicacion,
-                                imagen=img_base64_string
-                            )
-                        # Si ya es una cadena base64
-                        elif isinstance(img, str):
-                            # Validar que contenga base64
-                            if 'base64' not in img:
-                                continue  # Saltar imágenes inválidas
-                            
-                            # Validar tamaño aproximado de la cadena
-                            if len(img) > MAX_IMAGE_SIZE * 1.5:  # Base64 aumenta ~33% el tamaño
-                                return False, f"La imagen es demasiado grande. Tamaño máximo: 10MB"
-                            
-                            PublicationImage.objects.create(
-                                publicacion=publicacion,
-                                imagen=img
-                            )
-                    except Exception as img_error:
-                        # Log del error pero continuar con otras imágenes
-                        print(f"Error procesando imagen: {str(img_error)}")
-                        continue
-                        
-            except Exception as e:
-                return False, f"Error al procesar las imágenes: {str(e)}"
+        # facet_key[0] es la categoría anterior: ambos listados cambian si se movió
+        cls.invalidate_responses(publicacion.id, facet_key[0], publicacion.categoria_id)
 
         return True, "Publicación actualizada correctamente."
+
+    @classmethod
+    def _image_ids(cls, values):
+        """Lista de ids enteros, o None si alguno no es un número"""
+        try:
+            return [int(value) for value in values]
+        except (TypeError, ValueError):
+            return None
+
+    @classmethod
+    def _image_delta(cls, pub_id, eliminar_imagenes, orden_imagenes):
+        """
+        Valida una edición parcial de la galería contra las imágenes actuales
+        (solo ids y posiciones, sin leer el contenido).
+        Returns:
+        (True, (ids a borrar, imágenes con su nueva posición, primera posición libre))
+        o (False, mensaje de error)
+        """
+        actuales = list(
+            PublicationImage.objects.filter(publicacion_id=pub_id)
+            .order_by('orden', 'id')
+            .values_list('id', 'orden')
+        )
+        ids = [image_id for image_id, _ in actuales]
+
+        eliminar = cls._image_ids(eliminar_imagenes or [])
+        orden = cls._image_ids(orden_imagenes or [])
+        if eliminar is None or orden is None:
+            return False, "Los ids de imagen deben ser números."
+
+        eliminar_set, orden_set = set(eliminar), set(orden)
+        ajenas = eliminar_set - set(ids)
+        if ajenas:
+            return False, f"Las imágenes {sorted(ajenas)} no pertenecen a la publicación."
+
+        restantes = [image_id for image_id in ids if image_id not in eliminar_set]
+        if len(orden_set) != len(orden):
+            return False, "El orden de imágenes tiene ids repetidos."
+        ajenas = orden_set - set(restantes)
+        if ajenas:
+            return False, f"Las imágenes {sorted(ajenas)} no pertenecen a la publicación."
+
+        reordenar = []
+        if orden:
+            # Posiciones 0..n-1 y solo se actualizan las filas que cambian
+            restantes = orden + [image_id for image_id in restantes if image_id not in orden_set]
+            posicion_actual = dict(actuales)
+            reordenar = [
+                PublicationImage(id=image_id, orden=posicion)
+                for posicion, image_id in enumerate(restantes)
+                if posicion_actual[image_id] != posicion
+            ]
+            siguiente = len(restantes)
+        else:
+            # Sin reordenar las posiciones pueden tener huecos: borrar no renumera
+            siguiente = max((posicion for image_id, posicion in actuales if image_id not in eliminar_set), default=-1) + 1
+
+        return True, (eliminar, reordenar, siguiente)
+
+    @classmethod
+    def invalidate_responses(cls, pub_id, *categoria_ids):
+        """
+        Invalida las respuestas cacheadas que muestran esta publicación. También se
+        llama al agregar o quitar favoritos: hoy ninguna respuesta cacheada incluye
+        favoritos, pero así no queda vieja la primera que los incluya.
+        """
+        bump_generation(
+            'publications:list',
+            f'publications:detail:{pub_id}',
+            *{f'publications:category:{categoria_id}' for categoria_id in categoria_ids},
+        )
     
+    @classmethod
+    def read_queryset(cls):
+        """
+        Queryset compartido por todas las lecturas de publicaciones: trae las
+        relaciones con JOIN y las imágenes en una sola consulta adicional, así
+        una página cuesta un número constante de consultas sin importar su tamaño.
+        """
+        imagenes = PublicationImage.objects.only(
+            'id', 'publicacion_id', 'imagen', 'digest', 'content_type', 'size', 'width', 'height', 'fecha'
+        ).order_by('orden', 'id')
+
+        return Publications.objects.select_related(
+            'user', 'categoria', 'estado', 'condition'
+        ).defer(
+            # Columnas anchas del usuario que ninguna lectura de publicaciones usa
+            'user__password',
+        ).prefetch_related(
+            Prefetch('imagenes', queryset=imagenes)
+        )
+
     @classmethod
     def list_publications(cls, estado_id=None):
-        publicaciones = Publications.objects.all()
+        publicaciones = cls.read_queryset()
 
         if estado_id:
             publicaciones = publicaciones.filter(estado_id=estado_id)
 
         return True, publicaciones
 
+    @classmethod
+    def fieldset(cls, query_params, full=False, resource=None):
+        """
+        Campos pedidos con ?fields= y ?expand= (o fields[resource]=, expand[resource]=).
+        Sin ?fields= se usa la tarjeta, o el detalle completo con full=True.
+        Returns: (campos, expandidos). Raises: FieldsetError
+        """
+        return parse_fieldset(
+            query_params,
+            PublicationRowSerializer.FIELDS,
+            PublicationRowSerializer.DETAIL_FIELDS if full else PublicationRowSerializer.CARD_FIELDS,
+            PublicationRowSerializer.EXPANDABLE,
+            resource,
+        )
+
+    @classmethod
+    def _fields(cls, full, fields):
+        if fields is not None:
+            return fields
+        return PublicationRowSerializer.DETAIL_FIELDS if full else PublicationRowSerializer.CARD_FIELDS
+
+    @classmethod
+    def serialize_list(cls, publicaciones, full=False, fields=None, expand=()):
+        """
+        Serializa un listado de publicaciones. Por defecto usa la tarjeta ligera;
+        con full=True conserva la representación completa con imágenes, y con
+        fields solo esos campos (y solo sus columnas en el SQL).
+        Usa la ruta rápida sobre .values() (misma salida que los serializers de DRF).
+        """
+        fields = cls._fields(full, fields)
+        rows = PublicationRowSerializer.values(publicaciones, fields)
+        return PublicationRowSerializer.serialize(rows, fields, expand)
+
+    @classmethod
+    def list_page(cls, publicaciones, cursor=None, limit=None, full=False, fields=None, expand=()):
+        """
+        Serializa una página del catálogo usando paginación por cursor.
+        Returns:
+        (success, (data, next_cursor) o mensaje de error)
+        """
+        fields = cls._fields(full, fields)
+        rows = PublicationRowSerializer.values(publicaciones, fields)
+
+        success, page = CursorPaginationService.paginate(rows, cursor, limit)
+        if not success:
+            return False, page
+
+        items, next_cursor = page
+        return True, (PublicationRowSerializer.serialize(items, fields, expand), next_cursor)
+
+    @classmethod
+    def list_batches(cls, publicaciones, full=False, chunk_size=None, fields=None, expand=()):
+        """
+        Recorre el listado completo en lotes serializados (para respuestas en streaming).
+        Yields: listas de publicaciones serializadas, en el orden del catálogo
+        """
+        chunk_size = chunk_size or settings.PUBLICATIONS_STREAM_CHUNK_SIZE
+        fields = cls._fields(full, fields)
+        rows = PublicationRowSerializer.values(publicaciones, fields)
+
+        for batch in CursorPaginationService.iterate(rows, chunk_size):
+            yield PublicationRowSerializer.serialize(batch, fields, expand)
+
+    @classmethod
+    def search_publications(cls, query, categoria_id=None, estado_id=None, condicion_id=None, cursor=None, limit=None, mode=None):
+        """
+        Búsqueda ordenada por relevancia, serializada como tarjetas.
+        Returns:
+        (success, (data, next_cursor) o mensaje de error)
+        """
+        success, result = SearchService.search(query, categoria_id, estado_id, condicion_id, cursor, limit, mode)
+        if not success:
+            return False, result
+
+        ids, next_cursor = result
+        rows = PublicationRowSerializer.card_values(Publications.objects.filter(id__in=ids))
+        por_id = {row['id']: row for row in rows}
+        publicaciones = [por_id[pub_id] for pub_id in ids if pub_id in por_id]
+        return True, (PublicationRowSerializer.cards(publicaciones), next_cursor)
+
+    @classmethod
+    def autocomplete(cls, query, limit=None, categoria_id=None):
+        """Sugerencias de títulos y categorías servidas desde el índice en memoria"""
+        if categoria_id and not str(categoria_id).isdigit():
+            return False, "Los filtros deben ser números."
+        try:
+            limit = max(1, min(int(limit), 20))
+        except (TypeError, ValueError):
+            limit = 10
+        return True, AutocompleteService.suggest(query, limit, categoria_id or None)
+
+    @classmethod
+    def facets(cls, categoria_id=None, estado_id=None, condicion_id=None):
+        for value in (categoria_id, estado_id, condicion_id):
+            if value and not str(value).isdigit():
+                return False, "Los filtros deben ser números."
+        return True, FacetService.facets(categoria_id, estado_id, condicion_id)
+
     @classmethod
     def get_publication(cls, pub_id):
         try:
-            publicacion = Publications.objects.get(id=pub_id)
+            publicacion = cls.read_queryset().get(id=pub_id)
             return True, publicacion
         except Publications.DoesNotExist:
             return False, "La publicación no existe."
     
+    @classmethod
+    def get_publication_data(cls, pub_id, fields=None, expand=()):
+        """
+        Detalle serializado por la ruta rápida (igual a PublicationsSerializer).
+        Returns: (success, data o mensaje de error)
+        """
+        fields = cls._fields(True, fields)
+        rows = PublicationRowSerializer.values(Publications.objects.filter(id=pub_id), fields)
+        data = PublicationRowSerializer.serialize(rows, fields, expand, image_size=DEFAULT_THUMBNAIL_SIZE)
+        if not data:
+            return False, "La publicación no existe."
+        return True, data[0]
+
+    @classmethod
+    def get_image(cls, image_id):
+        try:
+            imagen = PublicationImage.objects.get(id=image_id)
+            return True, imagen
+        except PublicationImage.DoesNotExist:
+            return False, "La imagen no existe."
+
     @classmethod
     def list_publications_by_category(cls, categoria_id):
-        publicaciones = Publications.objects.filter(categoria_id=categoria_id)
+        publicaciones = cls.read_queryset().filter(categoria_id=categoria_id)
         return True, publicaciones
 
     @classmethod
@@ -245,12 +449,13 @@ class PublicationsService:
         if not created:
             return False, "La publicación ya está en favoritos."
 
+        cls.invalidate_responses(publication.id, publication.categoria_id)
         return True, "Agregado a favoritos."
     
     @classmethod
     def remove_favorite(cls, user_id, pub_id):
         try:
-            fav = FavoritePublication.objects.get(
+            fav = FavoritePublication.objects.select_related('publicacion').get(
                 user_id=user_id,
                 publicacion_id=pub_id
             )
@@ -258,73 +463,76 @@ class PublicationsService:
             return False, "La publicación no está en favoritos."
 
         fav.delete()
+        cls.invalidate_responses(fav.publicacion.id, fav.publicacion.categoria_id)
         return True, "Eliminado de favoritos."
 
     @classmethod
     def list_favorites(cls, user_id):
-        favoritos = FavoritePublication.objects.filter(user_id=user_id)
-        publicaciones = [f.publicacion for f in favoritos]
+        # Un queryset (y no una lista) para que los listados puedan ajustar columnas
+        publicaciones = cls.read_queryset().filter(
+            favoritepublication__user_id=user_id
+        ).order_by('favoritepublication__id')
         return True, publicaciones
     
     @classmethod
     def list_user_publications(cls, user_id):
-        publicaciones = Publications.objects.filter(user_id=user_id)
+        publicaciones = cls.read_queryset().filter(user_id=user_id)
         return True, publicaciones
     
     @classmethod
     def create_category(cls, nombre):
         # Validar si existe
-        if Category.objects.filter(nombre=nombre).exists():
+        if any(c.nombre == nombre for c in ReferenceCache.all(Category)):
             return False, "La categoría ya existe."
 
+        # El signal post_save invalida la caché de referencia en todos los procesos
         categoria = Category.objects.create(nombre=nombre)
+        AutocompleteService.update_item(AutocompleteService.CATEGORY, categoria.id, nombre)
         return True, "Categoría creada correctamente.", categoria.id
     
     @classmethod
     def list_categories(cls):
-        categorias = Category.objects.all()
+        categorias = ReferenceCache.all(Category)
         return True, categorias
 
     @classmethod
     def get_category(cls, categoria_id):
-        try:
-            categoria = Category.objects.get(id=categoria_id)
-            return True, categoria
-        except Category.DoesNotExist:
+        categoria = ReferenceCache.get(Category, categoria_id)
+        if not categoria:
             return False, "La categoría no existe."
+        return True, categoria
         
     @classmethod
     def list_states(cls):
-        estados = State.objects.all()
+        estados = ReferenceCache.all(State)
         return True, estados
 
     @classmethod
     def get_state(cls, estado_id):
-        try:
-            estado = State.objects.get(id=estado_id)
-            return True, estado
-        except State.DoesNotExist:
+        estado = ReferenceCache.get(State, estado_id)
+        if not estado:
             return False, "El estado no existe."
+        return True, estado
         
     @classmethod
     def create_state(cls, nombre):
         # Validar si existe
-        if State.objects.filter(nombre=nombre).exists():
+        if any(e.nombre == nombre for e in ReferenceCache.all(State)):
             return False, "El estado ya existe."
 
+        # El signal post_save invalida la caché de referencia en todos los procesos
         estado = State.objects.create(nombre=nombre)
         return True, "Estado creado correctamente.", estado.id
     
     @classmethod
     def list_condition(cls):
-        condiciones = Condition.objects.all()
+        condiciones = ReferenceCache.all(Condition)
         return True, condiciones
 
     @classmethod
     def get_conditios(cls, condition_id):
-        try:
-            condicion = Condition.objects.get(id=condition_id)
-            return True, condicion
-        except State.DoesNotExist:
-            return False, "El estado no existe."
+        condicion = ReferenceCache.get(Condition, condition_id)
+        if not condicion:
+            return False, "La condición no existe."
+        return True, condicion
 
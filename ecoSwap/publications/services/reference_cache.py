@@ -0,0 +1,86 @@
+import threading
+import time
+import uuid
+
+from django.conf import settings
+
+from ecoSwap.response_cache import bump_generation
+
+from ..models import CacheVersion, Category, Condition, State
+
+
+class ReferenceCache:
+    """
+    Caché en memoria del proceso para las tablas de referencia (Category, State,
+    Condition), que casi nunca cambian. Las búsquedas son accesos a diccionario.
+
+    Coherencia entre procesos (varios workers de gunicorn): cada cambio en estas
+    tablas escribe un sello nuevo en CacheVersion; cada proceso compara su sello
+    con el de la base de datos como máximo cada REFERENCE_CACHE_CHECK_SECONDS y
+    recarga las tablas si cambió.
+    """
+
+    VERSION_NAME = 'reference-tables'
+    MODELS = (Category, State, Condition)
+
+    _lock = threading.Lock()
+    _data = None  # {modelo: {id: instancia}}
+    _stamp = None
+    _checked_at = 0.0
+
+    @classmethod
+    def _current_stamp(cls):
+        return CacheVersion.objects.filter(name=cls.VERSION_NAME).values_list('stamp', flat=True).first()
+
+    @classmethod
+    def _ensure_fresh(cls):
+        now = time.monotonic()
+        # Una sola lectura de _data: invalidate() puede ponerlo en None entre dos lecturas
+        data = cls._data
+        if data is not None and now - cls._checked_at < settings.REFERENCE_CACHE_CHECK_SECONDS:
+            return data
+
+        stamp = cls._current_stamp()
+        with cls._lock:
+            data = cls._data
+            if data is None or stamp != cls._stamp:
+                data = {
+                    model: {obj.id: obj for obj in model.objects.order_by('id')}
+                    for model in cls.MODELS
+                }
+                cls._data = data
+                cls._stamp = stamp
+            cls._checked_at = now
+            return data
+
+    @classmethod
+    def get(cls, model, pk):
+        """Retorna la instancia o None si no existe"""
+        try:
+            pk = int(pk)
+        except (TypeError, ValueError):
+            return None
+        return cls._ensure_fresh()[model].get(pk)
+
+    @classmethod
+    def all(cls, model):
+        """Todas las filas del modelo ordenadas por id"""
+        return list(cls._ensure_fresh()[model].values())
+
+    @classmethod
+    def names(cls, model, ids):
+        """{id: nombre} para los ids pedidos"""
+        rows = cls._ensure_fresh()[model]
+        return {pk: rows[pk].nombre for pk in ids if pk in rows}
+
+    @classmethod
+    def invalidate(cls, **kwargs):
+        """Descarta la caché local y publica un sello nuevo para los demás procesos"""
+        CacheVersion.objects.update_or_create(
+            name=cls.VERSION_NAME,
+            defaults={'stamp': uuid.uuid4().hex}
+        )
+        with cls._lock:
+            cls._data = None
+        # Las respuestas cacheadas que listan o nombran estas tablas
+        bump_generation('reference')
@@ -0,0 +1,172 @@
+from collections import defaultdict
+
+from django.db.models import Count, OuterRef, Subquery
+from django.urls import reverse
+from rest_framework import serializers
+
+from ..models import Category, Condition, PublicationImage, State
+from .derivative_service import DerivativeService
+from .image_service import ImageService
+from .reference_cache import ReferenceCache
+
+
+class PublicationRowSerializer:
+    """
+    Ruta rápida de lectura para publicaciones: arma la tarjeta de los listados y
+    los mismos diccionarios que PublicationsSerializer a partir de .values(), sin
+    instanciar modelos ni recorrer los campos de DRF por cada fila. Mismas llaves,
+    mismo orden y mismo formato de valores, así el JSON resultante es idéntico.
+
+    Acepta cualquier subconjunto de FIELDS (?fields=): solo se consultan las
+    columnas, anotaciones e imágenes que esos campos necesitan.
+    """
+
+    # Orden canónico: tanto la tarjeta como el detalle son subsecuencias de este orden
+    FIELDS = (
+        'id', 'user', 'categoria', 'estado', 'condition', 'titulo', 'descripcion',
+        'ubicacion', 'fecha_publicacion', 'thumbnail', 'imagenes_count', 'imagenes',
+    )
+    CARD_FIELDS = (
+        'id', 'user', 'categoria', 'estado', 'condition', 'titulo',
+        'ubicacion', 'fecha_publicacion', 'thumbnail', 'imagenes_count',
+    )
+    DETAIL_FIELDS = (
+        'id', 'user', 'categoria', 'estado', 'condition', 'titulo', 'descripcion',
+        'ubicacion', 'fecha_publicacion', 'imagenes',
+    )
+    # Con ?expand= el id se reemplaza por {"id", "nombre"} servido desde ReferenceCache
+    REFERENCES = {'categoria': Category, 'estado': State, 'condition': Condition}
+    EXPANDABLE = ('categoria', 'estado', 'condition', 'imagenes')
+
+    # Columnas de .values() que necesita cada campo; id y fecha siempre (orden y cursor)
+    COLUMNS = {
+        'user': 'user_id',
+        'categoria': 'categoria_id',
+        'estado': 'estado_id',
+        'condition': 'condition_id',
+        'titulo': 'titulo',
+        'descripcion': 'descripcion',
+        'ubicacion': 'ubicacion',
+        'thumbnail': 'thumbnail_id',
+        'imagenes_count': 'imagenes_count',
+    }
+    IMAGE_FIELDS = (
+        'id', 'publicacion_id', 'imagen', 'digest', 'content_type', 'size', 'width', 'height', 'fecha',
+    )
+
+    # Un único campo de DRF para formatear fechas igual que los serializers
+    _datetime = serializers.DateTimeField()
+
+    @classmethod
+    def _datetime_repr(cls, value):
+        return cls._datetime.to_representation(value) if value else None
+
+    @classmethod
+    def _image_url_prefix(cls):
+        # La ruta 'images/<int:image_id>' termina en el id
+        return reverse('get_publication_image', args=[0])[:-1]
+
+    @classmethod
+    def values(cls, publicaciones, fields):
+        """Queryset de diccionarios con solo las columnas que piden los campos"""
+        publicaciones = publicaciones.prefetch_related(None)
+        if 'imagenes_count' in fields:
+            publicaciones = publicaciones.annotate(imagenes_count=Count('imagenes', distinct=True))
+        if 'thumbnail' in fields:
+            primera_imagen = PublicationImage.objects.filter(
+                publicacion=OuterRef('pk')
+            ).order_by('orden', 'id').values('id')[:1]
+            publicaciones = publicaciones.annotate(thumbnail_id=Subquery(primera_imagen))
+
+        columns = ['id', 'fecha_publicacion'] + [cls.COLUMNS[f] for f in fields if f in cls.COLUMNS]
+        return publicaciones.values(*columns)
+
+    @classmethod
+    def card_values(cls, publicaciones):
+        return cls.values(publicaciones, cls.CARD_FIELDS)
+
+    @classmethod
+    def detail_values(cls, publicaciones):
+        return cls.values(publicaciones, cls.DETAIL_FIELDS)
+
+    @classmethod
+    def _getters(cls, fields, expand, image_size):
+        """[(campo, función(fila, imágenes) -> valor), ...] en orden canónico"""
+        fecha = cls._datetime_repr
+        prefix = cls._image_url_prefix()
+
+        def reference(model, column):
+            def get(row, imagenes):
+                obj = ReferenceCache.get(model, row[column]) if row[column] else None
+                return {'id': obj.id, 'nombre': obj.nombre} if obj else None
+            return get
+
+        getters = {
+            'id': lambda row, imagenes: row['id'],
+            'user': lambda row, imagenes: row['user_id'],
+            'titulo': lambda row, imagenes: row['titulo'],
+            'descripcion': lambda row, imagenes: row['descripcion'],
+            'ubicacion': lambda row, imagenes: row['ubicacion'],
+            'fecha_publicacion': lambda row, imagenes: fecha(row['fecha_publicacion']),
+            'thumbnail': lambda row, imagenes: (
+                f"{prefix}{row['thumbnail_id']}?size={image_size}&format=webp" if row['thumbnail_id'] else None
+            ),
+            'imagenes_count': lambda row, imagenes: row['imagenes_count'],
+            'imagenes': lambda row, imagenes: imagenes.get(row['id'], []),
+        }
+        for name, model in cls.REFERENCES.items():
+            column = cls.COLUMNS[name]
+            if name in expand:
+                getters[name] = reference(model, column)
+            else:
+                getters[name] = lambda row, imagenes, column=column: row[column]
+
+        return [(name, getters[name]) for name in fields]
+
+    @classmethod
+    def serialize(cls, rows, fields, expand=(), image_size=160):
+        """Filas de values(publicaciones, fields) -> diccionarios con esos campos"""
+        rows = list(rows)
+        imagenes = {}
+        if 'imagenes' in fields and rows:
+            imagenes = cls.images([row['id'] for row in rows], image_size)
+
+        getters = cls._getters(fields, expand, image_size)
+        return [{name: get(row, imagenes) for name, get in getters} for row in rows]
+
+    @classmethod
+    def cards(cls, rows, image_size=160):
+        """Tarjeta de los listados: sin descripción ni imágenes en línea, solo la primera como miniatura"""
+        return cls.serialize(rows, cls.CARD_FIELDS, image_size=image_size)
+
+    @classmethod
+    def details(cls, rows, image_size):
+        """Equivalente a PublicationsSerializer(..., many=True, context={'image_size': image_size}).data"""
+        return cls.serialize(rows, cls.DETAIL_FIELDS, image_size=image_size)
+
+    @classmethod
+    def images(cls, publication_ids, image_size):
+        """Returns: {publicacion_id: [imagen serializada, ...]} con una sola consulta"""
+        prefix = cls._image_url_prefix()
+        fecha = cls._datetime_repr
+        by_publication = defaultdict(list)
+        rows = PublicationImage.objects.filter(
+            publicacion_id__in=publication_ids
+        ).order_by('orden', 'id').values_list(*cls.IMAGE_FIELDS)
+
+        for image_id, pub_id, imagen, digest, content_type, size, width, height, creada in rows:
+            url = f"{prefix}{image_id}"
+            by_publication[pub_id].append({
+                'id': image_id,
+                # Filas heredadas guardan el base64 directamente en la columna
+                'imagen': ImageService.read_data_uri(digest, content_type) if digest else imagen,
+                'url': url,
+                'thumbnail': f"{url}?size={image_size}&format=webp",
+                'derivatives': DerivativeService.urls(url),
+                'content_type': content_type,
+                'size': size,
+                'width': width,
+                'height': height,
+                'fecha': fecha(creada),
+            })
+        return by_publication
@@ -0,0 +1,142 @@
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+
+from .pagination_service import CursorPaginationService
+from .trigram_service import TrigramService
+
+
+FTS_TABLE = 'publications_search'
+MYSQL_FULLTEXT_INDEX = 'pub_fulltext_idx'
+
+
+class SearchService:
+    """
+    Búsqueda de texto completo sobre titulo y descripcion.
+    En MySQL usa un índice FULLTEXT; en SQLite (tests y desarrollo local) una
+    tabla virtual FTS5 sincronizada con triggers; ambos los crea la migración
+    0010_fulltext_search. Como respaldo usa el índice de trigramas
+    (TrigramService). Los resultados se ordenan por relevancia (mayor primero) y
+    se paginan por cursor sobre (score, id).
+    """
+
+    @classmethod
+    def rebuild_index(cls, using=DEFAULT_DB_ALIAS):
+        """
+        Reindexa desde cero la tabla FTS5 de SQLite (la crea la migración 0010 y la
+        mantienen sus triggers). En MySQL el índice FULLTEXT se mantiene solo.
+        """
+        db = connections[using]
+        if db.vendor == 'sqlite':
+            with db.cursor() as cursor:
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+    @classmethod
+    def tokenize(cls, query: str):
+        return re.findall(r'\w+', query or '')
+
+    @classmethod
+    def _filters(cls, categoria_id, estado_id, condicion_id):
+        """Returns: {columna: valor} con los filtros presentes"""
+        filters = {}
+        for column, value in (('categoria_id', categoria_id), ('estado_id', estado_id), ('condition_id', condicion_id)):
+            if value:
+                filters[column] = int(value)
+        return filters
+
+    @classmethod
+    def _ranked_ids(cls, terms, filters, position, size):
+        """Returns: [(id, score), ...] ordenados por relevancia"""
+        if connection.vendor == 'mysql':
+            # Modo de lenguaje natural: cualquier término suma relevancia
+            match = "MATCH(p.titulo, p.descripcion) AGAINST (%s IN NATURAL LANGUAGE MODE)"
+            inner = (
+                f"SELECT p.id AS id, {match} AS score FROM publications_publications p "
+                f"WHERE {match}"
+            )
+            text = ' '.join(terms)
+            inner_params = [text, text]
+        else:
+            # bm25 es menor cuanto más relevante: se niega para ordenar igual que MySQL
+            match = ' OR '.join('"%s"' % term for term in terms)
+            inner = (
+                f"SELECT p.id AS id, -bm25({FTS_TABLE}) AS score FROM {FTS_TABLE} "
+                f"JOIN publications_publications p ON p.id = {FTS_TABLE}.rowid "
+                f"WHERE {FTS_TABLE} MATCH %s"
+            )
+            inner_params = [match]
+
+        for column, value in filters.items():
+            inner += f" AND p.{column} = %s"
+            inner_params.append(value)
+
+        sql = f"SELECT id, score FROM ({inner}) ranked"
+        if position:
+            sql += " WHERE score < %s OR (score = %s AND id < %s)"
+            inner_params += [position[0], position[0], position[1]]
+        sql += " ORDER BY score DESC, id DESC LIMIT %s"
+        inner_params.append(size)
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, inner_params)
+            return cursor.fetchall()
+
+    @classmethod
+    def _fuzzy_ranked_ids(cls, query, filters, position, size):
+        """Returns: [(id, score), ...] usando el índice de trigramas"""
+        ranked = TrigramService.ranked(query, filters)
+        if position:
+            score, pub_id = position
+            ranked = [(i, s) for i, s in ranked if s < score or (s == score and i < pub_id)]
+        return ranked[:size]
+
+    @classmethod
+    def search(cls, query, categoria_id=None, estado_id=None, condicion_id=None, cursor=None, limit=None, mode=None):
+        """
+        mode='fulltext' usa el índice de texto completo, mode='fuzzy' el de trigramas
+        (tolera tildes y errores de escritura). Sin mode se usa texto completo y, si la
+        primera página sale vacía, se recurre a la búsqueda difusa.
+        Returns:
+        (success, (ids, next_cursor) o mensaje de error)
+        """
+        terms = cls.tokenize(query)
+        if not terms:
+            return False, "El parámetro 'q' es requerido."
+
+        if mode not in (None, '', 'fulltext', 'fuzzy'):
+            return False, "El parámetro 'mode' debe ser 'fulltext' o 'fuzzy'."
+
+        try:
+            filters = cls._filters(categoria_id, estado_id, condicion_id)
+        except (TypeError, ValueError):
+            return False, "Los filtros deben ser números."
+
+        position = None
+        if cursor:
+            payload = CursorPaginationService.decode_payload(cursor)
+            try:
+                position = float(payload['s']), int(payload['i'])
+                # El cursor recuerda el modo con el que se obtuvo la primera página
+                mode = payload.get('m', 'fulltext')
+            except (KeyError, TypeError, ValueError, AttributeError):
+                return False, "Cursor inválido."
+
+        size = CursorPaginationService.page_size(limit)
+
+        if mode == 'fuzzy':
+            rows = cls._fuzzy_ranked_ids(query, filters, position, size + 1)
+        else:
+            rows = cls._ranked_ids(terms, filters, position, size + 1)
+            if not rows and not mode and not position:
+                mode = 'fuzzy'
+                rows = cls._fuzzy_ranked_ids(query, filters, None, size + 1)
+
+        next_cursor = None
+        if len(rows) > size:
+            rows = rows[:size]
+            last_id, last_score = rows[-1]
+            next_cursor = CursorPaginationService.encode_payload({
+                's': last_score, 'i': last_id, 'm': mode or 'fulltext'
+            })
+
+        return True, ([row[0] for row in rows], next_cursor)
@@ -0,0 +1,106 @@
+import re
+import unicodedata
+
+from django.db.models import Count
+
+from ..models import Publications, PublicationTrigram
+
+
+class TrigramService:
+    """
+    Índice de trigramas sobre el título normalizado (minúsculas, sin tildes).
+    Permite encontrar "Bicicleta eléctrica" buscando "bisicleta electrica":
+    los candidatos salen de la lista invertida (consulta por índice) y se
+    ordenan por similitud entre conjuntos de trigramas.
+    """
+
+    # Similitud mínima para considerar un resultado
+    THRESHOLD = 0.35
+    # Candidatos máximos que se traen del índice antes de calcular la similitud
+    MAX_CANDIDATES = 200
+
+    @classmethod
+    def normalize(cls, text: str) -> str:
+        """Minúsculas, sin tildes y solo letras/números separados por un espacio"""
+        decomposed = unicodedata.normalize('NFKD', text or '')
+        without_accents = ''.join(c for c in decomposed if not unicodedata.combining(c))
+        return ' '.join(re.findall(r'[a-z0-9]+', without_accents.lower()))
+
+    @classmethod
+    def trigrams(cls, normalized: str) -> set:
+        """Trigramas por palabra, con relleno al inicio y al final como pg_trgm"""
+        result = set()
+        for word in normalized.split():
+            padded = f"  {word} "
+            for i in range(len(padded) - 2):
+                result.add(padded[i:i + 3])
+        return result
+
+    @classmethod
+    def similarity(cls, query: set, title: set) -> float:
+        """
+        Promedio entre la cobertura de la consulta (qué parte de sus trigramas
+        aparece en el título) y la similitud de Jaccard de ambos conjuntos.
+        La cobertura evita castigar títulos largos frente a consultas cortas.
+        """
+        if not query or not title:
+            return 0.0
+        shared = len(query & title)
+        coverage = shared / len(query)
+        jaccard = shared / (len(query) + len(title) - shared)
+        return (coverage + jaccard) / 2
+
+    @classmethod
+    def index_publication(cls, publicacion):
+        """Actualiza la columna normalizada y los trigramas de una publicación"""
+        normalized = cls.normalize(publicacion.titulo)
+        if publicacion.titulo_normalizado != normalized:
+            Publications.objects.filter(id=publicacion.id).update(titulo_normalizado=normalized)
+            publicacion.titulo_normalizado = normalized
+
+        PublicationTrigram.objects.filter(publicacion_id=publicacion.id).delete()
+        PublicationTrigram.objects.bulk_create([
+            PublicationTrigram(publicacion_id=publicacion.id, trigram=trigram)
+            for trigram in sorted(cls.trigrams(normalized))
+        ])
+
+    @classmethod
+    def rebuild(cls, batch_size=500):
+        """Reconstruye el índice completo (publicaciones creadas antes del índice)"""
+        total = 0
+        for publicacion in Publications.objects.only('id', 'titulo', 'titulo_normalizado').iterator(chunk_size=batch_size):
+            cls.index_publication(publicacion)
+            total += 1
+        return total
+
+    @classmethod
+    def ranked(cls, query: str, filters=None):
+        """
+        filters: {'categoria_id': 1, ...} sobre columnas de Publications
+        Returns:
+        [(id, similitud), ...] ordenados de mayor a menor similitud
+        """
+        query_trigrams = cls.trigrams(cls.normalize(query))
+        if not query_trigrams:
+            return []
+
+        # Candidatos: publicaciones que comparten más trigramas con la consulta
+        candidates = PublicationTrigram.objects.filter(trigram__in=query_trigrams)
+        if filters:
+            candidates = candidates.filter(**{f"publicacion__{k}": v for k, v in filters.items()})
+        candidate_ids = list(
+            candidates.values('publicacion_id')
+            .annotate(shared=Count('id'))
+            .order_by('-shared', '-publicacion_id')
+            .values_list('publicacion_id', flat=True)[:cls.MAX_CANDIDATES]
+        )
+
+        titles = Publications.objects.filter(id__in=candidate_ids).values_list('id', 'titulo_normalizado')
+        results = []
+        for pub_id, normalized in titles:
+            score = cls.similarity(query_trigrams, cls.trigrams(normalized))
+            if score >= cls.THRESHOLD:
+                results.append((pub_id, score))
+
+        results.sort(key=lambda item: (item[1], item[0]), reverse=True)
+        return results
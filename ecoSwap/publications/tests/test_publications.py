@@ -1,10 +1,40 @@
 import base64
+import hashlib
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import skipUnless
+from unittest.mock import patch
+from PIL import Image
+from django.db import IntegrityError, connection, transaction
+from django.core.management import call_command
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.utils import timezone
-from publications.models import Publications, Category, State, Condition, PublicationImage, FavoritePublication
-from users.models import UserApp
+from publications.models import Publications, Category, State, Condition, PublicationImage, FavoritePublication, ImageDerivative, PublicationFacetCount, CacheVersion
+from users.models import UserApp, ImagesUsers
+from ecoSwap.blob_storage import get_blob_storage
+from ecoSwap.response_cache import cache_stats, get_response_cache
+from ecoSwap.renderers import FastJSONRenderer
+from rest_framework.renderers import JSONRenderer
+from publications.serializers import PublicationsSerializer
+from publications.services.row_serializer import PublicationRowSerializer
+from publications.services.image_service import ImageService
+from publications.services.blob_collection_service import BlobCollectionService
+from publications.services.autocomplete_service import AutocompleteService
+from publications.services.facet_service import FacetService
+from publications.services.publications_service import PublicationsService
+from publications.services.reference_cache import ReferenceCache
+
+
+def make_png_base64(size=(4, 3), color=(255, 0, 0)):
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode("utf-8")
 
 
 class PublicationsTestCase(APITestCase):
@@ -174,3 +204,1176 @@ class PublicationsTestCase(APITestCase):
         url = reverse('get_condition', args=[self.condition.id])
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_create_publication_stores_image_in_blob_store(self):
+        url = reverse('create_publication')
+        imagen = make_png_base64()
+        data = {
+            "titulo": "Con imagen",
+            "descripcion": "Desc",
+            "categoria_id": self.category.id,
+            "estado_id": self.state.id,
+            "ubicacion": "Bogotá",
+            "imagenes": [imagen, imagen]
+        }
+
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        raw = base64.b64decode(imagen.split(",", 1)[1])
+        digest = hashlib.sha256(raw).hexdigest()
+        images = PublicationImage.objects.filter(publicacion__titulo="Con imagen")
+        self.assertEqual(images.count(), 2)
+        for img in images:
+            self.assertIsNone(img.imagen)
+            self.assertEqual(img.digest, digest)
+            self.assertEqual(img.content_type, "image/png")
+            self.assertEqual(img.size, len(raw))
+            self.assertEqual((img.width, img.height), (4, 3))
+
+        storage = get_blob_storage()
+        self.assertEqual(storage.read(digest), raw)
+        self.assertTrue(storage.path(digest).endswith(os.path.join(digest[:2], digest[2:4], digest)))
+
+        # El serializer sigue entregando el data-URI a los clientes
+        self.assertEqual(response.data["publication"]["imagenes"][0]["imagen"], imagen)
+
+    def test_get_publication_image_etag_and_range(self):
+        pub = Publications.objects.create(
+            user=self.user,
+            categoria=self.category,
+            estado=self.state,
+            titulo="Imagen",
+            descripcion="Desc",
+            ubicacion="Bogotá",
+        )
+        raw = base64.b64decode(make_png_base64().split(",", 1)[1])
+        digest = get_blob_storage().save(raw)
+        img = PublicationImage.objects.create(
+            publicacion=pub, digest=digest, content_type="image/png", size=len(raw)
+        )
+        url = reverse('get_publication_image', args=[img.id])
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(response.streaming_content), raw)
+        self.assertEqual(response["ETag"], f'"{digest}"')
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertIn("Last-Modified", response)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=f'"{digest}"')
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(url, HTTP_RANGE="bytes=0-9")
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(b"".join(response.streaming_content), raw[:10])
+        self.assertEqual(response["Content-Range"], f"bytes 0-9/{len(raw)}")
+
+        response = self.client.get(url, HTTP_RANGE=f"bytes={len(raw)}-")
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+
+    def test_get_publication_image_legacy_base64(self):
+        pub = Publications.objects.create(
+            user=self.user,
+            categoria=self.category,
+            estado=self.state,
+            titulo="Heredada",
+            descripcion="Desc",
+            ubicacion="Bogotá",
+        )
+        imagen = make_png_base64()
+        img = PublicationImage.objects.create(publicacion=pub, imagen=imagen)
+
+        response = self.client.get(reverse('get_publication_image', args=[img.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertEqual(b"".join(response.streaming_content), base64.b64decode(imagen.split(",", 1)[1]))
+
+    def test_get_publication_image_not_found(self):
+        response = self.client.get(reverse('get_publication_image', args=[999]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_get_publication_image_missing_blob(self):
+        pub = Publications.objects.create(
+            user=self.user,
+            categoria=self.category,
+            estado=self.state,
+            titulo="Sin blob",
+            descripcion="Desc",
+            ubicacion="Bogotá",
+        )
+        img = PublicationImage.objects.create(publicacion=pub, digest="f" * 64, content_type="image/png", size=10)
+
+        response = self.client.get(reverse('get_publication_image', args=[img.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_create_publication_generates_derivatives(self):
+        url = reverse('create_publication')
+        data = {
+            "titulo": "Grande",
+            "descripcion": "Desc",
+            "categoria_id": self.category.id,
+            "estado_id": self.state.id,
+            "ubicacion": "Bogotá",
+            "imagenes": [make_png_base64(size=(1200, 600))]
+        }
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        img = PublicationImage.objects.get(publicacion__titulo="Grande")
+        derivadas = ImageDerivative.objects.filter(source_digest=img.digest)
+        self.assertEqual(derivadas.count(), 6)
+        thumb = derivadas.get(size=160, format="webp")
+        self.assertEqual((thumb.width, thumb.height), (160, 80))
+        self.assertEqual(derivadas.get(size=1080, format="jpeg").width, 1080)
+
+        response = self.client.get(reverse('get_publication_image', args=[img.id]), {"size": 160, "format": "webp"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "image/webp")
+        self.assertEqual(response["ETag"], f'"{thumb.digest}"')
+        self.assertIn("immutable", response["Cache-Control"])
+
+    def test_get_publication_image_pending_derivative_is_not_cached(self):
+        """Mientras la miniatura no existe se sirve el original, sin cachearlo como miniatura"""
+        pub = Publications.objects.create(
+            user=self.user,
+            categoria=self.category,
+            estado=self.state,
+            titulo="Pendiente",
+            descripcion="Desc",
+            ubicacion="Bogotá",
+        )
+        raw = base64.b64decode(make_png_base64().split(",", 1)[1])
+        img = PublicationImage.objects.create(
+            publicacion=pub, digest=get_blob_storage().save(raw), content_type="image/png", size=len(raw)
+        )
+
+        response = self.client.get(reverse('get_publication_image', args=[img.id]), {"size": 160, "format": "webp"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(response.streaming_content), raw)
+        self.assertEqual(response["Cache-Control"], "public, no-cache")
+
+    def test_list_publications_returns_cards(self):
+        pub = Publications.objects.create(
+            user=self.user,
+            categoria=self.category,
+            estado=self.state,
+            titulo="Tarjeta",
+            descripcion="Desc larga",
+            ubicacion="Bogotá",
+        )
+        primera = PublicationImage.objects.create(publicacion=pub, imagen=make_png_base64())
+        PublicationImage.objects.create(publicacion=pub, imagen=make_png_base64())
+
+        response = self.client.get(reverse('list_publications'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        card = response.data["publications"][0]
+        self.assertNotIn("descripcion", card)
+        self.assertNotIn("imagenes", card)
+        self.assertEqual(card["imagenes_count"], 2)
+        self.assertTrue(card["thumbnail"].startswith(reverse('get_publication_image', args=[primera.id])))
+
+        response = self.client.get(reverse('list_publications'), {"view": "full"})
+        self.assertEqual(len(response.data["publications"][0]["imagenes"]), 2)
+
+    def test_list_user_favorites_returns_each_favorite_once(self):
+        other = UserApp.objects.create(email="otro@example.com", name="Otro", phone="3000000001", address="Dir")
+        pubs = [
+            Publications.objects.create(
+                user=self.user,
+                categoria=self.category,
+                estado=self.state,
+                titulo=f"Fav {i}",
+                descripcion="Desc",
+                ubicacion="Bogotá",
+            )
+            for i in range(2)
+        ]
+        FavoritePublication.objects.create(user=self.user, publicacion=pubs[1])
+        FavoritePublication.objects.create(user=self.user, publicacion=pubs[0])
+        FavoritePublication.objects.create(user=other, publicacion=pubs[0])
+
+        response = self.client.get(reverse('list_user_favorites'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([f["id"] for f in response.data["favorites"]], [pubs[1].id, pubs[0].id])
+
+    def test_list_publications_cursor_pagination(self):
+        fecha = timezone.now()
+        pubs = [
+            Publications.objects.create(
+                user=self.user,
+                categoria=self.category,
+                estado=self.state,
+                titulo=f"Pub {i}",
+                descripcion="Desc",
+                ubicacion="Bogotá",
+            )
+            for i in range(5)
+        ]
+        # Empates en la fecha: el id desempata el orden
+        Publications.objects.filter(id__in=[p.id for p in pubs]).update(fecha_publicacion=fecha)
+
+        url = reverse('list_publications')
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data["publications"]), 2)
+            seen.extend(p["id"] for p in response.data["publications"])
+            cursor = response.data["next_cursor"]
+            if not cursor:
+                break
+
+        self.assertEqual(seen, sorted([p.id for p in pubs], reverse=True))
+
+    def test_list_publications_invalid_cursor(self):
+        response = self.client.get(reverse('list_publications'), {"cursor": "no-es-un-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PublicationsQueryBudgetTestCase(APITestCase):
+    """Las lecturas cuestan un número constante de consultas sin importar el tamaño de la página"""
+
+    def setUp(self):
+        self.user = UserApp.objects.create(
+            email="budget@example.com",
+            name="Budget",
+            phone="3000000002",
+            address="Dir",
+        )
+        self.client.force_authenticate(self.user)
+        self.category = Category.objects.create(nombre="Hogar")
+        self.state = State.objects.create(nombre="Activo")
+        self.condition = Condition.objects.create(nombre="Nuevo")
+
+    def create_publications(self, count):
+        for i in range(count):
+            pub = Publications.objects.create(
+                user=self.user,
+                categoria=self.category,
+                estado=self.state,
+                condition=self.condition,
+                titulo=f"Pub {i}",
+                descripcion="Desc",
+                ubicacion="Bogotá",
+            )
+            PublicationImage.objects.create(publicacion=pub, imagen=make_png_base64())
+            PublicationImage.objects.create(publicacion=pub, imagen=make_png_base64())
+            FavoritePublication.objects.create(user=self.user, publicacion=pub)
+
+    def count_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(ctx.captured_queries)
+
+    def assert_constant_queries(self, url, params=None):
+        self.create_publications(2)
+        small = self.count_queries(url, params)
+        self.create_publications(6)
+        large = self.count_queries(url, params)
+        self.assertEqual(small, large)
+        return large
+
+    def test_list_publications_full_view(self):
+        queries = self.assert_constant_queries(reverse('list_publications'), {"view": "full"})
+        self.assertLessEqual(queries, 2)
+
+    def test_list_publications_cards(self):
+        queries = self.assert_constant_queries(reverse('list_publications'))
+        self.assertLessEqual(queries, 1)
+
+    def test_list_user_favorites(self):
+        self.assert_constant_queries(reverse('list_user_favorites'), {"view": "full"})
+
+    def test_list_user_publications(self):
+        self.assert_constant_queries(reverse('list_user_publications'), {"view": "full"})
+
+    def test_user_profile_publications(self):
+        self.assert_constant_queries(reverse('get_user_by_email'), {"email": self.user.email, "view": "full"})
+
+
+@skipUnless(connection.vendor == 'sqlite', "La migración de FTS5 se prueba sobre SQLite")
+class FullTextMigrationTestCase(TransactionTestCase):
+    """El índice de texto completo es parte del grafo de migraciones y se puede revertir"""
+
+    def fts_objects(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE name LIKE 'publications_search%'")
+            return {row[0] for row in cursor.fetchall()}
+
+    def test_migration_is_reversible_and_indexes_existing_rows(self):
+        try:
+            call_command('migrate', 'publications', '0009_hot_query_indexes', verbosity=0)
+            self.assertEqual(self.fts_objects(), set())
+
+            user = UserApp.objects.create(email="fts@example.com", name="FTS", phone="3000000009", address="Dir")
+            categoria = Category.objects.create(nombre="Música")
+            estado = State.objects.create(nombre="Activo")
+            pub = Publications.objects.create(
+                user=user, categoria=categoria, estado=estado, titulo="Violonchelo", descripcion="Con arco", ubicacion="Cali"
+            )
+        finally:
+            call_command('migrate', 'publications', verbosity=0)
+
+        self.assertTrue({'publications_search', 'publications_search_ai', 'publications_search_au'} <= self.fts_objects())
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT rowid FROM publications_search WHERE publications_search MATCH 'violonchelo'")
+            self.assertEqual(cursor.fetchall(), [(pub.id,)])
+
+
+class PublicationsSearchTestCase(APITestCase):
+    def setUp(self):
+        self.user = UserApp.objects.create(
+            email="search@example.com",
+            name="Search",
+            phone="3000000003",
+            address="Dir",
+        )
+        self.category = Category.objects.create(nombre="Deportes")
+        self.other_category = Category.objects.create(nombre="Libros")
+        self.state = State.objects.create(nombre="Activo")
+
+    def create(self, titulo, descripcion, categoria=None):
+        return Publications.objects.create(
+            user=self.user,
+            categoria=categoria or self.category,
+            estado=self.state,
+            titulo=titulo,
+            descripcion=descripcion,
+            ubicacion="Bogotá",
+        )
+
+    def test_search_ranks_by_relevance(self):
+        self.create("Raqueta de tenis", "Poco uso")
+        bici = self.create("Bicicleta eléctrica", "Bicicleta eléctrica urbana, bicicleta plegable")
+        otra = self.create("Casco", "Ideal para bicicleta")
+
+        response = self.client.get(reverse('search_publications'), {"q": "bicicleta electrica"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p["id"] for p in response.data["publications"]], [bici.id, otra.id])
+
+    def test_search_filters_and_pagination(self):
+        for i in range(3):
+            self.create(f"Balón {i}", "Balón de fútbol")
+        self.create("Balón de colección", "Libro sobre balón", categoria=self.other_category)
+
+        url = reverse('search_publications')
+        seen, cursor = [], None
+        while True:
+            params = {"q": "balón", "categoria_id": self.category.id, "limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(p["id"] for p in response.data["publications"])
+            cursor = response.data["next_cursor"]
+            if not cursor:
+                break
+
+        self.assertEqual(len(seen), 3)
+        self.assertEqual(len(set(seen)), 3)
+
+    def test_search_reflects_updates(self):
+        pub = self.create("Guitarra", "Acústica")
+        pub.titulo = "Violín"
+        pub.save()
+
+        response = self.client.get(reverse('search_publications'), {"q": "violin"})
+        self.assertEqual([p["id"] for p in response.data["publications"]], [pub.id])
+        response = self.client.get(reverse('search_publications'), {"q": "guitarra"})
+        self.assertEqual(response.data["publications"], [])
+
+    def test_search_requires_query(self):
+        response = self.client.get(reverse('search_publications'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_fuzzy_search_tolerates_typos_and_accents(self):
+        self.client.force_authenticate(self.user)
+        for titulo in ["Bicicleta eléctrica", "Raqueta de tenis"]:
+            response = self.client.post(reverse('create_publication'), {
+                "titulo": titulo,
+                "descripcion": "Desc",
+                "categoria_id": self.category.id,
+                "estado_id": self.state.id,
+                "ubicacion": "Bogotá",
+            }, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        bici = Publications.objects.get(titulo="Bicicleta eléctrica")
+        self.assertEqual(bici.titulo_normalizado, "bicicleta electrica")
+        self.assertTrue(bici.trigramas.filter(trigram="  b").exists())
+
+        # Sin coincidencias exactas la búsqueda recurre al índice de trigramas
+        response = self.client.get(reverse('search_publications'), {"q": "bisicleta"})
+        self.assertEqual([p["id"] for p in response.data["publications"]], [bici.id])
+
+        response = self.client.get(reverse('search_publications'), {"q": "bicicleta electrica", "mode": "fuzzy"})
+        self.assertEqual([p["id"] for p in response.data["publications"]], [bici.id])
+
+        # Al editar el título se actualiza el índice
+        self.client.put(reverse('edit_publication', args=[bici.id]), {"titulo": "Patineta"}, format='json')
+        response = self.client.get(reverse('search_publications'), {"q": "patineta", "mode": "fuzzy"})
+        self.assertEqual([p["id"] for p in response.data["publications"]], [bici.id])
+
+
+class PublicationsAutocompleteTestCase(APITestCase):
+    def setUp(self):
+        self.user = UserApp.objects.create(
+            email="auto@example.com",
+            name="Auto",
+            phone="3000000004",
+            address="Dir",
+        )
+        self.client.force_authenticate(self.user)
+        self.category = Category.objects.create(nombre="Bicicletas")
+        self.state = State.objects.create(nombre="Activo")
+        self.bici = Publications.objects.create(
+            user=self.user,
+            categoria=self.category,
+            estado=self.state,
+            titulo="Bicicleta eléctrica",
+            descripcion="Desc",
+            ubicacion="Bogotá",
+        )
+        AutocompleteService.rebuild()
+
+    def suggest(self, q, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('autocomplete_publications'), {"q": q, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(ctx.captured_queries), 0)
+        return [(s["type"], s["id"]) for s in response.data["suggestions"]]
+
+    def test_autocomplete_prefix_and_word_matches(self):
+        self.assertEqual(self.suggest("bici"), [("category", self.category.id), ("publication", self.bici.id)])
+        self.assertEqual(self.suggest("ELECTR"), [("publication", self.bici.id)])
+        self.assertEqual(self.suggest("zzz"), [])
+
+    def test_autocomplete_incremental_updates(self):
+        response = self.client.post(reverse('create_publication'), {
+            "titulo": "Patineta",
+            "descripcion": "Desc",
+            "categoria_id": self.category.id,
+            "estado_id": self.state.id,
+            "ubicacion": "Bogotá",
+        }, format='json')
+        pub_id = response.data["publication"]["id"]
+        self.assertEqual(self.suggest("pati"), [("publication", pub_id)])
+
+        self.client.put(reverse('edit_publication', args=[pub_id]), {"titulo": "Monopatín"}, format='json')
+        self.assertEqual(self.suggest("pati"), [])
+        self.assertEqual(self.suggest("monopatin"), [("publication", pub_id)])
+
+        otra = Category.objects.create(nombre="Patines")
+        self.client.put(reverse('edit_publication', args=[pub_id]), {"categoria_id": otra.id}, format='json')
+        self.assertEqual(self.suggest("monopatin", categoria_id=otra.id), [("publication", pub_id)])
+        self.assertEqual(self.suggest("monopatin", categoria_id=self.category.id), [])
+
+    def test_autocomplete_matches_beyond_scan_cap(self):
+        # Títulos que ocupan todo el recorrido antes de llegar a "bufanda"
+        Publications.objects.bulk_create([
+            Publications(
+                user=self.user, categoria=self.category, estado=self.state,
+                titulo=f"Balón {i}", descripcion="Desc", ubicacion="Bogotá",
+            )
+            for i in range(10)
+        ])
+        ropa = Category.objects.create(nombre="Bufandas")
+        bufanda = Publications.objects.create(
+            user=self.user, categoria=ropa, estado=self.state, titulo="Bufanda de lana", descripcion="Desc", ubicacion="Bogotá",
+        )
+        AutocompleteService.rebuild()
+
+        with patch.object(AutocompleteService, "MAX_SCAN", 5):
+            self.assertEqual(self.suggest("b", categoria_id=ropa.id), [("publication", bufanda.id)])
+            sugerencias = self.suggest("b")
+
+        self.assertCountEqual(sugerencias[:2], [("category", self.category.id), ("category", ropa.id)])
+
+    def test_autocomplete_rejects_invalid_category(self):
+        response = self.client.get(reverse('autocomplete_publications'), {"q": "b", "categoria_id": "x"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PublicationFacetsTestCase(APITestCase):
+    def setUp(self):
+        self.user = UserApp.objects.create(
+            email="facets@example.com",
+            name="Facets",
+            phone="3000000005",
+            address="Dir",
+        )
+        self.client.force_authenticate(self.user)
+        self.hogar = Category.objects.create(nombre="Hogar")
+        self.libros = Category.objects.create(nombre="Libros")
+        self.activo = State.objects.create(nombre="Activo")
+        self.nuevo = Condition.objects.create(nombre="Nuevo")
+
+    def create(self, categoria, condition=None):
+        response = self.client.post(reverse('create_publication'), {
+            "titulo": "Pub",
+            "descripcion": "Desc",
+            "categoria_id": categoria.id,
+            "estado_id": self.activo.id,
+            "ubicacion": "Bogotá",
+            "condicion_id": condition.id if condition else None,
+        }, format='json')
+        return response.data["publication"]["id"]
+
+    def counts(self, facet, **params):
+        response = self.client.get(reverse('publication_facets'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {item["id"]: item["count"] for item in response.data["facets"][facet]}
+
+    def test_facet_counts_are_maintained_incrementally(self):
+        self.create(self.hogar, self.nuevo)
+        self.create(self.hogar)
+        pub_id = self.create(self.libros, self.nuevo)
+
+        self.assertEqual(self.counts("categoria"), {self.hogar.id: 2, self.libros.id: 1})
+        self.assertEqual(self.counts("condition"), {self.nuevo.id: 2, None: 1})
+        self.assertEqual(self.counts("categoria", condicion_id=self.nuevo.id), {self.hogar.id: 1, self.libros.id: 1})
+
+        self.client.put(reverse('edit_publication', args=[pub_id]), {"categoria_id": self.hogar.id}, format='json')
+        self.assertEqual(self.counts("categoria"), {self.hogar.id: 3})
+
+    def test_reconcile_fixes_drift(self):
+        self.create(self.hogar)
+        PublicationFacetCount.objects.update(total=10)
+        Publications.objects.create(
+            user=self.user, categoria=self.libros, estado=self.activo, titulo="Sin contador", descripcion="Desc", ubicacion="Bogotá"
+        )
+
+        self.assertEqual(FacetService.reconcile(), 2)
+        self.assertEqual(self.counts("categoria"), {self.hogar.id: 1, self.libros.id: 1})
+
+
+class ReferenceCacheTestCase(APITestCase):
+    def setUp(self):
+        self.user = UserApp.objects.create(
+            email="refs@example.com",
+            name="Refs",
+            phone="3000000006",
+            address="Dir",
+        )
+        self.client.force_authenticate(self.user)
+        self.hogar = Category.objects.create(nombre="Hogar")
+        self.activo = State.objects.create(nombre="Activo")
+
+    @override_settings(REFERENCE_CACHE_CHECK_SECONDS=60)
+    def test_lookups_are_served_from_memory(self):
+        ReferenceCache.all(Category)
+
+        with CaptureQueriesContext(connection) as ctx:
+            success, categoria = PublicationsService.get_category(self.hogar.id)
+            _, estados = PublicationsService.list_states()
+            missing, _ = PublicationsService.get_category(999)
+
+        self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertTrue(success)
+        self.assertEqual(categoria.nombre, "Hogar")
+        self.assertEqual([e.nombre for e in estados], ["Activo"])
+        self.assertFalse(missing)
+
+    def test_create_category_invalidates_cache(self):
+        self.client.get(reverse('list_categories'))
+
+        response = self.client.post(reverse('create_category'), {"nombre": "Libros"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.get(reverse('list_categories'))
+        nombres = [c["nombre"] for c in response.data["categories"]]
+        self.assertIn("Libros", nombres)
+        self.assertEqual(ReferenceCache.get(Category, response.data["categories"][-1]["id"]).nombre, "Libros")
+
+    def test_other_process_change_is_picked_up_through_version_stamp(self):
+        self.assertIsNone(ReferenceCache.get(State, 999))
+
+        # Simula otro worker: cambia la tabla sin signals y publica un sello nuevo
+        State.objects.bulk_create([State(id=999, nombre="Remoto")])
+        self.assertIsNone(ReferenceCache.get(State, 999))
+        CacheVersion.objects.update_or_create(name=ReferenceCache.VERSION_NAME, defaults={'stamp': 'otro-worker'})
+
+        self.assertEqual(ReferenceCache.get(State, 999).nombre, "Remoto")
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=True)
+class ResponseCacheTestCase(APITestCase):
+    def setUp(self):
+        get_response_cache().clear()
+        self.user = UserApp.objects.create(
+            email="cache@example.com",
+            name="Cache",
+            phone="3000000007",
+            address="Dir",
+        )
+        self.client.force_authenticate(self.user)
+        self.hogar = Category.objects.create(nombre="Hogar")
+        self.libros = Category.objects.create(nombre="Libros")
+        self.activo = State.objects.create(nombre="Activo")
+
+    def create(self, titulo, categoria):
+        response = self.client.post(reverse('create_publication'), {
+            "titulo": titulo,
+            "descripcion": "Desc",
+            "categoria_id": categoria.id,
+            "estado_id": self.activo.id,
+            "ubicacion": "Bogotá",
+        }, format='json')
+        return response.data["publication"]["id"]
+
+    def test_repeated_read_is_served_from_cache(self):
+        self.create("Mesa", self.hogar)
+
+        first = self.client.get(reverse('list_publications'), {"limit": 5, "utm": "x"})
+        with CaptureQueriesContext(connection) as ctx:
+            second = self.client.get(reverse('list_publications'), {"utm": "y", "limit": 5})
+
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(cache_stats()["list_publications"], {"hit": 1, "miss": 1, "hit_ratio": 0.5})
+
+    def test_create_and_update_invalidate_affected_responses(self):
+        pub_id = self.create("Mesa", self.hogar)
+        self.client.get(reverse('list_publications'))
+        self.client.get(reverse('publications_by_category', args=[self.libros.id]))
+        self.client.get(reverse('get_publication', args=[pub_id]))
+
+        self.create("Silla", self.hogar)
+        response = self.client.get(reverse('list_publications'))
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(len(response.data["publications"]), 2)
+        # Otra categoría y otra publicación: siguen en caché
+        self.assertEqual(self.client.get(reverse('publications_by_category', args=[self.libros.id]))["X-Cache"], "HIT")
+        self.assertEqual(self.client.get(reverse('get_publication', args=[pub_id]))["X-Cache"], "HIT")
+
+        self.client.put(reverse('edit_publication', args=[pub_id]), {"categoria_id": self.libros.id}, format='json')
+        response = self.client.get(reverse('publications_by_category', args=[self.libros.id]))
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual([p["id"] for p in response.data["publications"]], [pub_id])
+        response = self.client.get(reverse('get_publication', args=[pub_id]))
+        self.assertEqual(response.data["publication"]["categoria"], self.libros.id)
+
+    def test_favorites_invalidate_affected_responses(self):
+        pub_id = self.create("Mesa", self.hogar)
+        urls = [
+            reverse('list_publications'),
+            reverse('publications_by_category', args=[self.hogar.id]),
+            reverse('get_publication', args=[pub_id]),
+        ]
+        otra_categoria = reverse('publications_by_category', args=[self.libros.id])
+        self.client.get(otra_categoria)
+
+        for action in (
+            lambda: self.client.post(reverse('add_favorite', args=[pub_id])),
+            lambda: self.client.delete(reverse('remove_favorite', args=[pub_id])),
+        ):
+            for url in urls:
+                self.client.get(url)
+            self.assertEqual(action().status_code, status.HTTP_200_OK)
+            for url in urls:
+                self.assertEqual(self.client.get(url)["X-Cache"], "MISS")
+        # Otra categoría: sigue en caché
+        self.assertEqual(self.client.get(otra_categoria)["X-Cache"], "HIT")
+
+    def test_reference_lists_invalidate_on_create(self):
+        self.client.get(reverse('list_categories'))
+        self.client.post(reverse('create_category'), {"nombre": "Deportes"}, format='json')
+
+        response = self.client.get(reverse('list_categories'))
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertIn("Deportes", [c["nombre"] for c in response.data["categories"]])
+
+    def test_errors_are_not_cached(self):
+        self.client.get(reverse('get_publication', args=[999]))
+        response = self.client.get(reverse('get_publication', args=[999]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response["X-Cache"], "MISS")
+
+
+class PublicationRowSerializerTestCase(APITestCase):
+    """La ruta rápida debe producir exactamente los mismos bytes que los serializers de DRF"""
+
+    def setUp(self):
+        self.user = UserApp.objects.create(
+            email="rows@example.com",
+            name="Rows",
+            phone="3000000008",
+            address="Dir",
+        )
+        categoria = Category.objects.create(nombre="Hogar")
+        estado = State.objects.create(nombre="Activo")
+        condicion = Condition.objects.create(nombre="Nuevo")
+
+        con_imagenes = Publications.objects.create(
+            user=self.user, categoria=categoria, estado=estado, condition=condicion,
+            titulo="Lámpara \u2028 de pie 🛋", descripcion="Descripción\ncon \"comillas\"", ubicacion="Bogotá",
+        )
+        success, _, _ = PublicationsService.create_publication(
+            self.user.id, categoria.id, estado.id, "Silla ñandú", "Desc", "Cali", None, [make_png_base64()]
+        )
+        self.assertTrue(success)
+        # Imagen heredada con el base64 en la columna
+        PublicationImage.objects.create(publicacion=con_imagenes, imagen=make_png_base64(color=(0, 0, 255)))
+        self.queryset = PublicationsService.read_queryset().order_by('-fecha_publicacion', '-id')
+
+    def assert_same_json(self, fast, reference):
+        self.assertEqual(FastJSONRenderer().render(fast), JSONRenderer().render(reference))
+
+    def test_cards_match_publications_serializer(self):
+        fast = PublicationRowSerializer.cards(PublicationRowSerializer.card_values(self.queryset))
+        reference = []
+        for publicacion in PublicationsSerializer(self.queryset, many=True).data:
+            imagenes = publicacion.pop('imagenes')
+            publicacion.pop('descripcion')
+            publicacion['thumbnail'] = f"{imagenes[0]['url']}?size=160&format=webp" if imagenes else None
+            publicacion['imagenes_count'] = len(imagenes)
+            reference.append(publicacion)
+        self.assert_same_json(fast, reference)
+
+    def test_details_match_publications_serializer(self):
+        for size in (160, 480):
+            fast = PublicationRowSerializer.details(PublicationRowSerializer.detail_values(self.queryset), image_size=size)
+            reference = PublicationsSerializer(self.queryset, many=True, context={'image_size': size}).data
+            self.assert_same_json(fast, reference)
+
+    def test_detail_endpoint_matches_publications_serializer(self):
+        publicacion = self.queryset.first()
+        response = self.client.get(reverse('get_publication', args=[publicacion.id]))
+        expected = JSONRenderer().render({"publication": PublicationsSerializer(publicacion).data, "status": 200})
+        self.assertEqual(response.content, expected)
+
+    def test_fast_renderer_matches_json_renderer(self):
+        from decimal import Decimal
+        from uuid import UUID
+        from django.utils.translation import gettext_lazy
+
+        data = {
+            "fecha": timezone.now(),
+            "dia": timezone.now().date(),
+            "decimal": Decimal("1.50"),
+            "uuid": UUID(int=7),
+            "texto": gettext_lazy("hola \u2029 mundo"),
+            "tupla": (1, None, True),
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        # Enteros fuera de 64 bits: orjson no los acepta y se usa JSONRenderer
+        data["grande"] = 2 ** 70
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_fast_renderer_matches_json_renderer_floats(self):
+        from decimal import Decimal
+
+        floats = [0.0, -0.0, 0.1, 2.5, 1e-4, 1.5e-5, 1e-7, 1e15, 1e16, 1e22, 123456789012345.6, 5e-324, 1.7976931348623157e308]
+        data = {"floats": floats, "anidado": [{"valor": value} for value in floats]}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        for value in floats:
+            self.assertEqual(FastJSONRenderer().render(value), JSONRenderer().render(value))
+
+        # El encoder de DRF convierte Decimal en float
+        data = {"decimal": Decimal("1E+20")}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_fast_renderer_non_finite_floats_follow_json_renderer(self):
+        for value in (float("nan"), float("inf"), float("-inf")):
+            data = {"valores": [1, {"valor": value}]}
+            with self.assertRaises(ValueError):
+                JSONRenderer().render(data)
+            with self.assertRaises(ValueError):
+                FastJSONRenderer().render(data)
+
+            with patch.object(JSONRenderer, "strict", False):
+                self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class PublicationsStreamingTestCase(APITestCase):
+    def setUp(self):
+        self.user = UserApp.objects.create(
+            email="stream@example.com",
+            name="Stream",
+            phone="3000000009",
+            address="Dir",
+        )
+        categoria = Category.objects.create(nombre="Hogar")
+        estado = State.objects.create(nombre="Activo")
+        for i in range(5):
+            pub = Publications.objects.create(
+                user=self.user, categoria=categoria, estado=estado,
+                titulo=f"Pub {i}", descripcion="Desc", ubicacion="Bogotá",
+            )
+            PublicationImage.objects.create(publicacion=pub, imagen=make_png_base64())
+
+    @override_settings(PUBLICATIONS_STREAM_CHUNK_SIZE=2)
+    def test_stream_emits_whole_catalogue_in_batches(self):
+        for view in ("cards", "full"):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(reverse('list_publications'), {"stream": "1", "view": view})
+                content = b''.join(response.streaming_content)
+
+            _, publicaciones = PublicationsService.list_publications()
+            expected = JSONRenderer().render({
+                "publications": PublicationsService.serialize_list(
+                    publicaciones.order_by('-fecha_publicacion', '-id'), full=view == "full"
+                ),
+                "status": 200,
+            })
+            self.assertTrue(response.streaming)
+            self.assertEqual(content, expected)
+            # Tres lotes acotados (2 + 2 + 1), nunca una consulta sin LIMIT sobre el catálogo
+            selects = [q["sql"] for q in ctx.captured_queries if 'FROM "publications_publications"' in q["sql"]]
+            self.assertEqual(len(selects), 3)
+            self.assertTrue(all("LIMIT 2" in sql for sql in selects))
+
+    def test_stream_empty_catalogue(self):
+        Publications.objects.all().delete()
+        response = self.client.get(reverse('list_publications'), {"stream": "1"})
+        self.assertEqual(b''.join(response.streaming_content), b'{"publications":[],"status":200}')
+
+
+class PublicationSparseFieldsTestCase(APITestCase):
+    def setUp(self):
+        self.user = UserApp.objects.create(
+            email="sparse@example.com",
+            name="Sparse",
+            phone="3000000010",
+            address="Dir",
+        )
+        self.client.force_authenticate(self.user)
+        self.categoria = Category.objects.create(nombre="Hogar")
+        estado = State.objects.create(nombre="Activo")
+        self.pub = Publications.objects.create(
+            user=self.user, categoria=self.categoria, estado=estado,
+            titulo="Mesa", descripcion="Desc", ubicacion="Bogotá",
+        )
+        PublicationImage.objects.create(publicacion=self.pub, imagen=make_png_base64())
+
+    def test_fields_trim_output_and_columns(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('list_publications'), {"fields": "titulo,id"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["publications"], [{"id": self.pub.id, "titulo": "Mesa"}])
+        self.assertEqual(len(ctx.captured_queries), 1)
+        sql = ctx.captured_queries[0]["sql"]
+        self.assertNotIn('"descripcion"', sql)
+        self.assertNotIn('publications_publicationimage', sql)
+
+    def test_expand_nests_references_and_images(self):
+        response = self.client.get(reverse('list_publications'), {"fields": "id,categoria", "expand": "categoria,imagenes"})
+
+        item = response.data["publications"][0]
+        self.assertEqual(list(item), ["id", "categoria", "imagenes"])
+        self.assertEqual(item["categoria"], {"id": self.categoria.id, "nombre": "Hogar"})
+        self.assertEqual(len(item["imagenes"]), 1)
+
+    def test_detail_fields(self):
+        response = self.client.get(reverse('get_publication', args=[self.pub.id]), {"fields": "id,descripcion"})
+        self.assertEqual(response.data["publication"], {"id": self.pub.id, "descripcion": "Desc"})
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get(reverse('list_publications'), {"fields": "id,password"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(reverse('list_publications'), {"expand": "titulo"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_nested_publications_in_user_profile(self):
+        response = self.client.get(reverse('get_user_by_email'), {
+            "email": self.user.email, "fields": "name", "fields[publications]": "id,titulo",
+        })
+        self.assertEqual(response.data["user"], {"name": "Sparse"})
+        self.assertEqual(response.data["publications"], [{"id": self.pub.id, "titulo": "Mesa"}])
+
+    def test_drf_serializer_accepts_fields(self):
+        data = PublicationsSerializer(self.pub, fields=("id", "titulo")).data
+        self.assertEqual(data, {"id": self.pub.id, "titulo": "Mesa"})
+
+
+class PublicationImageWritesTestCase(APITestCase):
+    """Las imágenes se validan antes de escribir y se insertan en un solo INSERT dentro de una transacción"""
+
+    def setUp(self):
+        self.user = UserApp.objects.create(
+            email="writes@example.com",
+            name="Writes",
+            phone="3000000011",
+            address="Dir",
+        )
+        self.categoria = Category.objects.create(nombre="Hogar")
+        self.estado = State.objects.create(nombre="Activo")
+
+    def create(self, imagenes, titulo="Mesa"):
+        return PublicationsService.create_publication(
+            self.user.id, self.categoria.id, self.estado.id, titulo, "Desc", "Bogotá", None, imagenes
+        )
+
+    def image_inserts(self, ctx):
+        return [q for q in ctx.captured_queries if q["sql"].startswith('INSERT INTO "publications_publicationimage"')]
+
+    def test_create_inserts_all_images_at_once(self):
+        imagenes = [make_png_base64(color=(i, 0, 0)) for i in range(3)]
+        with CaptureQueriesContext(connection) as ctx:
+            success, _, pub_id = self.create(imagenes + ["sin imagen"])
+
+        self.assertTrue(success)
+        self.assertEqual(PublicationImage.objects.filter(publicacion_id=pub_id).count(), 3)
+        self.assertEqual(len(self.image_inserts(ctx)), 1)
+
+    def test_oversized_image_leaves_nothing_written(self):
+        with patch.object(ImageService, "MAX_IMAGE_SIZE", 10):
+            success, error, pub_id = self.create([make_png_base64(), make_png_base64(size=(40, 40))])
+
+        self.assertFalse(success)
+        self.assertIn("demasiado grande", error)
+        self.assertIsNone(pub_id)
+        self.assertFalse(Publications.objects.exists())
+        self.assertFalse(PublicationImage.objects.exists())
+
+    def test_update_with_oversized_image_keeps_previous_state(self):
+        _, _, pub_id = self.create([make_png_base64()])
+
+        with patch.object(ImageService, "MAX_IMAGE_SIZE", 10):
+            success, _ = PublicationsService.update_publication(
+                pub_id, titulo="Otro título", nuevas_imagenes=[make_png_base64(size=(40, 40))]
+            )
+
+        self.assertFalse(success)
+        self.assertEqual(Publications.objects.get(id=pub_id).titulo, "Mesa")
+        self.assertEqual(PublicationImage.objects.filter(publicacion_id=pub_id).count(), 1)
+
+    def test_update_replaces_images_with_one_delete_and_one_insert(self):
+        _, _, pub_id = self.create([make_png_base64()])
+
+        with CaptureQueriesContext(connection) as ctx:
+            success, _ = PublicationsService.update_publication(
+                pub_id, nuevas_imagenes=[make_png_base64(color=(0, i, 0)) for i in range(2)]
+            )
+
+        self.assertTrue(success)
+        self.assertEqual(PublicationImage.objects.filter(publicacion_id=pub_id).count(), 2)
+        self.assertEqual(len(self.image_inserts(ctx)), 1)
+
+
+class BlobCollectionTestCase(APITestCase):
+    """collect_blobs borra solo los blobs y derivadas que ya nada referencia"""
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        settings_override = override_settings(BLOB_STORAGE_ROOT=root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.storage = get_blob_storage()
+
+        self.user = UserApp.objects.create(
+            email="blobs@example.com",
+            name="Blobs",
+            phone="3000000013",
+            address="Dir",
+        )
+        self.publication = Publications.objects.create(
+            user=self.user,
+            categoria=Category.objects.create(nombre="Hogar"),
+            estado=State.objects.create(nombre="Activo"),
+            titulo="Mesa",
+            descripcion="Desc",
+            ubicacion="Bogotá",
+        )
+
+    def derivative(self, source_digest, data):
+        return ImageDerivative.objects.create(
+            source_digest=source_digest, size=64, format="webp", digest=self.storage.save(data),
+            content_type="image/webp", byte_size=len(data), width=1, height=1,
+        )
+
+    def make_blobs(self):
+        publicada = self.storage.save(b"publicada")
+        PublicationImage.objects.create(publicacion=self.publication, digest=publicada)
+        avatar = self.storage.save(b"avatar")
+        ImagesUsers.objects.create(user=self.user, digest=avatar)
+        miniatura = self.derivative(publicada, b"miniatura").digest
+
+        huerfano = self.storage.save(b"huerfano")
+        borrada = self.storage.save(b"imagen borrada")
+        derivada_huerfana = self.derivative(borrada, b"miniatura huerfana")
+        return [publicada, avatar, miniatura], [huerfano, borrada, derivada_huerfana.digest]
+
+    def test_collect_removes_only_unreferenced(self):
+        vivos, huerfanos = self.make_blobs()
+
+        out = StringIO()
+        call_command("collect_blobs", "--min-age", "0", stdout=out)
+
+        for digest in vivos:
+            self.assertTrue(self.storage.exists(digest))
+        for digest in huerfanos:
+            self.assertFalse(self.storage.exists(digest))
+        self.assertEqual(ImageDerivative.objects.count(), 1)
+        self.assertIn("1 derivadas huérfanas, 3 blobs", out.getvalue())
+
+    def test_dry_run_deletes_nothing(self):
+        vivos, huerfanos = self.make_blobs()
+
+        derivadas, blobs, _ = BlobCollectionService.collect(min_age_seconds=0, dry_run=True)
+
+        self.assertEqual((derivadas, blobs), (1, 3))
+        for digest in vivos + huerfanos:
+            self.assertTrue(self.storage.exists(digest))
+        self.assertEqual(ImageDerivative.objects.count(), 2)
+
+    def test_incomplete_backend_fails_on_creation(self):
+        from ecoSwap.blob_storage import BlobStorage
+
+        # Sin digests() ni modified_time(): collect_blobs no podría recorrerlo
+        class SinRecoleccion(BlobStorage):
+            save = open = exists = size = delete = lambda self, *args: None
+
+        with self.assertRaises(TypeError):
+            SinRecoleccion()
+
+    def test_recent_orphans_are_kept(self):
+        huerfano = self.storage.save(b"subida en curso")
+
+        _, blobs, _ = BlobCollectionService.collect()
+
+        self.assertEqual(blobs, 0)
+        self.assertTrue(self.storage.exists(huerfano))
+
+
+class PublicationImageDeltaTestCase(APITestCase):
+    """Edición parcial de la galería: agregar, eliminar y reordenar por id"""
+
+    def setUp(self):
+        self.user = UserApp.objects.create(
+            email="delta@example.com",
+            name="Delta",
+            phone="3000000012",
+            address="Dir",
+        )
+        self.client.force_authenticate(self.user)
+        categoria = Category.objects.create(nombre="Hogar")
+        estado = State.objects.create(nombre="Activo")
+        _, _, self.pub_id = PublicationsService.create_publication(
+            self.user.id, categoria.id, estado.id, "Mesa", "Desc", "Bogotá", None,
+            [make_png_base64(color=(i, 0, 0)) for i in range(3)]
+        )
+        self.a, self.b, self.c = self.gallery()
+        self.url = reverse('edit_publication', args=[self.pub_id])
+
+    def gallery(self):
+        response = self.client.get(reverse('get_publication', args=[self.pub_id]))
+        return [imagen['id'] for imagen in response.data['publication']['imagenes']]
+
+    def image_writes(self, ctx):
+        return [
+            q["sql"].split()[0] for q in ctx.captured_queries
+            if '"publications_publicationimage"' in q["sql"] and not q["sql"].startswith("SELECT")
+        ]
+
+    def test_edit_without_images_keeps_gallery(self):
+        response = self.client.put(self.url, {"titulo": "Mesa de roble"}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.gallery(), [self.a, self.b, self.c])
+
+    def test_add_appends_with_a_single_insert(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.put(self.url, {"agregar_imagenes": [make_png_base64(color=(0, 0, 9))]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.image_writes(ctx), ["INSERT"])
+        gallery = self.gallery()
+        self.assertEqual(gallery[:3], [self.a, self.b, self.c])
+        self.assertEqual(len(gallery), 4)
+
+    def test_remove_only_deletes_that_image(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.put(self.url, {"eliminar_imagenes": [self.a]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.image_writes(ctx), ["DELETE"])
+        self.assertEqual(self.gallery(), [self.b, self.c])
+
+    def test_reorder_updates_only_moved_rows(self):
+        response = self.client.put(self.url, {"orden_imagenes": [self.b, self.a]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.gallery(), [self.b, self.a, self.c])
+        # c ya estaba en la posición 2: no se reescribe
+        self.assertEqual(PublicationImage.objects.get(id=self.c).orden, 2)
+
+    def test_combined_delta(self):
+        response = self.client.put(self.url, {
+            "eliminar_imagenes": [self.b],
+            "orden_imagenes": [self.c],
+            "agregar_imagenes": [make_png_base64(color=(0, 9, 0))],
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        gallery = self.gallery()
+        self.assertEqual(gallery[:2], [self.c, self.a])
+        self.assertEqual(len(gallery), 3)
+
+    def test_unknown_or_invalid_image_ids_are_rejected(self):
+        for data in ({"eliminar_imagenes": [self.a, 999999]}, {"orden_imagenes": ["primera"]}, {"orden_imagenes": [self.a, self.a]}):
+            response = self.client.put(self.url, data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertEqual(self.gallery(), [self.a, self.b, self.c])
+
+    def test_replace_and_delta_cannot_be_mixed(self):
+        response = self.client.put(self.url, {
+            "imagenes": [make_png_base64()],
+            "eliminar_imagenes": [self.a],
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.gallery(), [self.a, self.b, self.c])
+
+
+class PublicationQueryPlanTestCase(APITestCase):
+    """Las consultas calientes usan los índices compuestos (EXPLAIN sobre SQLite)"""
+
+    def test_user_publications_use_composite_index_without_sort(self):
+        _, publicaciones = PublicationsService.list_user_publications(1)
+        plan = publicaciones.order_by('-fecha_publicacion', '-id').explain()
+
+        self.assertIn("pub_user_fecha_id_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_state_filter_uses_composite_index_without_sort(self):
+        _, publicaciones = PublicationsService.list_publications(estado_id=1)
+        plan = publicaciones.order_by('-fecha_publicacion', '-id').explain()
+
+        self.assertIn("pub_estado_fecha_id_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_favorite_lookup_uses_unique_index(self):
+        plan = FavoritePublication.objects.filter(user_id=1, publicacion_id=1).explain()
+
+        self.assertIn("(user_id=? AND publicacion_id=?)", plan)
+
+    def test_favorite_is_unique_per_user_and_publication(self):
+        user = UserApp.objects.create(email="fav@example.com", name="Fav", phone="3000000013", address="Dir")
+        pub = Publications.objects.create(
+            user=user,
+            categoria=Category.objects.create(nombre="Hogar"),
+            estado=State.objects.create(nombre="Activo"),
+            titulo="Mesa",
+            descripcion="Desc",
+            ubicacion="Bogotá",
+        )
+        FavoritePublication.objects.create(user=user, publicacion=pub)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            FavoritePublication.objects.create(user=user, publicacion=pub)
+
+        success, _ = PublicationsService.add_favorite(user.id, pub.id)
+        self.assertFalse(success)
@@ -0,0 +1,107 @@
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ecoSwap.query_budget import Budget, QueryBudgetMixin, seed_marketplace
+from publications.models import PublicationImage
+
+
+class PublicationsQueryBudgetTestCase(QueryBudgetMixin, APITestCase):
+    """Consultas SQL y bytes máximos por URL de publications/urls.py con volumen realista"""
+
+    urlconf = 'publications.urls'
+    BUDGETS = {
+        'create_publication': Budget(22, 4096),
+        'edit_publication': Budget(8, 512),
+        'list_publications': Budget(4, 72 * 1024),
+        'search_publications': Budget(5, 8192),
+        'autocomplete_publications': Budget(4, 2048),
+        'publication_facets': Budget(8, 1024),
+        'get_publication': Budget(4, 4096),
+        'publications_by_category': Budget(3, 8192),
+        'get_publication_image': Budget(1, 1024),
+        'add_favorite': Budget(8, 512),
+        'remove_favorite': Budget(4, 512),
+        'list_user_favorites': Budget(4, 24 * 1024),
+        'list_user_publications': Budget(4, 32 * 1024),
+        'create_category': Budget(8, 512),
+        'list_categories': Budget(6, 1024),
+        'get_category': Budget(3, 512),
+        'create_state': Budget(8, 512),
+        'list_states': Budget(6, 1024),
+        'get_state': Budget(3, 512),
+        'list_condition': Budget(6, 1024),
+        'get_condition': Budget(3, 512),
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seed = seed_marketplace()
+        cls.user = cls.seed.users[0]
+        cls.publicacion = cls.seed.publicaciones[0]
+
+    def test_create_publication(self):
+        self.assertWithinBudget('create_publication', 'post', data={
+            "titulo": "Silla plegable",
+            "descripcion": "Como nueva",
+            "categoria_id": self.seed.categorias[0].id,
+            "estado_id": self.seed.estados[0].id,
+            "condicion_id": self.seed.condiciones[0].id,
+            "ubicacion": "Cali",
+            "imagenes": [self.seed.data_uri] * 3,
+        }, user=self.user, expected_status=status.HTTP_201_CREATED)
+
+    def test_edit_publication(self):
+        self.assertWithinBudget(
+            'edit_publication', 'put', args=[self.publicacion.id], data={"titulo": "Bicicleta de ruta"}, user=self.user
+        )
+
+    def test_list_publications(self):
+        for params in ({}, {"view": "full"}, {"stream": "1"}, {"estado_id": self.seed.estados[0].id, "limit": 50}):
+            with self.subTest(params=params):
+                self.assertWithinBudget('list_publications', data=params, user=self.user)
+
+    def test_search_publications(self):
+        for params in ({"q": "bicicleta"}, {"q": "bisicleta", "mode": "fuzzy"}, {"q": "mesa", "categoria_id": self.seed.categorias[1].id}):
+            with self.subTest(params=params):
+                self.assertWithinBudget('search_publications', data=params, user=self.user)
+
+    def test_autocomplete_publications(self):
+        self.assertWithinBudget('autocomplete_publications', data={"q": "bic"}, user=self.user)
+
+    def test_publication_facets(self):
+        self.assertWithinBudget('publication_facets', data={"categoria_id": self.seed.categorias[0].id}, user=self.user)
+
+    def test_get_publication(self):
+        self.assertWithinBudget('get_publication', args=[self.publicacion.id], user=self.user)
+
+    def test_publications_by_category(self):
+        self.assertWithinBudget('publications_by_category', args=[self.seed.categorias[0].id], user=self.user)
+
+    def test_get_publication_image(self):
+        imagen = PublicationImage.objects.filter(publicacion=self.publicacion).first()
+        self.assertWithinBudget('get_publication_image', args=[imagen.id])
+
+    def test_add_and_remove_favorite(self):
+        otra = self.seed.publicaciones[-1]
+        self.assertWithinBudget('add_favorite', 'post', args=[otra.id], user=self.user)
+        self.assertWithinBudget('remove_favorite', 'delete', args=[otra.id], user=self.user)
+
+    def test_list_user_favorites(self):
+        self.assertWithinBudget('list_user_favorites', data={"view": "full"}, user=self.user)
+
+    def test_list_user_publications(self):
+        self.assertWithinBudget('list_user_publications', data={"view": "full"}, user=self.user)
+
+    def test_reference_tables(self):
+        self.assertWithinBudget(
+            'create_category', 'post', data={"nombre": "Jardín"}, user=self.user, expected_status=status.HTTP_201_CREATED
+        )
+        self.assertWithinBudget('list_categories', user=self.user)
+        self.assertWithinBudget('get_category', args=[self.seed.categorias[0].id], user=self.user)
+        self.assertWithinBudget(
+            'create_state', 'post', data={"nombre": "Vendido"}, user=self.user, expected_status=status.HTTP_201_CREATED
+        )
+        self.assertWithinBudget('list_states', user=self.user)
+        self.assertWithinBudget('get_state', args=[self.seed.estados[0].id], user=self.user)
+        self.assertWithinBudget('list_condition', user=self.user)
+        self.assertWithinBudget('get_condition', args=[self.seed.condiciones[0].id], user=self.user)
@@ -0,0 +1,104 @@
+import threading
+import time
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase
+
+from ecoSwap.single_flight import SingleFlight, cached_call
+
+
+class SingleFlightTestCase(SimpleTestCase):
+    def setUp(self):
+        self.cache = LocMemCache('single-flight-tests', {})
+        self.cache.clear()
+        self.flight = SingleFlight()
+        self.calls = 0
+        self.calls_lock = threading.Lock()
+
+    def slow_compute(self, value="fresh", delay=0.1):
+        def compute():
+            with self.calls_lock:
+                self.calls += 1
+            time.sleep(delay)
+            return value
+        return compute
+
+    def run_concurrently(self, fn, workers=10):
+        barrier = threading.Barrier(workers)
+        results, errors = [], []
+
+        def target():
+            barrier.wait()
+            try:
+                results.append(fn())
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=target) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, errors
+
+    def test_concurrent_misses_compute_once(self):
+        compute = self.slow_compute()
+        results, errors = self.run_concurrently(
+            lambda: cached_call(self.cache, "front-page", compute, 60, single_flight=self.flight)
+        )
+
+        self.assertEqual(errors, [])
+        self.assertEqual(results, ["fresh"] * 10)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.cache.get("front-page")[0], "fresh")
+
+    def test_expired_entry_serves_stale_while_one_caller_refreshes(self):
+        self.cache.set("front-page", ("old", 0.1, time.time() - 1), 60)
+        compute = self.slow_compute()
+
+        results, errors = self.run_concurrently(
+            lambda: cached_call(self.cache, "front-page", compute, 60, single_flight=self.flight)
+        )
+
+        self.assertEqual(errors, [])
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(sorted(results), ["fresh"] + ["old"] * 9)
+        self.assertEqual(cached_call(self.cache, "front-page", compute, 60, single_flight=self.flight), "fresh")
+
+    def test_refresh_lock_held_by_another_process_serves_stale(self):
+        self.cache.set("front-page", ("old", 0.1, time.time() - 1), 60)
+        self.cache.add("front-page:refresh", 1, 60)
+
+        value = cached_call(self.cache, "front-page", self.slow_compute(delay=0), 60, single_flight=self.flight)
+
+        self.assertEqual(value, "old")
+        self.assertEqual(self.calls, 0)
+
+    def test_errors_reach_every_waiter_and_are_not_cached(self):
+        def failing():
+            with self.calls_lock:
+                self.calls += 1
+            time.sleep(0.1)
+            raise RuntimeError("db caída")
+
+        results, errors = self.run_concurrently(
+            lambda: cached_call(self.cache, "front-page", failing, 60, single_flight=self.flight)
+        )
+
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), 10)
+        self.assertEqual(self.calls, 1)
+        self.assertIsNone(self.cache.get("front-page"))
+        self.assertFalse(self.flight.in_flight("front-page"))
+
+    def test_probabilistic_early_refresh(self):
+        # Faltan 5 segundos para expirar y el último cálculo tardó 1 segundo
+        self.cache.set("front-page", ("old", 1.0, time.time() + 5), 60)
+        compute = self.slow_compute(delay=0)
+
+        self.assertEqual(cached_call(self.cache, "front-page", compute, 60, beta=0, single_flight=self.flight), "old")
+        self.assertEqual(self.calls, 0)
+
+        # Un beta enorme hace que el refresco anticipado ocurra casi con certeza
+        self.assertEqual(cached_call(self.cache, "front-page", compute, 60, beta=1e9, single_flight=self.flight), "fresh")
+        self.assertEqual(self.calls, 1)
@@ -6,8 +6,12 @@ urlpatterns = [
     path('create', views.create_publication, name='create_publication'),
     path('edit/<int:pub_id>', views.edit_publication, name='edit_publication'),
     path('list', views.list_publications, name='list_publications'),
+    path('search', views.search_publications, name='search_publications'),
+    path('autocomplete', views.autocomplete_publications, name='autocomplete_publications'),
+    path('facets', views.publication_facets, name='publication_facets'),
     path('<int:pub_id>', views.get_publication, name='get_publication'),
     path('category/<int:categoria_id>', views.publications_by_category, name='publications_by_category'),
+    path('images/<int:image_id>', views.get_publication_image, name='get_publication_image'),
 
     # Favoritos
     path('favorites/add/<int:pub_id>', views.add_favorite, name='add_favorite'),
@@ -2,8 +2,17 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
 from ..services.publications_service import PublicationsService
+from ..services.derivative_service import DerivativeService
 from ..serializers import PublicationsSerializer, CategorySerializer, StateSerializer, ConditionSerializer
+from ecoSwap.blob_response import FALLBACK_CACHE_CONTROL, blob_response, legacy_blob_response
+from ecoSwap.response_cache import cached_response
+from ecoSwap.streaming import streaming_json_response
+from ecoSwap.fieldsets import FieldsetError
+
+PAGE_PARAMS = ('cursor', 'limit', 'view', 'fields', 'expand')
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -51,6 +60,16 @@ def create_publication(request):
         )
 
 
+def _data_list(request, name):
+    """ Lista desde un arreglo JSON, un valor suelto o un campo multipart repetido; None si no viene """
+    if name not in request.data:
+        return None
+    if hasattr(request.data, 'getlist'):
+        return request.data.getlist(name)
+    value = request.data.get(name)
+    return value if isinstance(value, list) else [value]
+
+
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated])
 def edit_publication(request, pub_id):
@@ -72,9 +91,17 @@ def edit_publication(request, pub_id):
             imagenes_data = request.data.get('imagenes')
             if imagenes_data is not None:  # Permitir lista vacía para eliminar todas las imágenes
                 nuevas_imagenes = imagenes_data if isinstance(imagenes_data, list) else [imagenes_data]
+            else:
+                nuevas_imagenes = None
+
+        # Edición parcial de la galería: solo viaja lo que cambia
+        agregar_imagenes = request.FILES.getlist('agregar_imagenes') or _data_list(request, 'agregar_imagenes')
 
         success, msg = PublicationsService.update_publication(
-            pub_id, categoria_id, estado_id, titulo, descripcion, ubicacion, condicion_id, nuevas_imagenes
+            pub_id, categoria_id, estado_id, titulo, descripcion, ubicacion, condicion_id, nuevas_imagenes,
+            agregar_imagenes=agregar_imagenes,
+            eliminar_imagenes=_data_list(request, 'eliminar_imagenes'),
+            orden_imagenes=_data_list(request, 'orden_imagenes'),
         )
 
         if success:
@@ -88,32 +115,156 @@ def edit_publication(request, pub_id):
         )
 
 
+def _fieldset_error(error):
+    return Response({"error": str(error), "status": 400}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def _publications_page_response(request, publicaciones):
+    """ Respuesta paginada por cursor: ?cursor=<next_cursor>&limit=<n>&fields=a,b&expand=imagenes """
+    try:
+        fields, expand = PublicationsService.fieldset(request.query_params, full=request.query_params.get('view') == 'full')
+    except FieldsetError as e:
+        return _fieldset_error(e)
+
+    success, page = PublicationsService.list_page(
+        publicaciones,
+        cursor=request.query_params.get('cursor'),
+        limit=request.query_params.get('limit'),
+        fields=fields,
+        expand=expand,
+    )
+    if not success:
+        return Response({"error": page, "status": 400}, status=status.HTTP_400_BAD_REQUEST)
+
+    data, next_cursor = page
+    return Response({"publications": data, "next_cursor": next_cursor, "status": 200}, status=status.HTTP_200_OK)
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cached_response('list_publications', ('publications:list', 'reference'), params=('estado_id', 'stream') + PAGE_PARAMS)
 def list_publications(request):
     estado_id = request.query_params.get('estado_id')
     success, publicaciones = PublicationsService.list_publications(estado_id)
-    serializer = PublicationsSerializer(publicaciones, many=True)
-    return Response({"publications": serializer.data, "status": 200}, status=status.HTTP_200_OK)
+
+    # ?stream=1 emite el catálogo completo por lotes, sin cursor y con memoria constante
+    if request.query_params.get('stream') in ('1', 'true'):
+        try:
+            fields, expand = PublicationsService.fieldset(request.query_params, full=request.query_params.get('view') == 'full')
+        except FieldsetError as e:
+            return _fieldset_error(e)
+        return streaming_json_response(
+            PublicationsService.list_batches(publicaciones, fields=fields, expand=expand),
+            key="publications",
+            extra={"status": 200},
+        )
+    return _publications_page_response(request, publicaciones)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def search_publications(request):
+    """ Búsqueda por texto: ?q=&mode=fulltext|fuzzy&categoria_id=&estado_id=&condicion_id=&cursor=&limit= """
+    success, result = PublicationsService.search_publications(
+        request.query_params.get('q'),
+        categoria_id=request.query_params.get('categoria_id'),
+        estado_id=request.query_params.get('estado_id'),
+        condicion_id=request.query_params.get('condicion_id'),
+        cursor=request.query_params.get('cursor'),
+        limit=request.query_params.get('limit'),
+        mode=request.query_params.get('mode'),
+    )
+    if not success:
+        return Response({"error": result, "status": 400}, status=status.HTTP_400_BAD_REQUEST)
+
+    data, next_cursor = result
+    return Response({"publications": data, "next_cursor": next_cursor, "status": 200}, status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+def autocomplete_publications(request):
+    """ Sugerencias mientras se escribe: ?q=&limit=&categoria_id= """
+    success, suggestions = PublicationsService.autocomplete(
+        request.query_params.get('q', ''),
+        request.query_params.get('limit'),
+        request.query_params.get('categoria_id'),
+    )
+    if not success:
+        return Response({"error": suggestions, "status": 400}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({"suggestions": suggestions, "status": 200}, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def publication_facets(request):
+    """ Conteos por categoría, estado y condición: ?categoria_id=&estado_id=&condicion_id= """
+    success, facets = PublicationsService.facets(
+        request.query_params.get('categoria_id'),
+        request.query_params.get('estado_id'),
+        request.query_params.get('condicion_id'),
+    )
+    if not success:
+        return Response({"error": facets, "status": 400}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({"facets": facets, "status": 200}, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@cached_response(
+    'get_publication',
+    lambda request, pub_id: (f'publications:detail:{pub_id}', 'reference'),
+    params=('fields', 'expand'),
+)
 def get_publication(request, pub_id):
-    success, pub_or_msg = PublicationsService.get_publication(pub_id)
+    try:
+        fields, expand = PublicationsService.fieldset(request.query_params, full=True)
+    except FieldsetError as e:
+        return _fieldset_error(e)
+
+    success, data_or_msg = PublicationsService.get_publication_data(pub_id, fields, expand)
     if success:
-        serializer = PublicationsSerializer(pub_or_msg)
-        return Response({"publication": serializer.data, "status": 200}, status=status.HTTP_200_OK)
+        return Response({"publication": data_or_msg, "status": 200}, status=status.HTTP_200_OK)
     else:
-        return Response({"error": pub_or_msg, "status": 404}, status=status.HTTP_404_NOT_FOUND)
+        return Response({"error": data_or_msg, "status": 404}, status=status.HTTP_404_NOT_FOUND)
+
+
+@require_GET
+def get_publication_image(request, image_id):
+    """
+    Transmite los bytes de una imagen (o de una de sus miniaturas) con ETag, 304 y soporte de Range.
+    Es una vista Django simple: responde binario y no pasa por la negociación de DRF.
+    """
+    success, imagen = PublicationsService.get_image(image_id)
+    if not success:
+        return JsonResponse({"error": imagen, "status": 404}, status=status.HTTP_404_NOT_FOUND)
+
+    if not imagen.digest:
+        return legacy_blob_response(request, imagen.imagen, imagen.fecha)
+
+    # ?size=480&format=webp sirve la miniatura; si aún no existe se sirve el original sin cachearlo
+    size = request.GET.get('size')
+    if size:
+        derivada = DerivativeService.resolve(imagen.digest, size, request.GET.get('format', 'webp'))
+        if derivada:
+            return blob_response(request, derivada.digest, derivada.content_type, derivada.fecha)
+        return blob_response(
+            request, imagen.digest, imagen.content_type, imagen.fecha, cache_control=FALLBACK_CACHE_CONTROL
+        )
+
+    return blob_response(request, imagen.digest, imagen.content_type, imagen.fecha)
 
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cached_response(
+    'publications_by_category',
+    lambda request, categoria_id: (f'publications:category:{categoria_id}', 'reference'),
+    params=PAGE_PARAMS,
+)
 def publications_by_category(request, categoria_id):
     success, publicaciones = PublicationsService.list_publications_by_category(categoria_id)
-    serializer = PublicationsSerializer(publicaciones, many=True)
-    return Response({"publications": serializer.data, "status": 200}, status=status.HTTP_200_OK)
+    return _publications_page_response(request, publicaciones)
 
 
 @api_view(['POST'])
@@ -143,8 +294,13 @@ def remove_favorite(request, pub_id):
 def list_user_favorites(request):
     user = request.user
     success, publicaciones = PublicationsService.list_favorites(user.id)
-    serializer = PublicationsSerializer(publicaciones, many=True)
-    return Response({"favorites": serializer.data, "status": 200}, status=status.HTTP_200_OK)
+    try:
+        fields, expand = PublicationsService.fieldset(request.query_params, full=request.query_params.get('view') == 'full')
+    except FieldsetError as e:
+        return _fieldset_error(e)
+
+    data = PublicationsService.serialize_list(publicaciones, fields=fields, expand=expand)
+    return Response({"favorites": data, "status": 200}, status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
@@ -152,8 +308,13 @@ def list_user_favorites(request):
 def list_user_publications(request):
     user = request.user
     success, publicaciones = PublicationsService.list_user_publications(user.id)
-    serializer = PublicationsSerializer(publicaciones, many=True)
-    return Response({"publications": serializer.data, "status": 200}, status=status.HTTP_200_OK)
+    try:
+        fields, expand = PublicationsService.fieldset(request.query_params, full=request.query_params.get('view') == 'full')
+    except FieldsetError as e:
+        return _fieldset_error(e)
+
+    data = PublicationsService.serialize_list(publicaciones, fields=fields, expand=expand)
+    return Response({"publications": data, "status": 200}, status=status.HTTP_200_OK)
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -178,6 +339,7 @@ def create_category(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cached_response('list_categories', ('reference',))
 def list_categories(request):
     success, categorias = PublicationsService.list_categories()
     serializer = CategorySerializer(categorias, many=True)
@@ -218,6 +380,7 @@ def create_state(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cached_response('list_states', ('reference',))
 def list_states(request):
     success, estados = PublicationsService.list_states()
     serializer = StateSerializer(estados, many=True)
@@ -237,6 +400,7 @@ def get_state(request, estado_id):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cached_response('list_condition', ('reference',))
 def list_condition(request):
     success, condiciones = PublicationsService.list_condition()
     serializer = ConditionSerializer(condiciones, many=True)
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reputation', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='detailreputation',
+            index=models.Index(fields=['rated_user', 'rating'], name='rep_rated_user_rating_idx'),
+        ),
+    ]
@@ -11,10 +11,10 @@ class Reputation(models.Model):
     score = models.FloatField(default=0)
 
     def update_score(self):
-        ratings = detailReputation.objects.filter(rated_user=self.user)
-        if ratings.exists():
-            self.score = ratings.aggregate(models.Avg('rating'))['rating__avg']
-            self.save()
+        average = detailReputation.objects.filter(rated_user=self.user).aggregate(models.Avg('rating'))['rating__avg']
+        if average is not None:
+            self.score = average
+            self.save(update_fields=['score'])
 
 
 class detailReputation(models.Model):
@@ -38,3 +38,7 @@ class detailReputation(models.Model):
 
     class Meta:
         unique_together = ('exchange', 'reviewer')
+        indexes = [
+            # Reseñas recibidas y su promedio (update_score) sin leer la tabla
+            models.Index(fields=['rated_user', 'rating'], name='rep_rated_user_rating_idx'),
+        ]
@@ -6,7 +6,9 @@ class ReputationService:
     @classmethod
     def rate_exchange(cls, user, exchange_id, rating, comment):
         try:
-            exchange = Exchange.objects.get(id=exchange_id)
+            exchange = Exchange.objects.select_related(
+                'requested_item__user', 'offered_item__user'
+            ).get(id=exchange_id)
         except Exchange.DoesNotExist:
             return False, "El intercambio no existe."
 
@@ -46,15 +48,18 @@ class ReputationService:
             details_rate = []
             
             reputation = Reputation.objects.get(user__id=user_id)
-            details = detailReputation.objects.filter(rated_user__id=user_id)
+            # Solo los ids de intercambio y autor: una consulta sin importar cuántas reseñas haya
+            details = detailReputation.objects.filter(rated_user__id=user_id).values(
+                'exchange_id', 'reviewer_id', 'rating', 'comment', 'created_at'
+            )
 
             for detail in details:
                 details_rate.append({
-                    "exchange_id": detail.exchange.id,
-                    "reviewer_id": detail.reviewer.id,
-                    "rating": detail.rating,
-                    "comment": detail.comment,
-                    "created_at": detail.created_at
+                    "exchange_id": detail['exchange_id'],
+                    "reviewer_id": detail['reviewer_id'],
+                    "rating": detail['rating'],
+                    "comment": detail['comment'],
+                    "created_at": detail['created_at']
                 })
 
             
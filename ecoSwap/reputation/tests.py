@@ -1,3 +1,42 @@
+from django.db.models import Avg
 from django.test import TestCase
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from ecoSwap.query_budget import Budget, QueryBudgetMixin, seed_marketplace
+from exchanges.models import Exchange
+from reputation.models import detailReputation
+
+
+class ReputationQueryPlanTest(TestCase):
+    def test_received_reviews_average_reads_only_the_index(self):
+        reviews = detailReputation.objects.filter(rated_user_id=1)
+        plan = reviews.values('rated_user').annotate(score=Avg('rating')).explain()
+
+        self.assertIn("COVERING INDEX rep_rated_user_rating_idx", plan)
+
+
+class ReputationQueryBudgetTest(QueryBudgetMixin, APITestCase):
+    """Consultas SQL y bytes máximos por URL de reputation/urls.py con volumen realista"""
+
+    urlconf = 'reputation.urls'
+    BUDGETS = {
+        'rate_exchange': Budget(9, 512),
+        'get_reputation': Budget(3, 1024),
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seed = seed_marketplace()
+        cls.user = cls.seed.users[0]
+
+    def test_rate_exchange(self):
+        # El usuario 0 pidió un artículo en este intercambio y aún no lo ha calificado
+        exchange = Exchange.objects.filter(
+            requested_item__user=self.user, status=Exchange.Status.ACCEPTED
+        ).first()
+        self.assertWithinBudget('rate_exchange', 'post', data={
+            "exchange_id": exchange.id, "rating": 5, "comment": "Excelente",
+        }, user=self.user)
+
+    def test_get_reputation(self):
+        self.assertWithinBudget('get_reputation', user=self.user)
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        from django.db.models.signals import post_delete
+        from .models import UserApp
+        from .services.user_cache import AuthUserCache
+
+        # Un usuario borrado no debe seguir autenticándose desde la caché
+        post_delete.connect(AuthUserCache.invalidate, sender=UserApp, weak=False)
@@ -1,7 +1,10 @@
+from django.conf import settings
 from rest_framework.authentication import BaseAuthentication 
 from rest_framework.exceptions import AuthenticationFailed 
 from .services.jwt_service import JWTService 
-from .models import UserApp
+from .services.token_denylist import TokenDenylist
+from .services.user_cache import AuthUserCache, TokenVersionCache
+from .models import LazyUserApp, UserApp
 
 class CustomJWTAuthentication(BaseAuthentication): 
     """ Autenticación JWT personalizada """ 
@@ -33,9 +36,31 @@ class CustomJWTAuthentication(BaseAuthentication):
         if not email:
              raise AuthenticationFailed('Token no contiene email') 
         
-        user = UserApp.objects.filter(email=email.lower()).first()
-        if not user: 
-            raise AuthenticationFailed('Usuario no encontrado') 
+        # Tokens revocados uno a uno (logout); casi siempre se descarta en memoria
+        if TokenDenylist.is_revoked(payload.get('jti')):
+            raise AuthenticationFailed('Token revocado') 
+
+        # Modo sin estado: el usuario sale de los claims y la fila se carga solo si se usa
+        if settings.JWT_STATELESS_AUTH and 'user_id' in payload and 'token_version' in payload:
+            version = TokenVersionCache.get(payload['user_id'])
+            if version is None:
+                raise AuthenticationFailed('Usuario no encontrado') 
+            if payload['token_version'] != version:
+                raise AuthenticationFailed('Token revocado') 
+            return (LazyUserApp.from_claims(payload), token)
+
+        # Los aciertos en la caché evitan la consulta a la base de datos
+        cache_key = payload.get('jti') or f"{email.lower()}:{payload.get('iat')}"
+        user = AuthUserCache.get(cache_key)
+        if user is None:
+            user = UserApp.objects.filter(email=email.lower()).first()
+            if not user: 
+                raise AuthenticationFailed('Usuario no encontrado') 
+            AuthUserCache.put(cache_key, user)
+
+        # Tokens emitidos antes del último logout (los antiguos no traen versión)
+        if payload.get('token_version', user.token_version) != user.token_version:
+            raise AuthenticationFailed('Token revocado') 
         
         # Retornar (user, token) 
         return (user, token) 
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from users.services.session_service import SessionService
+
+
+class Command(BaseCommand):
+    help = "Borra por lotes las sesiones de refresh token expiradas (programar periódicamente, p. ej. con cron)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Sesiones borradas por consulta")
+
+    def handle(self, *args, **options):
+        deleted = SessionService.purge_expired(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Sesiones expiradas borradas: {deleted}"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from users.services.token_denylist import TokenDenylist
+
+
+class Command(BaseCommand):
+    help = "Borra los tokens revocados que ya expiraron (programar periódicamente, p. ej. con cron)"
+
+    def handle(self, *args, **options):
+        deleted = TokenDenylist.purge()
+        self.stdout.write(self.style.SUCCESS(f"Tokens revocados expirados borrados: {deleted}"))
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2025-11-15 03:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserApp',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('username', models.CharField(blank=True, max_length=150, null=True)),
+                ('name', models.CharField(max_length=100)),
+                ('email', models.EmailField(max_length=254, unique=True)),
+                ('phone', models.CharField(max_length=10, unique=True)),
+                ('password', models.CharField(max_length=256)),
+                ('address', models.CharField(max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('token', models.TextField(blank=True, null=True)),
+                ('refresh_token', models.TextField(blank=True, null=True)),
+                ('token_expires', models.DateTimeField(blank=True, null=True)),
+                ('refresh_token_expires', models.DateTimeField(blank=True, null=True)),
+                ('reset_code', models.CharField(blank=True, max_length=6, null=True)),
+                ('reset_code_expires', models.DateTimeField(blank=True, null=True)),
+                ('reset_code_used', models.BooleanField(default=False)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ImagesUsers',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('image', models.TextField()),
+                ('uploaded_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='users.userapp')),
+            ],
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_blob_image_metadata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LazyUserApp',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('users.userapp',),
+        ),
+        migrations.AddField(
+            model_name='userapp',
+            name='token_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
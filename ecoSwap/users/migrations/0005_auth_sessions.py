@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:20
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_revoked_tokens'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('refresh_jti', models.CharField(max_length=64, unique=True)),
+                ('access_jti', models.CharField(max_length=64)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sessions', to='users.userapp')),
+            ],
+        ),
+    ]
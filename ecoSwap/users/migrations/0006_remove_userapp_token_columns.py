@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:32
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_auth_sessions'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='userapp',
+            name='refresh_token',
+        ),
+        migrations.RemoveField(
+            model_name='userapp',
+            name='refresh_token_expires',
+        ),
+        migrations.RemoveField(
+            model_name='userapp',
+            name='token',
+        ),
+        migrations.RemoveField(
+            model_name='userapp',
+            name='token_expires',
+        ),
+    ]
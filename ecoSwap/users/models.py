@@ -1,6 +1,7 @@
 from django.contrib.auth.models import AbstractUser
 from passlib.hash import pbkdf2_sha256
-from django.db import models
+from django.db import models, router
+import uuid
 
 # Create your models here.
 class UserApp(models.Model):
@@ -12,15 +13,15 @@ class UserApp(models.Model):
     address = models.CharField(max_length=100)
     created_at = models.DateTimeField(auto_now_add=True)
 
-    token = models.TextField(blank=True, null=True)
-    refresh_token = models.TextField(blank=True, null=True)
-    token_expires = models.DateTimeField(blank=True, null=True)
-    refresh_token_expires = models.DateTimeField(blank=True, null=True)
+    # Las sesiones (tokens emitidos, expiraciones) viven en AuthSession
 
     reset_code = models.CharField(max_length=6, blank=True, null=True)
     reset_code_expires = models.DateTimeField(blank=True, null=True)
     reset_code_used = models.BooleanField(default=False)
 
+    # Va en los claims del JWT; incrementarla (logout) revoca todos los tokens emitidos
+    token_version = models.PositiveIntegerField(default=0)
+
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
 
@@ -56,7 +57,64 @@ class UserApp(models.Model):
         except Exception as e: 
             raise
 
+class LazyUserApp(UserApp):
+    """
+    request.user del modo sin estado (JWT_STATELESS_AUTH): id, email y
+    token_version salen de los claims del token. El resto de columnas se carga,
+    todas en una sola consulta, la primera vez que una vista las usa.
+    """
+
+    CLAIM_FIELDS = ('id', 'email', 'token_version')
+
+    class Meta:
+        proxy = True
+
+    @classmethod
+    def from_claims(cls, payload):
+        return cls.from_db(
+            router.db_for_read(UserApp),
+            cls.CLAIM_FIELDS,
+            (payload['user_id'], payload['email'], payload['token_version']),
+        )
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        # Django carga un campo diferido a la vez; aquí el primero trae todos los demás
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred and set(fields) <= deferred:
+            fields = deferred
+        super().refresh_from_db(using, fields, from_queryset)
+
+class AuthSession(models.Model):
+    """
+    Sesión abierta por un login (una por dispositivo). El id viaja en el claim
+    'sid' de los tokens; cada refresh rota refresh_jti y presentar un refresh
+    token anterior se toma como robo: la sesión se cierra.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(UserApp, on_delete=models.CASCADE, related_name='sessions')
+    refresh_jti = models.CharField(max_length=64, unique=True)
+    # Access token vigente de la sesión: se revoca si se detecta reutilización
+    access_jti = models.CharField(max_length=64)
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now=True)
+
+class RevokedToken(models.Model):
+    """
+    jti de un JWT revocado antes de expirar. La fila sobra cuando el token expira:
+    purge_revoked_tokens borra esas filas periódicamente.
+    """
+    jti = models.CharField(max_length=64, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    # Los procesos traen las revocaciones nuevas filtrando por esta columna
+    revoked_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
 class ImagesUsers(models.Model):
     user: models.ForeignKey = models.ForeignKey(UserApp, on_delete=models.CASCADE)
-    image: models.TextField = models.TextField()
+    image: models.TextField = models.TextField(blank=True, null=True)  # Base64 heredado
+    digest: models.CharField = models.CharField(max_length=64, blank=True, null=True, db_index=True)
+    content_type: models.CharField = models.CharField(max_length=100, blank=True, null=True)
+    size: models.PositiveIntegerField = models.PositiveIntegerField(blank=True, null=True)
+    width: models.PositiveIntegerField = models.PositiveIntegerField(blank=True, null=True)
+    height: models.PositiveIntegerField = models.PositiveIntegerField(blank=True, null=True)
     uploaded_at: models.DateTimeField = models.DateTimeField(auto_now_add=True)
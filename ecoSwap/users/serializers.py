@@ -1,12 +1,33 @@
+from django.urls import reverse
 from rest_framework import serializers
+from ecoSwap.fieldsets import DynamicFieldsMixin
 from .models import UserApp, ImagesUsers
+from publications.services.image_service import ImageService
 
-class UserAppSerializer(serializers.ModelSerializer):
+class UserAppSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = UserApp
         fields = ['name', 'email', 'phone', 'address', 'created_at']
 
 class ImagesUsersSerializer(serializers.ModelSerializer):
+    image = serializers.SerializerMethodField()
+    url = serializers.SerializerMethodField()
+    thumbnail = serializers.SerializerMethodField()
+
     class Meta:
         model = ImagesUsers
-        fields = ['image', 'uploaded_at']
\ No newline at end of file
+        fields = ['image', 'url', 'thumbnail', 'content_type', 'size', 'width', 'height', 'uploaded_at']
+
+    def get_url(self, obj):
+        return reverse('get_avatar', args=[obj.id])
+
+    def get_thumbnail(self, obj):
+        # Los avatares se muestran pequeños: 160 px por defecto
+        size = self.context.get('image_size', 160)
+        return f"{self.get_url(obj)}?size={size}&format=webp"
+
+    def get_image(self, obj):
+        # Filas heredadas guardan el base64 directamente en la columna
+        if not obj.digest:
+            return obj.image
+        return ImageService.read_data_uri(obj.digest, obj.content_type)
\ No newline at end of file
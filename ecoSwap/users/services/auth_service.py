@@ -3,10 +3,14 @@ from datetime import datetime, timedelta
 from comunications.services.email_service import EmailService 
 from passlib.hash import pbkdf2_sha256
 from .jwt_service import JWTService 
+from .session_service import SessionService
+from .token_denylist import TokenDenylist
+from .user_cache import AuthUserCache
 from ..models import UserApp, ImagesUsers
+from publications.services.image_service import ImageService
 from django.utils import timezone
 
-import re, random, base64
+import re, random
 
 class AuthService: 
     """Servicio de autenticación con JWT"""
@@ -56,9 +60,9 @@ class AuthService:
         try:  
             # Crear usuario  
             username=f"{name.split(' ')[0]}{random.randint(1000,9999)}"
-            user = UserApp.objects.create(name=name, email=email.lower(), phone=phone, address=address, username=username)  
+            user = UserApp(name=name, email=email.lower(), phone=phone, address=address, username=username)  
             user.set_password(password)  
-            user.save()  
+            user.save(force_insert=True)  
               
             return user, "Usuario creado exitosamente"  
         
@@ -70,24 +74,25 @@ class AuthService:
         """Actualiza el perfil del usuario"""
         try:
             # Actualizar campos básicos del usuario
-            campos_actualizados = False
+            campos_actualizados = []
             
             if name:
                 user.name = name
-                campos_actualizados = True
+                campos_actualizados.append('name')
             if username:
                 user.username = username
-                campos_actualizados = True
+                campos_actualizados.append('username')
             if phone:
                 user.phone = phone
-                campos_actualizados = True
+                campos_actualizados.append('phone')
             if address:
                 user.address = address
-                campos_actualizados = True
+                campos_actualizados.append('address')
             
-            # Guardar cambios básicos del usuario primero
+            # Guardar cambios básicos del usuario primero (solo las columnas cambiadas)
             if campos_actualizados:
-                user.save()
+                user.save(update_fields=campos_actualizados)
+                AuthUserCache.invalidate(user)
             
             # Procesar imagen por separado
             if image:
@@ -101,52 +106,17 @@ class AuthService:
                     imagen_delete.delete()
                     print(f"DEBUG: Imagen anterior eliminada")
 
-                MAX_IMAGE_SIZE = 10 * 1024 * 1024
-                
                 try:
-                    # Si es un archivo (desde FormData), convertir a base64
-                    if hasattr(image, 'read'):
-                        img_data = image.read()
-                        
-                        # Validar tamaño
-                        if len(img_data) > MAX_IMAGE_SIZE:
-                            return False, f"La imagen es demasiado grande. Tamaño máximo: 10MB"
-                        
-                        img_base64 = base64.b64encode(img_data).decode('utf-8')
-                        content_type = image.content_type if hasattr(image, 'content_type') else 'image/jpeg'
-                        img_base64_string = f"data:{content_type};base64,{img_base64}"
-                        
-                        imagen = ImagesUsers.objects.create(
-                            user=user,
-                            image=img_base64_string
-                        )
-                        imagen.save()
+                    # Guardar los bytes en el almacén de blobs, la fila solo guarda metadatos
+                    metadata, error = ImageService.ingest(image)
+                    if error:
+                        return False, error
 
-                    # Si ya es una cadena base64
-                    elif isinstance(image, str):
-                        # Validar tamaño aproximado de la cadena
-                        if len(image) > MAX_IMAGE_SIZE * 1.5:  # Base64 aumenta ~33% el tamaño
-                            return False, f"La imagen es demasiado grande. Tamaño máximo: 10MB"
-                        
-                        # Si no tiene el prefijo data:image, agregarlo
-                        if not image.startswith('data:'):
-                            # Intentar detectar el tipo de imagen por los primeros caracteres
-                            if image.startswith('iVBOR'):
-                                image = f"data:image/png;base64,{image}"
-                            elif image.startswith('/9j/'):
-                                image = f"data:image/jpeg;base64,{image}"
-                            elif image.startswith('R0lGOD'):
-                                image = f"data:image/gif;base64,{image}"
-                            else:
-                                # Por defecto, asumir PNG
-                                image = f"data:image/png;base64,{image}"
-                        
-                        imagen = ImagesUsers.objects.create(
-                            user=user,
-                            image=image
-                        )
-                        imagen.save()
-                        print(f"DEBUG: Imagen guardada exitosamente. ID: {imagen.id}")
+                    imagen = ImagesUsers.objects.create(
+                        user=user,
+                        **metadata
+                    )
+                    print(f"DEBUG: Imagen guardada exitosamente. ID: {imagen.id}")
 
                 except Exception as img_error:
                     # Log del error pero continuar
@@ -161,6 +131,15 @@ class AuthService:
         except Exception as e:
             return False, f"Error al actualizar perfil: {str(e)}"
         
+    @classmethod
+    def get_avatar(cls, image_id):
+        """Obtiene la fila de una imagen de perfil"""
+        try:
+            imagen = ImagesUsers.objects.get(id=image_id)
+            return True, imagen
+        except ImagesUsers.DoesNotExist:
+            return False, "La imagen no existe"
+
     @classmethod
     def login(cls, email: str, password: str) -> Tuple[Optional[Dict], str]:  
         """  
@@ -177,15 +156,9 @@ class AuthService:
             if not user.check_password(password):   
                 return None, f"Contraseña incorrecta."  
        
-            # Generar JWT token  
-            tokens = JWTService.generate_tokens(user)  
-
-            # Actualizar último login y resetear intentos 
-            user.token = tokens['access']  
-            user.refresh_token = tokens['refresh']
-            user.token_expires = tokens['access_expires']  
-            user.refresh_token_expires = tokens['refresh_expires']
-            user.save()
+            # Generar JWT token dentro de una sesión nueva (la usa /users/refresh);
+            # la sesión va en AuthSession, la fila de UserApp no se reescribe
+            tokens = SessionService.start(user)
 
             return {  
                 "access": tokens['access'],  
@@ -228,7 +201,7 @@ class AuthService:
         user.reset_code = reset_code
         user.reset_code_expires = timezone.now() + timedelta(minutes=15)
         user.reset_code_used = False
-        user.save()
+        user.save(update_fields=['reset_code', 'reset_code_expires', 'reset_code_used'])
 
         email_sent = EmailService.send_email(
             to_email=email,
@@ -272,79 +245,52 @@ class AuthService:
         # Actualizar contraseña
         user.set_password(new_password)
         user.reset_code_used = True
-        user.save()
+        user.save(update_fields=['password', 'reset_code_used'])
+        AuthUserCache.invalidate(user)
         
         return True, "Contraseña restablecida exitosamente"
     
     @classmethod
-    def logout(cls, user: UserApp) -> bool:
-        """Cierra la sesión del usuario invalidando sus tokens"""
+    def logout(cls, user: UserApp, token: Optional[str] = None) -> bool:
+        """
+        Cierra la sesión del dispositivo que hizo la petición; las demás siguen abiertas
+        Args:
+        token: access token con el que se hizo la petición; su jti queda revocado
+        y se cierra la AuthSession de su claim 'sid'
+        """
         try:
-            user.token = None
-            user.refresh_token = None
-            user.token_expires = None
-            user.refresh_token_expires = None
-            user.save()
+            if token:
+                claims = JWTService.extract_claims(token)
+                TokenDenylist.revoke(claims.get('jti'), JWTService.extract_expiration(token))
+                if claims.get('sid'):
+                    SessionService.end(claims['sid'])
             return True, "Sesión cerrada correctamente"
         except Exception as e:
             return False, f"Error al cerrar sesión: {str(e)}"
+
+    @classmethod
+    def logout_all(cls, user: UserApp, token: Optional[str] = None) -> bool:
+        """Cierra la sesión en todos los dispositivos: revoca todos los tokens emitidos"""
+        try:
+            if token:
+                TokenDenylist.revoke(JWTService.extract_jti(token), JWTService.extract_expiration(token))
+            SessionService.end_all(user)
+            return True, "Sesión cerrada en todos los dispositivos"
+        except Exception as e:
+            return False, f"Error al cerrar sesión: {str(e)}"
     
-    # @classmethod
-    # def refresh_token(cls, refresh_token: str) -> Tuple[Optional[Dict], str]:  
-    #     """  
-    #      Refresca el access token usando refresh token  
-    #      Args:  
-    #     refresh_token: El refresh token del usuario  
-    #      Returns:  
-    #     Tuple (tokens_dict, error_message)  
-    #     - tokens_dict: Dict con los nuevos tokens (None si falla)  
-    #     - error_message: Mensaje de error (None si es exitoso)  
-    #      """  
-        
-    #     try:  
-    #         # Verificar refresh token  
-    #         payload, error = JWTService.verify_refresh_token(refresh_token)  
-    #         if error:  
-                  
-    #             return None, error  
-            
-    #         # Obtener usuario  
-    #         email = payload.get('email')  
-    #         user = User.objects(email=email).first()  
-            
-    #         if not user:  
-    #             return None, "Usuario no encontrado"  
-    #         if not user.is_active:  
-    #             return None, "Usuario inactivo"  
-            
-    #         # Verificar que el refresh token guardado coincida  
-    #         if user.app_refresh_token != refresh_token:  
-    #             return None, "Refresh token no coincide con el registrado"  
-            
-    #         # Verificar que no esté en blacklist  
-    #         refresh_jti = JWTService.extract_jti(refresh_token)  
-    #         if user.is_token_blacklisted(refresh_jti):  
-    #             return None, "Refresh token revocado"  
-        
-    #         # Generar nuevos tokens  
-    #         tokens = JWTService.generate_tokens(user)  
-    #         new_refresh_jti = JWTService.extract_jti(tokens['refresh'])  
-    #         old_refresh_jti = JWTService.extract_jti(refresh_token)  
-    #         # Actualizar tokens en BD  
-    #         user.update(  
-    #             setapp_token=tokens['access'],  
-    #             setapp_refresh_token=tokens['refresh'],  
-    #             setapp_token_expires=tokens['access_expires'],  
-    #             setapp_refresh_token_expires=tokens['refresh_expires']  
-    #         )  
-    #         user.update(  
-    #             pullrefresh_tokens=old_refresh_jti  
-    #         )  
-    #         user.update(  
-    #             push_refresh_tokens=new_refresh_jti  
-    #         )  
-    #         return tokens, None 
-         
-    #     except Exception as e:  
-              
-    #         return None, "Error al refrescar token"
\ No newline at end of file
+    @classmethod
+    def refresh_token(cls, refresh_token: str) -> Tuple[Optional[Dict], Optional[str]]:
+        """
+        Refresca el access token usando refresh token, sin volver a verificar la contraseña
+        Args:
+        refresh_token: El refresh token del usuario
+        Returns:
+        Tuple (tokens_dict, error_message)
+        - tokens_dict: Dict con los nuevos tokens (None si falla)
+        - error_message: Mensaje de error (None si es exitoso)
+        """
+        try:
+            return SessionService.rotate(refresh_token)
+        except Exception as e:
+            return None, f"Error al refrescar token: {str(e)}"
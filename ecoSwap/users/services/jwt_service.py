@@ -5,10 +5,14 @@ import jwt, uuid
 
 class JWTService:
     """Servicio para manejo de JWT tokens"""
+
+    ACCESS_TOKEN_LIFETIME = timedelta(hours=24)
+    REFRESH_TOKEN_LIFETIME = timedelta(days=2)
     
     @staticmethod
-    def generate_tokens(user) -> Dict[str, str]:
+    def generate_tokens(user, session_id=None) -> Dict[str, str]:
         """Genera access token y refresh token para un usuario
+            session_id: AuthSession a la que pertenecen (claim 'sid')
             Returns: 
             { 
                 "access": "eyJ0eXAiOiJKV1...",
@@ -24,9 +28,11 @@ class JWTService:
         refresh_jti = str(uuid.uuid4())  
 
         # Access Token (1 hora)   
-        access_expires = now + timedelta(hours=24)   
+        access_expires = now + JWTService.ACCESS_TOKEN_LIFETIME   
         access_payload = {  
             'email': user.email,  
+            'user_id': user.id,
+            'token_version': user.token_version,
             'token_type': 'access',  
             'exp': access_expires,  
             'iat': now,  
@@ -34,15 +40,21 @@ class JWTService:
         }  
 
         # Refresh Token (7 días)   
-        refresh_expires = now + timedelta(days=2)
+        refresh_expires = now + JWTService.REFRESH_TOKEN_LIFETIME
         refresh_payload = {
             'email': user.email,  
+            'user_id': user.id,
+            'token_version': user.token_version,
             'token_type': 'refresh',
             'exp': refresh_expires, 
             'iat': now, 
             'jti': refresh_jti 
         } 
 
+        if session_id is not None:
+            access_payload['sid'] = str(session_id)
+            refresh_payload['sid'] = str(session_id)
+
         #Generar tokens 
         access_token = jwt.encode( 
             access_payload, 
@@ -56,10 +68,6 @@ class JWTService:
             algorithm=settings.JWT_ALGORITHM 
         ) 
 
-        # Guardar refresh token ID en el usuario 
-        # user.add_refresh_token(refresh_jti) 
-        user.save() 
-
         return { 
             'access': access_token, 
             'refresh': refresh_token, 
@@ -76,6 +84,20 @@ class JWTService:
         except Exception as e: 
             return ''  
     
+    @staticmethod
+    def extract_claims(token: str) -> Dict:
+        """Claims del token sin verificar ({} si no se puede decodificar)"""
+        try:
+            return jwt.decode(token, options={"verify_signature": False})
+        except Exception:
+            return {}
+
+    @staticmethod
+    def extract_expiration(token: str) -> Optional[datetime]:
+        """Fecha de expiración (exp) del token sin verificar, o None"""
+        exp = JWTService.extract_claims(token).get('exp')
+        return datetime.fromtimestamp(exp, tz=timezone.utc) if exp else None
+
     @staticmethod  
     def verify_access_token(token: str) -> Tuple[Optional[Dict], Optional[str]]: 
         """ 
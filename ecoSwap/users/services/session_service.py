@@ -0,0 +1,101 @@
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from django.db.models import F
+from django.utils import timezone
+
+from .jwt_service import JWTService
+from .user_cache import AuthUserCache, TokenVersionCache
+from ..models import AuthSession, UserApp
+
+
+class SessionService:
+    """
+    Sesiones de refresh token (AuthSession). Cada refresh entrega un par de tokens
+    nuevo y deja inválido el refresh token anterior; si alguien presenta uno ya
+    rotado, ese token se filtró: se cierran todas las sesiones del usuario y se
+    revocan todos sus tokens.
+    """
+
+    @classmethod
+    def start(cls, user) -> Dict[str, str]:
+        """Abre una sesión para el usuario y emite sus tokens"""
+        session = AuthSession(user=user)
+        tokens = JWTService.generate_tokens(user, session_id=session.pk)
+        session.refresh_jti = JWTService.extract_jti(tokens['refresh'])
+        session.access_jti = JWTService.extract_jti(tokens['access'])
+        session.expires_at = datetime.fromisoformat(tokens['refresh_expires'])
+        session.save(force_insert=True)
+        return tokens
+
+    @classmethod
+    def rotate(cls, refresh_token: str) -> Tuple[Optional[Dict], Optional[str]]:
+        """
+        Cambia un refresh token vigente por un par nuevo
+        Returns:
+        (tokens, error_message)
+        """
+        payload, error = JWTService.verify_refresh_token(refresh_token)
+        if error:
+            return None, error
+        if not payload.get('sid'):
+            return None, "Refresh token sin sesión, inicie sesión de nuevo"
+
+        session = AuthSession.objects.select_related('user').filter(pk=payload['sid']).first()
+        if session is None or session.expires_at <= timezone.now():
+            return None, "La sesión expiró o fue cerrada"
+
+        user = session.user
+        if payload.get('token_version') != user.token_version:
+            return None, "Token revocado"
+        if session.refresh_jti != payload.get('jti'):
+            cls.end_all(user)
+            return None, "Refresh token reutilizado, la sesión fue cerrada"
+
+        tokens = JWTService.generate_tokens(user, session_id=session.pk)
+        # Condicionado al jti presentado: de dos refresh simultáneos con el mismo token gana uno
+        rotated = AuthSession.objects.filter(pk=session.pk, refresh_jti=payload['jti']).update(
+            refresh_jti=JWTService.extract_jti(tokens['refresh']),
+            access_jti=JWTService.extract_jti(tokens['access']),
+            expires_at=datetime.fromisoformat(tokens['refresh_expires']),
+            last_used_at=timezone.now(),
+        )
+        if not rotated:
+            cls.end_all(user)
+            return None, "Refresh token reutilizado, la sesión fue cerrada"
+
+        return tokens, None
+
+    @classmethod
+    def end(cls, session_id):
+        """Cierra una sesión (logout de un dispositivo)"""
+        AuthSession.objects.filter(pk=session_id).delete()
+
+    @classmethod
+    def end_all(cls, user):
+        """
+        Cierra todas las sesiones del usuario y sube token_version, lo que revoca
+        todos los JWT emitidos, también en el modo sin estado. Para el logout en
+        todos los dispositivos y cuando se reutiliza un refresh token.
+        """
+        UserApp.objects.filter(pk=user.pk).update(token_version=F('token_version') + 1)
+        user.token_version += 1
+        AuthSession.objects.filter(user=user).delete()
+        AuthUserCache.invalidate(user)
+        TokenVersionCache.forget(user.pk)
+
+    @classmethod
+    def purge_expired(cls, batch_size=1000) -> int:
+        """
+        Borra las sesiones expiradas por lotes (usa el índice de expires_at), así
+        ninguna transacción bloquea la tabla mucho tiempo. Returns: filas borradas
+        """
+        total = 0
+        while True:
+            ids = list(
+                AuthSession.objects.filter(expires_at__lte=timezone.now()).values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                return total
+            deleted, _ = AuthSession.objects.filter(pk__in=ids).delete()
+            total += deleted
@@ -0,0 +1,129 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from ..models import RevokedToken
+
+
+class BloomFilter:
+    """
+    Conjunto probabilístico de cadenas: `in` nunca da falsos negativos y da falsos
+    positivos con probabilidad ~error_rate mientras no se pase de `capacity`.
+    """
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        # Doble hashing (Kirsch-Mitzenmacher): k posiciones a partir de un solo digest
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class TokenDenylist:
+    """
+    jti revocados (RevokedToken) con un filtro de Bloom por proceso delante: el caso
+    común, un token no revocado, se resuelve en memoria y solo los aciertos del
+    filtro (revocados o falsos positivos) consultan la tabla.
+
+    Cada proceso trae las revocaciones nuevas como máximo cada
+    TOKEN_DENYLIST_CHECK_SECONDS, así que un logout tarda a lo sumo eso en verse en
+    los demás (en el propio proceso es inmediato). Cada TOKEN_DENYLIST_REBUILD_SECONDS
+    el filtro se reconstruye desde cero y olvida los tokens ya expirados.
+    """
+
+    # Margen para revocaciones cuya transacción confirmó después de la última lectura
+    SYNC_OVERLAP = timedelta(seconds=30)
+
+    _lock = threading.Lock()
+    _filter = None
+    _built_at = 0.0
+    _checked_at = 0.0
+    _synced_since = None
+
+    @classmethod
+    def _rebuild(cls, now):
+        started = timezone.now()
+        jtis = list(RevokedToken.objects.filter(expires_at__gt=started).values_list('jti', flat=True))
+        bloom = BloomFilter(max(len(jtis) * 2, settings.TOKEN_DENYLIST_CAPACITY), settings.TOKEN_DENYLIST_ERROR_RATE)
+        for jti in jtis:
+            bloom.add(jti)
+        with cls._lock:
+            cls._filter = bloom
+            cls._built_at = now
+            cls._synced_since = started - cls.SYNC_OVERLAP
+
+    @classmethod
+    def _pull(cls):
+        started = timezone.now()
+        jtis = list(RevokedToken.objects.filter(revoked_at__gte=cls._synced_since).values_list('jti', flat=True))
+        with cls._lock:
+            for jti in jtis:
+                cls._filter.add(jti)
+            cls._synced_since = started - cls.SYNC_OVERLAP
+
+    @classmethod
+    def sync(cls, force=False):
+        """Trae las revocaciones nuevas si pasó el intervalo (o siempre, con force)"""
+        now = time.monotonic()
+        if not force and cls._filter is not None and now - cls._checked_at < settings.TOKEN_DENYLIST_CHECK_SECONDS:
+            return
+
+        if cls._filter is None or now - cls._built_at >= settings.TOKEN_DENYLIST_REBUILD_SECONDS:
+            cls._rebuild(now)
+        else:
+            cls._pull()
+        cls._checked_at = now
+
+    @classmethod
+    def is_revoked(cls, jti):
+        if not jti:
+            return False
+
+        cls.sync()
+        if jti not in cls._filter:
+            return False
+        return RevokedToken.objects.filter(jti=jti, expires_at__gt=timezone.now()).exists()
+
+    @classmethod
+    def revoke(cls, jti, expires_at):
+        """Revoca un token hasta expires_at, cuando deja de ser válido por sí solo"""
+        if not jti or expires_at is None or expires_at <= timezone.now():
+            return
+
+        RevokedToken.objects.bulk_create([RevokedToken(jti=jti, expires_at=expires_at)], ignore_conflicts=True)
+        with cls._lock:
+            if cls._filter is not None:
+                cls._filter.add(jti)
+
+    @classmethod
+    def purge(cls):
+        """Borra las filas de tokens ya expirados. Returns: filas borradas"""
+        deleted, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+        return deleted
+
+    @classmethod
+    def clear(cls):
+        """Olvida el filtro local (tests)"""
+        with cls._lock:
+            cls._filter = None
+            cls._built_at = 0.0
+            cls._checked_at = 0.0
+            cls._synced_since = None
@@ -0,0 +1,138 @@
+import copy
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from publications.models import CacheVersion
+from ..models import UserApp
+
+
+class AuthUserCache:
+    """
+    Caché en memoria del proceso de los usuarios ya resueltos por
+    CustomJWTAuthentication, por jti del access token: un acierto evita la
+    consulta a users_userapp. Acotada en tamaño (LRU, AUTH_USER_CACHE_SIZE) y en
+    edad (AUTH_USER_CACHE_TTL segundos).
+
+    Coherencia entre procesos: igual que ReferenceCache, invalidar escribe un sello
+    nuevo en CacheVersion y cada proceso lo revisa como máximo cada
+    AUTH_USER_CACHE_CHECK_SECONDS; si cambió, descarta toda su caché.
+    """
+
+    VERSION_NAME = 'auth-users'
+
+    _lock = threading.Lock()
+    _entries = OrderedDict()  # {jti: (usuario, expira_en)}
+    _stamp = None
+    _checked_at = 0.0
+
+    @classmethod
+    def _current_stamp(cls):
+        return CacheVersion.objects.filter(name=cls.VERSION_NAME).values_list('stamp', flat=True).first()
+
+    @classmethod
+    def _ensure_fresh(cls, now, force=False):
+        if not force and now - cls._checked_at < settings.AUTH_USER_CACHE_CHECK_SECONDS:
+            return
+
+        stamp = cls._current_stamp()
+        with cls._lock:
+            if stamp != cls._stamp:
+                cls._entries.clear()
+                cls._stamp = stamp
+            cls._checked_at = now
+
+    @classmethod
+    def sync(cls):
+        """Revisa el sello ya, sin esperar al intervalo"""
+        cls._ensure_fresh(time.monotonic(), force=True)
+
+    @classmethod
+    def get(cls, key):
+        """Copia del usuario cacheado para ese token, o None"""
+        if not settings.AUTH_USER_CACHE_SIZE:
+            return None
+
+        now = time.monotonic()
+        cls._ensure_fresh(now)
+        with cls._lock:
+            entry = cls._entries.get(key)
+            if entry is None:
+                return None
+            user, expires_at = entry
+            if expires_at <= now:
+                del cls._entries[key]
+                return None
+            cls._entries.move_to_end(key)
+        # Cada petición recibe su propia instancia: las vistas modifican request.user
+        return copy.copy(user)
+
+    @classmethod
+    def put(cls, key, user):
+        if not settings.AUTH_USER_CACHE_SIZE:
+            return
+
+        expires_at = time.monotonic() + settings.AUTH_USER_CACHE_TTL
+        with cls._lock:
+            cls._entries[key] = (copy.copy(user), expires_at)
+            cls._entries.move_to_end(key)
+            while len(cls._entries) > settings.AUTH_USER_CACHE_SIZE:
+                cls._entries.popitem(last=False)
+
+    @classmethod
+    def invalidate(cls, user=None, **kwargs):
+        """
+        Olvida los tokens del usuario en este proceso y publica un sello nuevo para
+        los demás. Se usa tras logout, cambios de perfil o de contraseña, y como
+        receptor de post_delete.
+        """
+        # Un UPDATE en el caso normal; la fila se crea la primera vez
+        stamp = uuid.uuid4().hex
+        if not CacheVersion.objects.filter(name=cls.VERSION_NAME).update(stamp=stamp):
+            CacheVersion.objects.get_or_create(name=cls.VERSION_NAME, defaults={'stamp': stamp})
+        user = user if user is not None else kwargs.get('instance')
+        with cls._lock:
+            if user is None:
+                cls._entries.clear()
+            else:
+                for key in [key for key, (cached, _) in cls._entries.items() if cached.pk == user.pk]:
+                    del cls._entries[key]
+
+    @classmethod
+    def clear(cls):
+        """Vacía la caché local (tests)"""
+        with cls._lock:
+            cls._entries.clear()
+            cls._stamp = None
+            cls._checked_at = 0.0
+
+
+class TokenVersionCache:
+    """
+    token_version vigente de cada usuario en CACHES[AUTH_CACHE_ALIAS], para validar
+    tokens en el modo sin estado sin consultar users_userapp en cada petición.
+    """
+
+    @classmethod
+    def _key(cls, user_id):
+        return f'auth:token-version:{user_id}'
+
+    @classmethod
+    def get(cls, user_id):
+        """Versión vigente, o None si el usuario no existe"""
+        cache = caches[settings.AUTH_CACHE_ALIAS]
+        version = cache.get(cls._key(user_id))
+        if version is None:
+            version = UserApp.objects.filter(pk=user_id).values_list('token_version', flat=True).first()
+            if version is not None:
+                cache.set(cls._key(user_id), version, settings.AUTH_TOKEN_VERSION_TTL)
+        return version
+
+    @classmethod
+    def forget(cls, user_id):
+        """La próxima validación lee la versión de la base de datos"""
+        caches[settings.AUTH_CACHE_ALIAS].delete(cls._key(user_id))
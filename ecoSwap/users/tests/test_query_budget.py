@@ -0,0 +1,83 @@
+from unittest.mock import patch
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ecoSwap.query_budget import Budget, QueryBudgetMixin, seed_marketplace
+from users.models import ImagesUsers, UserApp
+
+
+class UsersQueryBudgetTest(QueryBudgetMixin, APITestCase):
+    """Consultas SQL y bytes máximos por URL de users/urls.py con volumen realista"""
+
+    urlconf = 'users.urls'
+    BUDGETS = {
+        'register': Budget(3, 1024),
+        'login': Budget(3, 1024),
+        'refresh_token': Budget(4, 1024),
+        'logout': Budget(4, 512),
+        'logout_all': Budget(6, 512),
+        'profile': Budget(3, 1024),
+        'update_profile': Budget(8, 512),
+        'send_code_password_reset': Budget(3, 512),
+        'reset_password_code': Budget(4, 512),
+        'get_user_by_email': Budget(6, 32 * 1024),
+        'get_user_by_id': Budget(4, 1024),
+        'get_avatar': Budget(2, 1024),
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seed = seed_marketplace()
+        cls.user = cls.seed.users[0]
+
+    def test_register(self):
+        self.assertWithinBudget('register', 'post', data={
+            "name": "Nueva",
+            "email": "nueva@example.com",
+            "password": "Password123!",
+            "phone": "3999999999",
+            "address": "Calle 1",
+        }, expected_status=status.HTTP_201_CREATED)
+
+    def test_login_and_logout(self):
+        self.assertWithinBudget('login', 'post', data={"email": self.user.email, "password": "Password123!"})
+        self.assertWithinBudget('logout', 'post', user=self.user)
+        self.assertWithinBudget('logout_all', 'post', user=self.user)
+
+    def test_refresh_token(self):
+        response, _ = self.assertWithinBudget(
+            'login', 'post', data={"email": self.user.email, "password": "Password123!"}
+        )
+        self.assertWithinBudget('refresh_token', 'post', data={"refresh": response.data["refresh"]})
+
+    def test_profile(self):
+        self.assertWithinBudget('profile', user=self.user)
+
+    def test_update_profile(self):
+        self.assertWithinBudget(
+            'update_profile', 'patch', data={"address": "Carrera 7", "image": self.seed.data_uri}, user=self.user
+        )
+
+    @patch('comunications.services.email_service.EmailService.send_email', return_value=True)
+    def test_password_reset(self, mock_send_email):
+        self.assertWithinBudget('send_code_password_reset', 'post', data={"email": self.user.email})
+        code = UserApp.objects.get(id=self.user.id).reset_code
+        self.assertWithinBudget('reset_password_code', 'post', data={
+            "email": self.user.email,
+            "code": code,
+            "new_password": "Password456!",
+            "confirm_password": "Password456!",
+        })
+
+    def test_get_user_by_email(self):
+        for params in ({"email": self.user.email}, {"email": self.user.id, "view": "full"}):
+            with self.subTest(params=params):
+                self.assertWithinBudget('get_user_by_email', data=params, user=self.user)
+
+    def test_get_user_by_id(self):
+        self.assertWithinBudget('get_user_by_id', data={"id": self.seed.users[1].id}, user=self.user)
+
+    def test_get_avatar(self):
+        avatar = ImagesUsers.objects.filter(user=self.user).first()
+        self.assertWithinBudget('get_avatar', args=[avatar.id], user=self.user)
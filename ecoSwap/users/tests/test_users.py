@@ -2,15 +2,24 @@ import jwt
 import re
 import random
 from datetime import timedelta
+from io import StringIO
 from django.test import TestCase
 from django.utils import timezone
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.conf import settings
-from users.models import UserApp
+from django.core.management import call_command
+from django.core.cache import caches
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from publications.models import CacheVersion
+from users.models import AuthSession, RevokedToken, UserApp
 from users.services.auth_service import AuthService
 from users.services.jwt_service import JWTService
+from users.services.token_denylist import BloomFilter, TokenDenylist
+from users.services.user_cache import AuthUserCache
 from unittest.mock import patch, MagicMock
 
 
@@ -152,10 +161,9 @@ class AuthServiceTest(TestCase):
         self.assertIn("email", result)
         self.assertEqual(msg, "Login exitoso")
         
-        # Verificar que los tokens se guardaron en la BD
-        self.user.refresh_from_db()
-        self.assertIsNotNone(self.user.token)
-        self.assertIsNotNone(self.user.refresh_token)
+        # Verificar que la sesión se guardó en la BD
+        payload, _ = JWTService.verify_refresh_token(result["refresh"])
+        self.assertTrue(AuthSession.objects.filter(pk=payload["sid"], user=self.user).exists())
 
     def test_login_wrong_password(self):
         """Login falla con contraseña incorrecta"""
@@ -290,22 +298,30 @@ class AuthServiceTest(TestCase):
         self.assertFalse(success)
         self.assertIn("no coinciden", msg.lower())
 
+    def test_update_user_profile_stores_image_in_blob_store(self):
+        """La imagen de perfil se guarda en el almacén de blobs"""
+        from publications.tests.test_publications import make_png_base64
+        from users.models import ImagesUsers
+
+        success, msg = AuthService.update_user_profile(None, None, None, None, make_png_base64(), self.user)
+
+        self.assertTrue(success)
+        image = ImagesUsers.objects.get(user=self.user)
+        self.assertIsNone(image.image)
+        self.assertEqual(len(image.digest), 64)
+        self.assertEqual(image.content_type, "image/png")
+
     def test_logout_clears_tokens(self):
-        """Logout limpia todos los tokens"""
-        self.user.token = "abc"
-        self.user.refresh_token = "xyz"
-        self.user.token_expires = timezone.now()
-        self.user.refresh_token_expires = timezone.now()
-        self.user.save()
+        """Logout en todos los dispositivos cierra todas las sesiones"""
+        AuthService.login(self.valid_email, self.valid_password)
+        AuthService.login(self.valid_email, self.valid_password)
         
-        success, msg = AuthService.logout(self.user)
+        success, msg = AuthService.logout_all(self.user)
         
         self.assertTrue(success)
+        self.assertFalse(AuthSession.objects.filter(user=self.user).exists())
         self.user.refresh_from_db()
-        self.assertIsNone(self.user.token)
-        self.assertIsNone(self.user.refresh_token)
-        self.assertIsNone(self.user.token_expires)
-        self.assertIsNone(self.user.refresh_token_expires)
+        self.assertEqual(self.user.token_version, 1)
 
 
 class JWTServiceTest(TestCase):
@@ -505,19 +521,35 @@ class UserViewsTest(TestCase):
 
     def test_logout_authenticated(self):
         """Logout exitoso"""
-        tokens = JWTService.generate_tokens(self.user)
-        self.user.token = tokens["access"]
-        self.user.save()
+        tokens, _ = AuthService.login(self.email, self.password)
         
-        self.client.force_authenticate(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
         url = reverse("logout")
         response = self.client.post(url)
         
         self.assertEqual(response.status_code, 200)
         
-        # Verificar que los tokens fueron eliminados
-        self.user.refresh_from_db()
-        self.assertIsNone(self.user.token)
+        # Verificar que la sesión se cerró y el token ya no sirve
+        self.assertFalse(AuthSession.objects.filter(user=self.user).exists())
+        self.assertEqual(self.client.get(reverse("profile")).status_code, 401)
+
+    def test_get_user_by_id_sparse_fields(self):
+        """?fields= recorta el usuario y las columnas consultadas"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.client.force_authenticate(user=self.user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("get_user_by_id"), {"id": self.user.id, "fields": "name,email"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["user"], {"name": "UserTest", "email": self.email})
+        user_select = next(q["sql"] for q in ctx.captured_queries if 'FROM "users_userapp"' in q["sql"])
+        self.assertNotIn('"phone"', user_select)
+        self.assertNotIn('"password"', user_select)
+
+        response = self.client.get(reverse("get_user_by_id"), {"id": self.user.id, "fields": "name,password"})
+        self.assertEqual(response.status_code, 400)
 
     def test_logout_unauthenticated(self):
         """Logout sin autenticación falla"""
@@ -525,6 +557,55 @@ class UserViewsTest(TestCase):
         response = self.client.post(url)
         self.assertEqual(response.status_code, 401)
 
+    def test_get_avatar_requires_authentication(self):
+        """El avatar exige autenticación, como los perfiles que lo referencian"""
+        from publications.tests.test_publications import make_png_base64
+        from users.models import ImagesUsers
+
+        AuthService.update_user_profile(None, None, None, None, make_png_base64(), self.user)
+        url = reverse("get_avatar", args=[ImagesUsers.objects.get(user=self.user).id])
+
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Cache-Control"].startswith("private"))
+
+        # ?format= elige la miniatura, no el renderer de DRF
+        response = self.client.get(url, {"size": 160, "format": "webp"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/webp")
+        self.client.force_authenticate(user=None)
+        response = self.client.get(url, {"size": 160, "format": "webp"})
+        self.assertEqual(response.status_code, 401)
+
+    def test_get_avatar_pending_derivative_is_not_cached(self):
+        """Sin la miniatura se sirve el original con revalidación, no como inmutable"""
+        from publications.tests.test_publications import make_png_base64
+        from publications.models import ImageDerivative
+        from users.models import ImagesUsers
+
+        AuthService.update_user_profile(None, None, None, None, make_png_base64(), self.user)
+        imagen = ImagesUsers.objects.get(user=self.user)
+        ImageDerivative.objects.filter(source_digest=imagen.digest).delete()
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(reverse("get_avatar", args=[imagen.id]), {"size": 160, "format": "webp"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], imagen.content_type)
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+
+    def test_get_avatar_missing_blob_returns_404(self):
+        """Una fila cuyo blob falta en disco responde 404, no 500"""
+        from users.models import ImagesUsers
+
+        imagen = ImagesUsers.objects.create(user=self.user, digest="0" * 64, content_type="image/png", size=10)
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(reverse("get_avatar", args=[imagen.id]))
+        self.assertEqual(response.status_code, 404)
+
     @patch('comunications.services.email_service.EmailService.send_email')
     def test_send_code_password_reset(self, mock_send_email):
         """Envío de código de reseteo"""
@@ -563,4 +644,337 @@ class UserViewsTest(TestCase):
         
         # Verificar que la contraseña cambió
         self.user.refresh_from_db()
-        self.assertTrue(self.user.check_password("NewPassword123!"))
\ No newline at end of file
+        self.assertTrue(self.user.check_password("NewPassword123!"))
+
+
+class AuthUserCacheTest(TestCase):
+    """CustomJWTAuthentication reutiliza el usuario resuelto para el mismo token"""
+
+    def setUp(self):
+        AuthUserCache.clear()
+        self.addCleanup(AuthUserCache.clear)
+        self.user = UserApp.objects.create(
+            name="Cache", email="cache@example.com", phone="3110000000", address="Dir"
+        )
+        self.user.set_password("Password123!")
+        self.user.save()
+        self.token = JWTService.generate_tokens(self.user)['access']
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+
+    def user_lookups(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("profile"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lookups = [q for q in ctx.captured_queries if 'FROM "users_userapp"' in q["sql"]]
+        return len(lookups), response
+
+    def test_repeated_requests_skip_the_user_query(self):
+        self.assertEqual(self.user_lookups()[0], 1)
+        self.assertEqual(self.user_lookups()[0], 0)
+
+    def test_logout_invalidates_cached_user(self):
+        self.user_lookups()
+        AuthService.logout(self.user, self.token)
+
+        # El token en caché queda revocado; uno nuevo vuelve a cargar el usuario
+        self.assertEqual(self.client.get(reverse("profile")).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {JWTService.generate_tokens(self.user)['access']}")
+        self.assertEqual(self.user_lookups()[0], 1)
+
+    def test_profile_update_is_visible_on_next_request(self):
+        self.user_lookups()
+        AuthService.update_user_profile("Nuevo Nombre", None, None, None, None, self.user)
+
+        lookups, response = self.user_lookups()
+        self.assertEqual(lookups, 1)
+        self.assertEqual(response.data["user"]["name"], "Nuevo Nombre")
+
+    def test_views_get_their_own_instance(self):
+        self.user_lookups()
+        first = AuthUserCache.get(JWTService.extract_jti(self.token))
+        first.name = "Modificado en memoria"
+
+        self.assertEqual(self.user_lookups()[1].data["user"]["name"], "Cache")
+
+    @override_settings(AUTH_USER_CACHE_CHECK_SECONDS=0)
+    def test_stamp_from_another_process_flushes_cache(self):
+        self.user_lookups()
+        CacheVersion.objects.update_or_create(name=AuthUserCache.VERSION_NAME, defaults={"stamp": "otro-proceso"})
+
+        self.assertEqual(self.user_lookups()[0], 1)
+
+    @override_settings(AUTH_USER_CACHE_TTL=0)
+    def test_expired_entries_are_reloaded(self):
+        self.user_lookups()
+        self.assertEqual(self.user_lookups()[0], 1)
+
+    @override_settings(AUTH_USER_CACHE_SIZE=2)
+    def test_least_recently_used_entry_is_evicted(self):
+        for key in ("a", "b"):
+            AuthUserCache.put(key, self.user)
+        AuthUserCache.get("a")
+        AuthUserCache.put("c", self.user)
+
+        self.assertIsNotNone(AuthUserCache.get("a"))
+        self.assertIsNone(AuthUserCache.get("b"))
+        self.assertIsNotNone(AuthUserCache.get("c"))
+
+
+@override_settings(JWT_STATELESS_AUTH=True)
+class StatelessAuthTest(TestCase):
+    """Modo sin estado: el usuario sale de los claims y solo se consulta si la vista lo usa"""
+
+    def setUp(self):
+        caches[settings.AUTH_CACHE_ALIAS].clear()
+        self.user = UserApp.objects.create(
+            name="Stateless", email="stateless@example.com", phone="3120000000", address="Dir"
+        )
+        self.user.set_password("Password123!")
+        self.user.save()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {JWTService.generate_tokens(self.user)['access']}")
+
+    def user_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        return [q["sql"] for q in ctx.captured_queries if 'FROM "users_userapp"' in q["sql"]], response
+
+    def test_access_token_carries_id_and_version(self):
+        payload, _ = JWTService.verify_access_token(JWTService.generate_tokens(self.user)["access"])
+
+        self.assertEqual(payload["user_id"], self.user.id)
+        self.assertEqual(payload["token_version"], 0)
+
+    def test_endpoints_not_touching_the_user_need_no_user_query(self):
+        self.user_queries(reverse("get_reputation"))  # Primera vez: lee token_version
+
+        queries, _ = self.user_queries(reverse("get_reputation"))
+        self.assertEqual(queries, [])
+
+    def test_lazy_user_loads_the_row_once_when_a_view_needs_it(self):
+        self.user_queries(reverse("get_reputation"))
+
+        queries, response = self.user_queries(reverse("profile"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(response.data["user"]["name"], "Stateless")
+        self.assertEqual(response.data["user"]["phone"], "3120000000")
+
+    def test_logout_revokes_the_presented_token(self):
+        self.assertEqual(self.client.post(reverse("logout")).status_code, status.HTTP_200_OK)
+
+        self.assertEqual(self.client.get(reverse("get_reputation")).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.token_version, 0)
+
+    def test_logout_all_revokes_issued_tokens(self):
+        otro = JWTService.generate_tokens(self.user)["access"]
+        self.assertEqual(self.client.post(reverse("logout_all")).status_code, status.HTTP_200_OK)
+
+        response = self.client.get(reverse("get_reputation"), HTTP_AUTHORIZATION=f"Bearer {otro}")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.token_version, 1)
+
+
+class TokenDenylistTest(TestCase):
+    """jti revocados: el filtro de Bloom descarta en memoria y solo sus aciertos van a la tabla"""
+
+    def setUp(self):
+        TokenDenylist.clear()
+        self.user = UserApp.objects.create(
+            name="Denylist", email="denylist@example.com", phone="3130000000", address="Dir"
+        )
+        self.user.set_password("Password123!")
+        self.user.save()
+        self.token = JWTService.generate_tokens(self.user)["access"]
+        self.jti = JWTService.extract_jti(self.token)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+
+    def tearDown(self):
+        TokenDenylist.clear()
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(1000, 0.01)
+        valores = [f"jti-{i}" for i in range(1000)]
+        for valor in valores:
+            bloom.add(valor)
+
+        self.assertTrue(all(valor in bloom for valor in valores))
+        falsos = sum(f"otro-{i}" in bloom for i in range(10000))
+        self.assertLess(falsos, 300)
+
+    def test_not_revoked_token_is_checked_in_memory(self):
+        TokenDenylist.sync(force=True)
+
+        with self.assertNumQueries(0):
+            self.assertFalse(TokenDenylist.is_revoked(self.jti))
+
+    def test_revoked_token_is_rejected(self):
+        TokenDenylist.revoke(self.jti, timezone.now() + timedelta(hours=1))
+
+        response = self.client.get(reverse("profile"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("revocado", str(response.data))
+
+    def test_false_positive_falls_back_to_the_table(self):
+        TokenDenylist.sync(force=True)
+
+        with patch.object(BloomFilter, "__contains__", return_value=True), self.assertNumQueries(1):
+            self.assertFalse(TokenDenylist.is_revoked(self.jti))
+
+    def test_revocations_from_other_processes_arrive_on_sync(self):
+        TokenDenylist.sync(force=True)
+        # Otro proceso escribe la fila; este la ve en la siguiente sincronización
+        RevokedToken.objects.create(jti=self.jti, expires_at=timezone.now() + timedelta(hours=1))
+        self.assertFalse(TokenDenylist.is_revoked(self.jti))
+
+        TokenDenylist.sync(force=True)
+        self.assertTrue(TokenDenylist.is_revoked(self.jti))
+
+    def test_logout_revokes_the_presented_token(self):
+        self.assertEqual(self.client.post(reverse("logout")).status_code, status.HTTP_200_OK)
+
+        revocado = RevokedToken.objects.get(jti=self.jti)
+        self.assertEqual(revocado.expires_at, JWTService.extract_expiration(self.token))
+
+    def test_purge_removes_only_expired_rows(self):
+        RevokedToken.objects.create(jti="vencido", expires_at=timezone.now() - timedelta(minutes=1))
+        RevokedToken.objects.create(jti="vigente", expires_at=timezone.now() + timedelta(hours=1))
+
+        call_command("purge_revoked_tokens", stdout=StringIO())
+
+        self.assertEqual(list(RevokedToken.objects.values_list("jti", flat=True)), ["vigente"])
+
+
+class RefreshTokenTest(TestCase):
+    """/users/refresh rota el refresh token de la sesión sin volver a verificar la contraseña"""
+
+    def setUp(self):
+        TokenDenylist.clear()
+        self.user = UserApp.objects.create(
+            name="Refresh", email="refresh@example.com", phone="3140000000", address="Dir"
+        )
+        self.user.set_password("Password123!")
+        self.user.save()
+        self.client = APIClient()
+        self.tokens, _ = AuthService.login(self.user.email, "Password123!")
+
+    def tearDown(self):
+        TokenDenylist.clear()
+
+    def refresh(self, refresh_token, **extra):
+        return self.client.post(reverse("refresh_token"), {"refresh": refresh_token}, format="json", **extra)
+
+    def test_login_opens_a_session(self):
+        payload, _ = JWTService.verify_refresh_token(self.tokens["refresh"])
+
+        session = AuthSession.objects.get(pk=payload["sid"])
+        self.assertEqual(session.user_id, self.user.id)
+        self.assertEqual(session.refresh_jti, payload["jti"])
+
+    def test_refresh_rotates_without_checking_the_password(self):
+        with patch.object(UserApp, "check_password") as check_password:
+            response = self.refresh(self.tokens["refresh"])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        check_password.assert_not_called()
+        self.assertNotEqual(response.data["refresh"], self.tokens["refresh"])
+        profile = self.client.get(reverse("profile"), HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        self.assertEqual(profile.status_code, status.HTTP_200_OK)
+
+    def test_reused_refresh_token_closes_every_session(self):
+        otro, _ = AuthService.login(self.user.email, "Password123!")
+        rotated = self.refresh(self.tokens["refresh"]).data
+
+        response = self.refresh(self.tokens["refresh"])
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("reutilizado", response.data["error"])
+        self.assertFalse(AuthSession.objects.filter(user=self.user).exists())
+        # El par que obtuvo quien rotó primero también queda inválido
+        self.assertEqual(self.refresh(rotated["refresh"]).status_code, status.HTTP_401_UNAUTHORIZED)
+        profile = self.client.get(reverse("profile"), HTTP_AUTHORIZATION=f"Bearer {rotated['access']}")
+        self.assertEqual(profile.status_code, status.HTTP_401_UNAUTHORIZED)
+        # Y también las de los demás dispositivos
+        self.assertEqual(self.refresh(otro["refresh"]).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_logout_closes_only_its_session(self):
+        otro, _ = AuthService.login(self.user.email, "Password123!")
+        self.client.post(reverse("logout"), HTTP_AUTHORIZATION=f"Bearer {otro['access']}")
+
+        self.assertEqual(self.refresh(otro["refresh"]).status_code, status.HTTP_401_UNAUTHORIZED)
+        profile = self.client.get(reverse("profile"), HTTP_AUTHORIZATION=f"Bearer {otro['access']}")
+        self.assertEqual(profile.status_code, status.HTTP_401_UNAUTHORIZED)
+        # El otro dispositivo sigue con su sesión
+        self.assertEqual(self.refresh(self.tokens["refresh"]).status_code, status.HTTP_200_OK)
+        self.assertEqual(AuthSession.objects.filter(user=self.user).count(), 1)
+
+    def test_logout_all_closes_every_session(self):
+        otro, _ = AuthService.login(self.user.email, "Password123!")
+        self.client.post(reverse("logout_all"), HTTP_AUTHORIZATION=f"Bearer {otro['access']}")
+
+        self.assertEqual(self.refresh(self.tokens["refresh"]).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(AuthSession.objects.filter(user=self.user).exists())
+
+    def test_access_token_is_not_a_refresh_token(self):
+        response = self.refresh(self.tokens["access"])
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(AuthSession.objects.filter(user=self.user).count(), 1)
+
+    def test_expired_authorization_header_is_ignored(self):
+        response = self.refresh(self.tokens["refresh"], HTTP_AUTHORIZATION="Bearer expirado")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_missing_refresh_token(self):
+        response = self.client.post(reverse("refresh_token"), {}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AuthSessionWritesTest(TestCase):
+    """Login escribe solo en AuthSession y las escrituras de UserApp tocan solo sus columnas"""
+
+    def setUp(self):
+        self.user = UserApp.objects.create(
+            name="Sesiones", email="sesiones@example.com", phone="3150000000", address="Dir"
+        )
+        self.user.set_password("Password123!")
+        self.user.save()
+
+    def user_writes(self, ctx):
+        return [q["sql"] for q in ctx.captured_queries if q["sql"].startswith('UPDATE "users_userapp"')]
+
+    def test_login_does_not_rewrite_the_user_row(self):
+        with CaptureQueriesContext(connection) as ctx:
+            AuthService.login(self.user.email, "Password123!")
+            AuthService.login(self.user.email, "Password123!")
+
+        self.assertEqual(self.user_writes(ctx), [])
+        self.assertEqual(AuthSession.objects.filter(user=self.user).count(), 2)
+
+    def test_profile_update_writes_only_changed_columns(self):
+        with CaptureQueriesContext(connection) as ctx:
+            AuthService.update_user_profile(None, None, None, "Carrera 9", None, self.user)
+
+        writes = self.user_writes(ctx)
+        self.assertEqual(len(writes), 1)
+        self.assertIn('"address"', writes[0])
+        self.assertNotIn('"password"', writes[0])
+
+    def test_purge_deletes_expired_sessions_in_batches(self):
+        for i in range(5):
+            AuthSession.objects.create(
+                user=self.user, refresh_jti=f"vencida-{i}", access_jti=f"a-{i}",
+                expires_at=timezone.now() - timedelta(minutes=1),
+            )
+        AuthService.login(self.user.email, "Password123!")
+
+        with CaptureQueriesContext(connection) as ctx:
+            call_command("purge_auth_sessions", "--batch-size", "2", stdout=StringIO())
+
+        self.assertEqual(AuthSession.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(len([q for q in ctx.captured_queries if q["sql"].startswith("DELETE")]), 3)
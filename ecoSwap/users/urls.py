@@ -4,11 +4,14 @@ from users.views import views
 urlpatterns = [
     path('register-user', views.register, name='register'),
     path('login', views.login, name='login'),
+    path('refresh', views.refresh_token, name='refresh_token'),
     path('logout', views.logout, name='logout'),
+    path('logout-all', views.logout_all, name='logout_all'),
     path('profile', views.get_user_profile, name='profile'),
     path('update-profile', views.edit_user_profile, name='update_profile'),
     path('send-code', views.send_code_password_reset, name='send_code_password_reset'),
     path('reset-password', views.reset_password_code, name='reset_password_code'),
     path('get-user-publication', views.get_user_profile_by_email, name='get_user_by_email'),
     path('get-user-by-id', views.get_user_by_id, name='get_user_by_id'),
+    path('avatar/<int:image_id>', views.get_avatar, name='get_avatar'),
 ]
\ No newline at end of file
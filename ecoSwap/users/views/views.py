@@ -1,4 +1,4 @@
-from rest_framework.decorators import api_view, permission_classes 
+from rest_framework.decorators import api_view, authentication_classes, content_negotiation_class, permission_classes 
 from rest_framework.permissions import AllowAny, IsAuthenticated 
 from rest_framework.response import Response 
 from ..services.auth_service import AuthService
@@ -6,9 +6,16 @@ from ..serializers import UserAppSerializer, ImagesUsersSerializer
 from rest_framework import status 
 from ..models import UserApp, ImagesUsers
 from publications.models import Publications, Category, State
-from publications.serializers import PublicationsSerializer
+from publications.services.publications_service import PublicationsService
+from publications.services.derivative_service import DerivativeService
+from ecoSwap.blob_response import (
+    PRIVATE_CACHE_CONTROL, PRIVATE_FALLBACK_CACHE_CONTROL, BlobContentNegotiation, blob_response,
+    legacy_blob_response,
+)
+from ecoSwap.fieldsets import FieldsetError, parse_fieldset
 
 from django.core.files.base import ContentFile
+from django.http import JsonResponse
 from PIL import Image
 from io import BytesIO
 import os
@@ -68,6 +75,29 @@ def login(request):
     else:  
         return Response({"error": message, "status" : 401}, status=status.HTTP_401_UNAUTHORIZED)
     
+@api_view(['POST'])
+@authentication_classes([])  # Se llama justo cuando el access token ya expiró
+@permission_classes([AllowAny])
+def refresh_token(request):
+    """
+    Rota el refresh token: devuelve un access token y un refresh token nuevos
+    """
+    refresh = request.data.get('refresh', '')
+
+    if not refresh:
+        return Response({"error": "El refresh token es requerido", "status": 400}, status=status.HTTP_400_BAD_REQUEST)
+
+    tokens, error = AuthService.refresh_token(refresh)
+    if tokens:
+        return Response({**tokens, "status": 200}, status=status.HTTP_200_OK)
+    return Response({"error": error, "status": 401}, status=status.HTTP_401_UNAUTHORIZED)
+
+def _user_fields(request):
+    """ ?fields=name,email recorta el usuario (Raises: FieldsetError) """
+    fields, _ = parse_fieldset(request.query_params, UserAppSerializer.Meta.fields, UserAppSerializer.Meta.fields)
+    return fields
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_user_profile(request):
@@ -77,14 +107,18 @@ def get_user_profile(request):
     user: UserApp = request.user  
     
     try:
+        fields = _user_fields(request)
         image = ImagesUsers.objects.filter(user=user)
         serializer_image = ImagesUsersSerializer(image, many=True)
-        serializer = UserAppSerializer(user)
+        serializer = UserAppSerializer(user, fields=fields)
         data = {
             'user': serializer.data,
             'image': serializer_image.data
         }
         return Response(data, status=status.HTTP_200_OK)
+
+    except FieldsetError as e:
+        return Response({"error": str(e), "status": 400}, status=status.HTTP_400_BAD_REQUEST)
     
     except Exception as e:
         return Response(
@@ -92,6 +126,38 @@ def get_user_profile(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@content_negotiation_class(BlobContentNegotiation)
+def get_avatar(request, image_id):
+    """
+    Transmite la imagen de perfil con ETag, 304 y soporte de Range.
+    Exige autenticación como los perfiles que la referencian: los ids son
+    secuenciales y una ruta pública permitiría recorrer los avatares de todos.
+    """
+    success, imagen = AuthService.get_avatar(image_id)
+    if not success:
+        return JsonResponse({"error": imagen, "status": 404}, status=status.HTTP_404_NOT_FOUND)
+
+    if not imagen.digest:
+        return legacy_blob_response(request, imagen.image, imagen.uploaded_at, cache_control=PRIVATE_CACHE_CONTROL)
+
+    # ?size=160&format=webp sirve la miniatura; si aún no existe se sirve el original sin cachearlo
+    size = request.GET.get('size')
+    if size:
+        derivada = DerivativeService.resolve(imagen.digest, size, request.GET.get('format', 'webp'))
+        if derivada:
+            return blob_response(
+                request, derivada.digest, derivada.content_type, derivada.fecha, cache_control=PRIVATE_CACHE_CONTROL
+            )
+        return blob_response(
+            request, imagen.digest, imagen.content_type, imagen.uploaded_at, cache_control=PRIVATE_FALLBACK_CACHE_CONTROL
+        )
+
+    return blob_response(
+        request, imagen.digest, imagen.content_type, imagen.uploaded_at, cache_control=PRIVATE_CACHE_CONTROL
+    )
+
 @api_view(['GET']) 
 @permission_classes([IsAuthenticated]) 
 def verify_token(request):  
@@ -176,7 +242,7 @@ def reset_password_code(request):
 @permission_classes([IsAuthenticated]) 
 def logout(request):  
     """  
-    Logout - invalida los tokens del usuario
+    Logout - cierra la sesión del dispositivo e invalida su token
     """  
 
     user = request.user 
@@ -185,7 +251,7 @@ def logout(request):
         return Response({"error": "El usuario no esta logueado", "status" : 400}, status=status.HTTP_400_BAD_REQUEST)  
      
     # Realizar logout  
-    success, msg = AuthService.logout(user) 
+    success, msg = AuthService.logout(user, request.auth) 
 
     if success:  
         return Response({"message": msg, "status" : 200}, status=status.HTTP_200_OK)
@@ -193,35 +259,56 @@ def logout(request):
     else:  
         return Response({"error": msg, "status" : 400},  status=status.HTTP_400_BAD_REQUEST)
     
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def logout_all(request):
+    """
+    Logout en todos los dispositivos - invalida todas las sesiones y tokens del usuario
+    """
+    success, msg = AuthService.logout_all(request.user, request.auth)
+
+    if success:
+        return Response({"message": msg, "status" : 200}, status=status.HTTP_200_OK)
+    return Response({"error": msg, "status" : 400}, status=status.HTTP_400_BAD_REQUEST)
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_user_profile_by_email(request):
 
     try:
         user_id = request.query_params.get('email', '')
+
+        # ?fields= recorta el usuario; fields[publications]= y expand[publications]= sus publicaciones
+        fields = _user_fields(request)
+        pub_fields, pub_expand = PublicationsService.fieldset(
+            request.query_params, full=request.query_params.get('view') == 'full', resource='publications'
+        )
+        usuarios = UserApp.objects.only('id', *fields)
         
         # Intentar obtener usuario por ID
         try:
-            user = UserApp.objects.get(id=int(user_id))
+            user = usuarios.get(id=int(user_id))
         except (ValueError, UserApp.DoesNotExist):
             # Si falla, intentar por email (para mantener compatibilidad)
-            user = UserApp.objects.get(email=user_id)
+            user = usuarios.get(email=user_id)
         
-        publications = Publications.objects.filter(user=user.id)
+        _, publications = PublicationsService.list_user_publications(user.id)
         image = ImagesUsers.objects.filter(user=user)
 
-        # Serializar las publicaciones con toda su estructura
-        serializer_publications = PublicationsSerializer(publications, many=True)
-        serializer_user = UserAppSerializer(user)
+        # Tarjetas ligeras por defecto; ?view=full devuelve toda la estructura
+        serializer_user = UserAppSerializer(user, fields=fields)
         serializer_image = ImagesUsersSerializer(image, many=True)
 
         data = {
             'user': serializer_user.data,
             'image': serializer_image.data,
-            'publications': serializer_publications.data
+            'publications': PublicationsService.serialize_list(publications, fields=pub_fields, expand=pub_expand)
         }
         return Response(data, status=status.HTTP_200_OK)
 
+    except FieldsetError as e:
+        return Response({"error": str(e), "status": 400}, status=status.HTTP_400_BAD_REQUEST)
+
     except UserApp.DoesNotExist:
         return Response(
             {"error": "No existe un usuario con ese ID o email.", "status": 404},
@@ -250,10 +337,11 @@ def get_user_by_id(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        user = UserApp.objects.get(id=int(user_id))
+        fields = _user_fields(request)
+        user = UserApp.objects.only('id', *fields).get(id=int(user_id))
         image = ImagesUsers.objects.filter(user=user)
         
-        serializer_user = UserAppSerializer(user)
+        serializer_user = UserAppSerializer(user, fields=fields)
         serializer_image = ImagesUsersSerializer(image, many=True)
         
         data = {
@@ -262,6 +350,9 @@ def get_user_by_id(request):
         }
         return Response(data, status=status.HTTP_200_OK)
     
+    except FieldsetError as e:
+        return Response({"error": str(e), "status": 400}, status=status.HTTP_400_BAD_REQUEST)
+
     except ValueError:
         return Response(
             {"error": "El ID debe ser un número válido", "status": 400},